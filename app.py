@@ -5,8 +5,9 @@ Main Flask Application
 """
 
 import sys
+import time
 from pathlib import Path
-from flask import Flask, redirect, url_for, render_template, request
+from flask import Flask, redirect, url_for, render_template, request, g, Response, abort
 
 # Add project paths
 PROJECT_ROOT = Path(__file__).parent
@@ -14,7 +15,8 @@ sys.path.insert(0, str(PROJECT_ROOT))
 sys.path.insert(0, str(PROJECT_ROOT / "src" / "core"))
 sys.path.insert(0, str(PROJECT_ROOT / "dbs"))
 
-from config import SECRET_KEY, DEBUG, APP_NAME, SCHOOL_NAME
+from config import (SECRET_KEY, DEBUG, APP_NAME, SCHOOL_NAME, DB_REPLICA_HOSTS, READ_YOUR_WRITES_SECONDS,
+                    SQL_INSTRUMENTATION, METRICS_TOKEN, PROFILER_ENABLED, TOKEN_REAPER_ENABLED)
 
 # Create Flask app
 app = Flask(__name__)
@@ -30,6 +32,7 @@ from routes.profile import profile_bp
 from routes.analytics import analytics_bp
 from routes.settings import settings_bp
 from routes.questions import questions_bp
+from routes.assets import assets_bp
 
 app.register_blueprint(auth_bp)
 app.register_blueprint(admin_bp)
@@ -39,6 +42,7 @@ app.register_blueprint(profile_bp)
 app.register_blueprint(analytics_bp)
 app.register_blueprint(settings_bp)
 app.register_blueprint(questions_bp)
+app.register_blueprint(assets_bp)
 
 
 # Context processor for templates
@@ -50,6 +54,68 @@ def inject_globals():
     }
 
 
+# asset_url('js/take-exam.js') -> fingerprinted /assets URL (see tools/build_assets.py)
+from src.core.assets import asset_url
+app.jinja_env.globals['asset_url'] = asset_url
+
+
+# On-demand request profiler; nothing is installed unless enabled
+if PROFILER_ENABLED:
+    from src.core.profiler import init_profiler
+    init_profiler(app)
+
+
+# Background purge of expired sessions, OTPs and magic links (one leader per interval)
+if TOKEN_REAPER_ENABLED:
+    from src.core.token_reaper import TokenReaper
+    TokenReaper.ensure_scheduler()
+
+
+# Per-worker filters of live share/magic tokens, built in the background
+from src.core.token_filter import TokenFilter
+TokenFilter.warm()
+
+# Writes buffered share-view counts to MySQL (one worker per interval)
+from src.core.share_cache import ShareViews
+ShareViews.ensure_flusher()
+
+
+# Request timing for /metrics
+@app.before_request
+def start_request_timer():
+    g._request_started = time.perf_counter()
+
+
+@app.after_request
+def record_request_metrics(response):
+    started = g.pop('_request_started', None)
+    if started is not None and request.endpoint != 'metrics':
+        from src.core.metrics import observe_request
+        observe_request(request.blueprint, request.endpoint, request.method,
+                        response.status_code, time.perf_counter() - started)
+    return response
+
+
+# Read-your-writes: after a successful write, keep this browser on the primary
+# until the replicas have had time to catch up
+@app.after_request
+def pin_primary_after_write(response):
+    if DB_REPLICA_HOSTS and request.method in ('POST', 'PUT', 'PATCH', 'DELETE') and response.status_code < 400:
+        from dbs.connection import PRIMARY_PIN_COOKIE
+        response.set_cookie(PRIMARY_PIN_COOKIE, '1', max_age=READ_YOUR_WRITES_SECONDS,
+                            httponly=True, samesite='Lax', path='/')
+    return response
+
+
+# Per-request SQL statistics: Server-Timing header and N+1 warnings
+@app.after_request
+def report_sql_stats(response):
+    if SQL_INSTRUMENTATION:
+        from dbs.instrumentation import finish_request
+        return finish_request(response, request.endpoint)
+    return response
+
+
 # Root route
 @app.route('/')
 def index():
@@ -100,6 +166,21 @@ def health():
         }), 503
 
 
+# Prometheus scrape endpoint
+@app.route('/metrics')
+def metrics():
+    """Prometheus metrics (protected by METRICS_TOKEN when set)"""
+    import hmac
+    from src.core.metrics import render_metrics, CONTENT_TYPE_LATEST
+
+    if METRICS_TOKEN:
+        supplied = request.headers.get('Authorization', '')
+        if not hmac.compare_digest(supplied, f'Bearer {METRICS_TOKEN}'):
+            abort(403)
+
+    return Response(render_metrics(), mimetype=CONTENT_TYPE_LATEST)
+
+
 # Error handlers
 @app.errorhandler(404)
 def not_found(e):
@@ -39,11 +39,46 @@ POOL_CONFIG = {
     "connect_timeout": int(os.getenv("DB_TIMEOUT", 10))
 }
 
+# Read Replica Configuration
+# Comma-separated "host" or "host:port" list; empty means all reads go to the primary
+DB_REPLICA_HOSTS = [h.strip() for h in os.getenv('DB_REPLICA_HOSTS', '').split(',') if h.strip()]
+REPLICA_POOL_SIZE = int(os.getenv('DB_REPLICA_POOL_SIZE', 10))
+REPLICA_MAX_LAG_SECONDS = int(os.getenv('DB_REPLICA_MAX_LAG', 5))        # Skip replicas further behind
+REPLICA_LAG_CHECK_SECONDS = int(os.getenv('DB_REPLICA_LAG_CHECK', 10))   # How often lag is re-read
+READ_YOUR_WRITES_SECONDS = int(os.getenv('DB_READ_YOUR_WRITES', 10))     # Pin to primary after a write
+
+# SQL Instrumentation (per-request query counts, Server-Timing header, N+1 warnings)
+SQL_INSTRUMENTATION = os.getenv('SQL_INSTRUMENTATION', 'True').lower() == 'true'
+SQL_REPEAT_THRESHOLD = int(os.getenv('SQL_REPEAT_THRESHOLD', 10))  # Same statement more often = N+1 warning
+SQL_CAPTURE_FILE = os.getenv('SQL_CAPTURE_FILE', '')  # Append one sample per statement template (JSON lines) for tools/query_audit.py
+
+# Metrics (/metrics, Prometheus text format)
+# Set PROMETHEUS_MULTIPROC_DIR when running several gunicorn workers
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')  # Optional bearer token required to scrape
+
+# Request Profiler (admin-triggered sampling profiles, see /admin/profiles)
+PROFILER_ENABLED = os.getenv('PROFILER_ENABLED', 'False').lower() == 'true'  # Off = no hooks installed
+PROFILE_SAMPLE_RATE = float(os.getenv('PROFILE_SAMPLE_RATE', 0))     # Fraction of all requests to profile
+PROFILE_INTERVAL_MS = float(os.getenv('PROFILE_INTERVAL_MS', 5))     # Stack sampling interval
+PROFILE_TOKEN_MAX_AGE = int(os.getenv('PROFILE_TOKEN_MAX_AGE', 3600))  # Seconds an X-Profile-Token is valid
+PROFILE_KEEP = int(os.getenv('PROFILE_KEEP', 200))                   # Newest profiles kept on disk
+PROFILE_DIR = os.getenv('PROFILE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'logs', 'profiles'))
+
 # Redis Configuration
 REDIS_HOST = os.getenv('REDIS_HOST', 'localhost')
 REDIS_PORT = int(os.getenv('REDIS_PORT', 6379))
 REDIS_DB = int(os.getenv('REDIS_DB', 1))  # Different DB than ssh-guardian
 REDIS_PASSWORD = os.getenv('REDIS_PASSWORD', None)
+CACHE_SERIALIZER = os.getenv('CACHE_SERIALIZER', 'msgpack')               # msgpack (falls back to json if not installed) or json
+CACHE_COMPRESS_MIN_BYTES = int(os.getenv('CACHE_COMPRESS_MIN_BYTES', 1024))  # zlib-compress payloads at least this big (0 = never)
+CACHE_BREAKER_THRESHOLD = int(os.getenv('CACHE_BREAKER_THRESHOLD', 3))          # Consecutive Redis errors before failing fast
+CACHE_BREAKER_PROBE_SECONDS = float(os.getenv('CACHE_BREAKER_PROBE_SECONDS', 5))  # Recovery probe interval while failing fast
+CACHE_LOCAL_MAX_ITEMS = int(os.getenv('CACHE_LOCAL_MAX_ITEMS', 1024))           # Per-worker fallback cache size
+CACHE_L1_MAX_ITEMS = int(os.getenv('CACHE_L1_MAX_ITEMS', 2048))                 # Per-worker L1 size for the two-level cache
+
+# Exam Archive (released exams moved to cold tables, see tools/archive_exams.py)
+ARCHIVE_AFTER_DAYS = int(os.getenv('ARCHIVE_AFTER_DAYS', 180))  # Released longer ago than this = archived
+ARCHIVE_BATCH_SIZE = int(os.getenv('ARCHIVE_BATCH_SIZE', 200))  # Exams moved per transaction
 
 # Session Configuration
 SESSION_DURATION_DAYS = 30
@@ -51,6 +86,26 @@ OTP_VALIDITY_MINUTES = 5
 MAX_FAILED_ATTEMPTS = 5
 LOCKOUT_DURATION_MINUTES = 30
 
+# Expired-token reaper (sessions, OTPs, magic links; see src/core/token_reaper.py)
+TOKEN_REAPER_ENABLED = os.getenv('TOKEN_REAPER_ENABLED', 'True').lower() == 'true'  # In-process schedule (one leader at a time)
+TOKEN_REAPER_INTERVAL_SECONDS = int(os.getenv('TOKEN_REAPER_INTERVAL', 900))  # Time between runs, cluster-wide
+TOKEN_REAPER_BATCH_SIZE = int(os.getenv('TOKEN_REAPER_BATCH_SIZE', 500))    # Rows per DELETE
+TOKEN_REAPER_MAX_BATCHES = int(os.getenv('TOKEN_REAPER_MAX_BATCHES', 20))   # Per table per run; the rest waits for the next run
+TOKEN_REAPER_SLEEP = float(os.getenv('TOKEN_REAPER_SLEEP', 0.1))            # Pause between batches in seconds
+TOKEN_GRACE_HOURS = int(os.getenv('TOKEN_GRACE_HOURS', 24))                 # Keep expired/used rows this long before deleting
+TOKEN_STORE = os.getenv('TOKEN_STORE', 'mysql').lower()  # OTPs and magic links: mysql (tables) or redis (TTL keys, audit rows only)
+TOKEN_FILTER_ENABLED = os.getenv('TOKEN_FILTER_ENABLED', 'True').lower() == 'true'  # Bloom pre-check for share/magic tokens (needs Redis pub/sub)
+TOKEN_FILTER_CAPACITY = int(os.getenv('TOKEN_FILTER_CAPACITY', 200000))         # Tokens per filter before the error rate degrades
+TOKEN_FILTER_ERROR_RATE = float(os.getenv('TOKEN_FILTER_ERROR_RATE', 0.001))    # Unknown tokens let through to the database
+TOKEN_FILTER_REBUILD_SECONDS = int(os.getenv('TOKEN_FILTER_REBUILD', 3600))     # Rebuild from the database (drops revoked tokens)
+SHARE_VIEWS_FLUSH_SECONDS = int(os.getenv('SHARE_VIEWS_FLUSH', 60))  # Share-view counts buffered in Redis, written to MySQL this often
+
+# HTTP caching (ETags everywhere; these are how long browsers skip revalidating)
+HTTP_RELEASED_MAX_AGE = int(os.getenv('HTTP_RELEASED_MAX_AGE', 3600))  # Released results (private to the student)
+HTTP_SHARE_MAX_AGE = int(os.getenv('HTTP_SHARE_MAX_AGE', 300))         # Public share pages (also bounds how long a revoked link lingers)
+HTTP_API_MAX_AGE = int(os.getenv('HTTP_API_MAX_AGE', 60))              # Analytics JSON (already cached server-side)
+ASSET_MAX_AGE = int(os.getenv('ASSET_MAX_AGE', 31536000))             # Fingerprinted /assets files (a new build gets new names)
+
 # Application Settings
 APP_NAME = "Y6 Practice Exam"
 SCHOOL_NAME = "Spring Gate Private School"
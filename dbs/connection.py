@@ -8,17 +8,30 @@ from mysql.connector import pooling, Error
 from typing import Optional, Tuple
 import os
 import sys
+import time
+import random
+import threading
 from pathlib import Path
 
 # Add project root to path
 PROJECT_ROOT = Path(__file__).parent.parent
 sys.path.insert(0, str(PROJECT_ROOT))
 
-from config import DB_CONFIG, POOL_CONFIG
+from config import (DB_CONFIG, POOL_CONFIG, DB_REPLICA_HOSTS, REPLICA_POOL_SIZE,
+                    REPLICA_MAX_LAG_SECONDS, REPLICA_LAG_CHECK_SECONDS)
+from dbs.instrumentation import InstrumentedConnection
+from src.core.metrics import DB_POOL_SIZE, DB_CHECKOUT_ERRORS
 
 # Global connection pool
 connection_pool = None
 
+# Read replica pools: [{'name', 'host', 'pool', 'lag', 'checked_at'}, ...]
+replica_pools = []
+_replica_lock = threading.Lock()
+
+# Cookie set after a write so the same browser keeps reading from the primary
+PRIMARY_PIN_COOKIE = 'db_pin'
+
 
 def initialize_pool():
     """Initialize the connection pool"""
@@ -29,6 +42,7 @@ def initialize_pool():
             **POOL_CONFIG,
             **DB_CONFIG
         )
+        DB_POOL_SIZE.labels(POOL_CONFIG['pool_name']).set(POOL_CONFIG['pool_size'])
         print(f"Database connection pool '{POOL_CONFIG['pool_name']}' created successfully")
         print(f"   Pool size: {POOL_CONFIG['pool_size']} connections")
         print(f"   Database: {DB_CONFIG['database']}")
@@ -39,16 +53,148 @@ def initialize_pool():
         return False
 
 
-def get_connection():
+def initialize_replica_pools():
+    """Initialize one connection pool per configured read replica"""
+    global replica_pools
+
+    pools = []
+    for index, entry in enumerate(DB_REPLICA_HOSTS):
+        host, _, port = entry.partition(':')
+        config = dict(DB_CONFIG, host=host, port=int(port) if port else DB_CONFIG['port'])
+        name = f"{POOL_CONFIG['pool_name']}_replica{index + 1}"
+
+        try:
+            pool = pooling.MySQLConnectionPool(
+                pool_name=name,
+                pool_size=REPLICA_POOL_SIZE,
+                pool_reset_session=POOL_CONFIG['pool_reset_session'],
+                connect_timeout=POOL_CONFIG['connect_timeout'],
+                **config
+            )
+            pools.append({'name': name, 'host': entry, 'pool': pool, 'lag': None, 'checked_at': 0})
+            DB_POOL_SIZE.labels(name).set(REPLICA_POOL_SIZE)
+            print(f"Replica pool '{name}' created for {entry}")
+        except Error as e:
+            print(f"Error creating replica pool for {entry}: {e}")
+
+    replica_pools = pools
+    return len(pools) > 0
+
+
+def _read_replica_lag(replica) -> Optional[int]:
+    """Return seconds behind the primary, or None if replication is broken"""
+    conn = replica['pool'].get_connection()
+    cursor = conn.cursor(dictionary=True)
+
+    try:
+        try:
+            cursor.execute("SHOW REPLICA STATUS")
+        except Error:
+            # MySQL < 8.0.22
+            cursor.execute("SHOW SLAVE STATUS")
+        status = cursor.fetchone()
+
+        if not status:
+            # Not a replica (e.g. a proxy or a standalone reporting copy)
+            return 0
+
+        lag = status.get('Seconds_Behind_Source', status.get('Seconds_Behind_Master'))
+        return int(lag) if lag is not None else None
+
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def _healthy_replicas():
+    """Replicas whose last measured lag is within REPLICA_MAX_LAG_SECONDS"""
+    now = time.time()
+    healthy = []
+
+    for replica in replica_pools:
+        if now - replica['checked_at'] >= REPLICA_LAG_CHECK_SECONDS:
+            # Only one thread re-measures a replica; the others use the last reading
+            if _replica_lock.acquire(blocking=False):
+                try:
+                    replica['lag'] = _read_replica_lag(replica)
+                except Error as e:
+                    print(f"Replica {replica['host']} lag check failed: {e}")
+                    replica['lag'] = None
+                finally:
+                    replica['checked_at'] = now
+                    _replica_lock.release()
+
+        if replica['lag'] is not None and replica['lag'] <= REPLICA_MAX_LAG_SECONDS:
+            healthy.append(replica)
+
+    return healthy
+
+
+def _pinned_to_primary() -> bool:
+    """Read-your-writes: stay on the primary during and shortly after a write"""
+    try:
+        from flask import has_request_context, request
+    except ImportError:
+        return False
+
+    if not has_request_context():
+        return False
+
+    if request.method not in ('GET', 'HEAD', 'OPTIONS'):
+        return True
+
+    return PRIMARY_PIN_COOKIE in request.cookies
+
+
+def _get_replica_connection():
+    """
+    Get a connection from a healthy read replica.
+
+    Returns:
+        (connection, pool name), or (None, None) if no replica can serve the read
+    """
+    replicas = _healthy_replicas()
+    random.shuffle(replicas)
+
+    for replica in replicas:
+        try:
+            return replica['pool'].get_connection(), replica['name']
+        except Error as e:
+            print(f"Replica {replica['host']} unavailable: {e}")
+            DB_CHECKOUT_ERRORS.labels(replica['name']).inc()
+            replica['lag'] = None
+
+    return None, None
+
+
+def get_connection(readonly: bool = False):
     """
     Get a connection from the pool.
 
+    Args:
+        readonly: Route the read to a replica when one is healthy. Falls back to
+                  the primary when replicas lag, are down, or the current browser
+                  session has just written (read-your-writes).
+
     Returns:
         mysql.connector connection object
 
     Raises:
         Error: If connection cannot be established
     """
+    conn, pool_name = None, None
+
+    if readonly and replica_pools and not _pinned_to_primary():
+        conn, pool_name = _get_replica_connection()
+
+    if conn is None:
+        conn, pool_name = _get_primary_connection(), POOL_CONFIG['pool_name']
+
+    return InstrumentedConnection(conn, pool_name)
+
+
+def _get_primary_connection():
+    """Check out a connection to the primary"""
     global connection_pool
 
     try:
@@ -65,6 +211,7 @@ def get_connection():
 
     except Error as e:
         print(f"Error getting connection: {e}")
+        DB_CHECKOUT_ERRORS.labels(POOL_CONFIG['pool_name']).inc()
         raise
 
 
@@ -153,6 +300,8 @@ def execute_query(query: str, params: Optional[Tuple] = None, fetch_one=False, f
 
 # Initialize pool on module import
 initialize_pool()
+if DB_REPLICA_HOSTS:
+    initialize_replica_pools()
 
 
 if __name__ == "__main__":
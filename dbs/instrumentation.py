@@ -0,0 +1,195 @@
+"""
+Y6 Practice Exam - SQL Instrumentation
+Per-request query counting, timing and N+1 detection around pooled connections,
+plus optional capture of statement samples for the query plan audit
+"""
+
+import re
+import json
+import time
+import threading
+from collections import Counter
+from typing import Optional
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from config import SQL_INSTRUMENTATION, SQL_REPEAT_THRESHOLD, SQL_CAPTURE_FILE
+from src.core.metrics import DB_CONNECTIONS_IN_USE
+
+_STRING_LITERAL = re.compile(r"'(?:[^'\\]|\\.|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def fingerprint(sql: str) -> str:
+    """
+    Reduce a statement to its template so repeats can be grouped.
+
+    "SELECT * FROM questions WHERE id = 42" and "... id = %s" both become
+    "SELECT * FROM questions WHERE id = ?".
+    """
+    sql = _STRING_LITERAL.sub('?', sql)
+    sql = sql.replace('%s', '?')
+    sql = _NUMBER_LITERAL.sub('?', sql)
+    sql = _PLACEHOLDER_LIST.sub('(?+)', sql)
+    return _WHITESPACE.sub(' ', sql).strip()
+
+
+class QueryStats:
+    """Query statistics collected for a single request"""
+
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.slowest_ms = 0.0
+        self.slowest_sql = None
+        self.fingerprints = Counter()
+
+    def record(self, sql: str, elapsed_ms: float):
+        self.count += 1
+        self.total_ms += elapsed_ms
+        self.fingerprints[fingerprint(sql)] += 1
+
+        if elapsed_ms > self.slowest_ms:
+            self.slowest_ms = elapsed_ms
+            self.slowest_sql = sql
+
+    def repeated(self, threshold: int = SQL_REPEAT_THRESHOLD):
+        """Statement templates executed more than threshold times"""
+        return [(fp, n) for fp, n in self.fingerprints.most_common() if n > threshold]
+
+    def server_timing(self) -> str:
+        """Server-Timing header value (counts and durations only, never SQL text)"""
+        parts = [f'db;dur={self.total_ms:.1f};desc="{self.count} queries"']
+
+        if self.count:
+            parts.append(f'db-slowest;dur={self.slowest_ms:.1f}')
+            top_repeat = self.fingerprints.most_common(1)[0][1]
+            parts.append(f'db-repeat;desc="{top_repeat}x max"')
+
+        return ', '.join(parts)
+
+
+def current_stats() -> Optional[QueryStats]:
+    """Stats for the active request, or None outside a request"""
+    try:
+        from flask import g, has_request_context
+    except ImportError:
+        return None
+
+    if not has_request_context():
+        return None
+
+    stats = g.get('_sql_stats')
+    if stats is None:
+        stats = g._sql_stats = QueryStats()
+    return stats
+
+
+_captured = set()
+_capture_lock = threading.Lock()
+
+
+def capture(sql: str, params=None):
+    """Append the first sample of each statement template to SQL_CAPTURE_FILE"""
+    template = fingerprint(sql)
+    with _capture_lock:
+        if template in _captured:
+            return
+        _captured.add(template)
+
+    endpoint = None
+    try:
+        from flask import request, has_request_context
+        if has_request_context():
+            endpoint = request.endpoint
+    except ImportError:
+        pass
+
+    line = json.dumps({'endpoint': endpoint, 'sql': sql, 'params': list(params or ())}, default=str)
+    try:
+        with open(SQL_CAPTURE_FILE, 'a', encoding='utf-8') as f:
+            f.write(line + '\n')
+    except OSError as e:
+        print(f"[SQL] Capture error: {e}")
+
+
+class InstrumentedCursor:
+    """Cursor proxy that times every execute() against the request's QueryStats"""
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def execute(self, operation, params=None, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return self._cursor.execute(operation, params, *args, **kwargs)
+        finally:
+            self._record(operation, started)
+            if SQL_CAPTURE_FILE:
+                capture(self._text(operation), params)
+
+    def executemany(self, operation, seq_params, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return self._cursor.executemany(operation, seq_params, *args, **kwargs)
+        finally:
+            self._record(operation, started)
+
+    @staticmethod
+    def _text(operation) -> str:
+        return operation.decode('utf-8', 'replace') if isinstance(operation, bytes) else str(operation)
+
+    def _record(self, operation, started):
+        stats = current_stats()
+        if stats is not None:
+            stats.record(self._text(operation), (time.perf_counter() - started) * 1000)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+class InstrumentedConnection:
+    """Connection proxy that tracks pool checkouts and hands out InstrumentedCursor objects"""
+
+    def __init__(self, conn, pool: str = 'primary'):
+        self._conn = conn
+        self._pool = pool
+        self._released = False
+        DB_CONNECTIONS_IN_USE.labels(pool).inc()
+
+    def cursor(self, *args, **kwargs):
+        cursor = self._conn.cursor(*args, **kwargs)
+        return InstrumentedCursor(cursor) if SQL_INSTRUMENTATION else cursor
+
+    def close(self):
+        if not self._released:
+            self._released = True
+            DB_CONNECTIONS_IN_USE.labels(self._pool).dec()
+        return self._conn.close()
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+
+def finish_request(response, endpoint: Optional[str] = None):
+    """Attach Server-Timing and log N+1 suspects for the finished request"""
+    from flask import g
+
+    stats = g.pop('_sql_stats', None)
+    if stats is None:
+        return response
+
+    response.headers.add('Server-Timing', stats.server_timing())
+
+    for template, times in stats.repeated():
+        print(f"[SQL] N+1 suspect in {endpoint}: {times}x {template[:160]}")
+
+    return response
@@ -0,0 +1,411 @@
+#!/usr/bin/env python3
+"""
+Y6 Practice Exam - Migration Runner
+Applies dbs/migrations in version order and records each one in schema_migrations
+
+A migration is NNN_name.sql, optionally with NNN_name.py beside it declaring
+BACKFILLS: data changes run in primary-key batches after the schema change,
+committed per batch, throttled, and resumable from backfill_jobs. Keep large
+UPDATE/INSERT ... SELECT statements out of the .sql file and declare them
+as backfills instead, so they never lock a whole table.
+
+ALTER TABLE statements without an explicit ALGORITHM are tried as INSTANT,
+then INPLACE with LOCK=NONE. A table-copying ALTER is refused on tables with
+more than COPY_ROW_LIMIT rows unless --allow-copy is given.
+
+Usage:
+    python dbs/migrate.py status
+    python dbs/migrate.py up                              # apply pending migrations
+    python dbs/migrate.py up --baseline 007_student_stats # existing DB: mark up to 007 as applied
+    python dbs/migrate.py up --batch-size 500 --sleep 0.2
+"""
+
+import re
+import sys
+import time
+import hashlib
+import importlib.util
+from pathlib import Path
+
+# Add project root to path
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from mysql.connector import Error
+
+MIGRATIONS_DIR = PROJECT_ROOT / "dbs" / "migrations"
+LOCK_NAME = 'y6_schema_migrate'
+COPY_ROW_LIMIT = 50000
+
+# Server refused the requested ALGORITHM/LOCK for this ALTER
+ONLINE_DDL_UNSUPPORTED = {1845, 1846, 4092}
+
+_ALTER_TABLE = re.compile(r"^\s*ALTER\s+TABLE\s+`?(\w+)`?", re.IGNORECASE)
+_HAS_ALGORITHM = re.compile(r"\bALGORITHM\s*=", re.IGNORECASE)
+_USE = re.compile(r"^\s*USE\s+", re.IGNORECASE)
+
+
+class Backfill:
+    """
+    A data change applied to one key range at a time.
+
+    sql must restrict itself to the current batch with %(start)s (inclusive)
+    and %(end)s (exclusive) on the key column, e.g.
+    "UPDATE t SET x = y WHERE id >= %(start)s AND id < %(end)s AND x IS NULL".
+    The key range walked is MIN..MAX of key in table when the job starts;
+    rows written after that are the application's responsibility.
+    """
+
+    def __init__(self, name: str, table: str, sql: str, key: str = 'id', batch_size: int = 1000):
+        self.name = name
+        self.table = table
+        self.sql = sql
+        self.key = key
+        self.batch_size = batch_size
+
+
+# =============================================================================
+# Files
+# =============================================================================
+
+def discover():
+    """[(version, sql_path, py_path or None)] in version order"""
+    migrations = []
+    for sql_path in sorted(MIGRATIONS_DIR.glob('[0-9][0-9][0-9]_*.sql')):
+        py_path = sql_path.with_suffix('.py')
+        migrations.append((sql_path.stem, sql_path, py_path if py_path.exists() else None))
+    return migrations
+
+
+def checksum(*paths) -> str:
+    digest = hashlib.sha256()
+    for path in paths:
+        if path:
+            digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def split_statements(sql: str):
+    """Split a script on ; outside quotes and comments"""
+    statements, current = [], []
+    quote = None
+    i = 0
+
+    while i < len(sql):
+        ch = sql[i]
+
+        if quote:
+            current.append(ch)
+            if ch == '\\':
+                current.append(sql[i + 1:i + 2])
+                i += 1
+            elif ch == quote:
+                quote = None
+        elif ch in ("'", '"', '`'):
+            quote = ch
+            current.append(ch)
+        elif sql.startswith('--', i) or ch == '#':
+            end = sql.find('\n', i)
+            i = len(sql) if end == -1 else end
+            continue
+        elif sql.startswith('/*', i):
+            end = sql.find('*/', i + 2)
+            i = len(sql) if end == -1 else end + 2
+            continue
+        elif ch == ';':
+            statements.append(''.join(current).strip())
+            current = []
+        else:
+            current.append(ch)
+        i += 1
+
+    statements.append(''.join(current).strip())
+    return [s for s in statements if s]
+
+
+def load_backfills(version: str, py_path):
+    """BACKFILLS declared by a migration's .py file"""
+    if not py_path:
+        return []
+    spec = importlib.util.spec_from_file_location(f"migration_{version}", py_path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return list(getattr(module, 'BACKFILLS', []))
+
+
+# =============================================================================
+# Bookkeeping
+# =============================================================================
+
+def ensure_tables(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version VARCHAR(128) PRIMARY KEY,
+            checksum CHAR(64) NULL,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            completed_at TIMESTAMP NULL COMMENT 'Set once all backfills have finished'
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS backfill_jobs (
+            name VARCHAR(128) PRIMARY KEY,
+            last_key BIGINT NULL,
+            max_key BIGINT NULL,
+            rows_changed BIGINT NOT NULL DEFAULT 0,
+            finished_at TIMESTAMP NULL,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+    """)
+
+
+def applied_versions(cursor):
+    """{version: (checksum, completed)}"""
+    cursor.execute("SELECT version, checksum, completed_at FROM schema_migrations")
+    return {version: (digest, completed is not None) for version, digest, completed in cursor.fetchall()}
+
+
+def table_rows(cursor, table: str) -> int:
+    """Approximate row count from InnoDB statistics"""
+    cursor.execute("""
+        SELECT TABLE_ROWS FROM information_schema.TABLES
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+    """, (table,))
+    row = cursor.fetchone()
+    return int(row[0] or 0) if row else 0
+
+
+# =============================================================================
+# Schema changes
+# =============================================================================
+
+def run_statement(cursor, statement: str, allow_copy: bool):
+    """Execute one statement, preferring online DDL for ALTER TABLE"""
+    match = _ALTER_TABLE.match(statement)
+    if not match or _HAS_ALGORITHM.search(statement):
+        cursor.execute(statement)
+        return None
+
+    for clause in ('ALGORITHM=INSTANT', 'ALGORITHM=INPLACE, LOCK=NONE'):
+        try:
+            cursor.execute(f"{statement}, {clause}")
+            return clause
+        except Error as e:
+            if e.errno not in ONLINE_DDL_UNSUPPORTED:
+                raise
+
+    table = match.group(1)
+    rows = table_rows(cursor, table)
+    if rows > COPY_ROW_LIMIT and not allow_copy:
+        raise RuntimeError(f"ALTER on {table} (~{rows} rows) needs a table copy; "
+                           f"rerun with --allow-copy in a maintenance window")
+    cursor.execute(statement)
+    return 'ALGORITHM=COPY'
+
+
+def apply_schema(cursor, version: str, sql_path, allow_copy: bool):
+    """Run every statement of a .sql migration"""
+    for statement in split_statements(sql_path.read_text(encoding='utf-8')):
+        if _USE.match(statement):
+            continue  # The connection already targets DB_CONFIG['database']
+
+        started = time.time()
+        algorithm = run_statement(cursor, statement, allow_copy)
+        summary = ' '.join(statement.split())[:80]
+        suffix = f" [{algorithm}]" if algorithm else ''
+        print(f"   {summary}{suffix} ({time.time() - started:.1f}s)")
+
+
+# =============================================================================
+# Backfills
+# =============================================================================
+
+def wait_for_replicas():
+    """Pause while any read replica lags more than REPLICA_MAX_LAG_SECONDS"""
+    from config import DB_REPLICA_HOSTS, REPLICA_MAX_LAG_SECONDS
+    from dbs import connection
+
+    if not DB_REPLICA_HOSTS:
+        return
+    if not connection.replica_pools:
+        connection.initialize_replica_pools()
+
+    while True:
+        lags = []
+        for replica in connection.replica_pools:
+            try:
+                lags.append(connection._read_replica_lag(replica))
+            except Error as e:
+                print(f"   Replica {replica['host']} lag check failed: {e}")
+        worst = max((lag for lag in lags if lag is not None), default=0)
+        if worst <= REPLICA_MAX_LAG_SECONDS:
+            return
+        print(f"   Replicas {worst}s behind, waiting...")
+        time.sleep(1)
+
+
+def run_backfill(conn, cursor, job: Backfill, batch_size: int = None, pause: float = 0.1):
+    """Walk job.table's key range in batches, committing and recording progress per batch"""
+    batch_size = batch_size or job.batch_size
+
+    cursor.execute("SELECT last_key, max_key, rows_changed, finished_at FROM backfill_jobs WHERE name = %s",
+                   (job.name,))
+    state = cursor.fetchone()
+    if state and state[3] is not None:
+        print(f"   Backfill {job.name}: already finished")
+        return
+
+    if state and state[1] is not None:
+        start, max_key, rows_changed = state[0], state[1], state[2]
+        if start is None:
+            # Recorded before last_key started at MIN - 1, and stopped before the first batch
+            cursor.execute(f"SELECT MIN({job.key}) FROM {job.table}")
+            start = cursor.fetchone()[0]
+        else:
+            start += 1
+        print(f"   Backfill {job.name}: resuming at {job.key}={start}")
+    else:
+        cursor.execute(f"SELECT MIN({job.key}), MAX({job.key}) FROM {job.table}")
+        min_key, max_key = cursor.fetchone()
+        start, rows_changed = min_key, 0
+        last_key = min_key - 1 if min_key is not None else None
+        cursor.execute("""
+            INSERT INTO backfill_jobs (name, last_key, max_key) VALUES (%s, %s, %s)
+            ON DUPLICATE KEY UPDATE last_key = VALUES(last_key), max_key = VALUES(max_key), rows_changed = 0
+        """, (job.name, last_key, max_key))
+        conn.commit()
+
+    while start is not None and start <= max_key:
+        wait_for_replicas()
+        end = start + batch_size
+
+        cursor.execute(job.sql, {'start': start, 'end': end})
+        rows_changed += max(cursor.rowcount, 0)
+        cursor.execute("UPDATE backfill_jobs SET last_key = %s, rows_changed = %s WHERE name = %s",
+                       (end - 1, rows_changed, job.name))
+        conn.commit()
+
+        print(f"   Backfill {job.name}: {job.key} < {end} of {max_key}, {rows_changed} rows")
+        start = end
+        if pause:
+            time.sleep(pause)
+
+    cursor.execute("UPDATE backfill_jobs SET finished_at = NOW() WHERE name = %s", (job.name,))
+    conn.commit()
+    print(f"   Backfill {job.name}: done ({rows_changed} rows)")
+
+
+# =============================================================================
+# Commands
+# =============================================================================
+
+def status(cursor):
+    applied = applied_versions(cursor)
+    for version, sql_path, py_path in discover():
+        state = applied.get(version)
+        if state is None:
+            label = 'pending'
+        elif not state[1]:
+            label = 'backfilling'
+        elif state[0] and state[0] != checksum(sql_path, py_path):
+            label = 'applied (file changed since)'
+        else:
+            label = 'applied'
+        print(f"{version:<40}{label}")
+    return True
+
+
+def up(conn, cursor, args):
+    applied = applied_versions(cursor)
+    migrations = discover()
+
+    if not applied and args.baseline is None:
+        cursor.execute("SHOW TABLES LIKE 'users'")
+        if cursor.fetchone():
+            print("Existing schema without migration history. Rerun with --baseline <version> "
+                  "naming the last migration already applied by hand.")
+            return False
+
+    if args.baseline is not None:
+        versions = [m[0] for m in migrations]
+        if args.baseline not in versions:
+            print(f"Unknown baseline version: {args.baseline}")
+            return False
+        for version, sql_path, py_path in migrations[:versions.index(args.baseline) + 1]:
+            if version not in applied:
+                cursor.execute("""
+                    INSERT INTO schema_migrations (version, checksum, completed_at) VALUES (%s, NULL, NOW())
+                """, (version,))
+                applied[version] = (None, True)
+                print(f"{version}: marked as applied (baseline)")
+        conn.commit()
+
+    pending = [m for m in migrations if not applied.get(m[0], (None, False))[1]]
+    if not pending:
+        print("Schema is up to date")
+        return True
+
+    for version, sql_path, py_path in pending:
+        backfills = load_backfills(version, py_path)
+
+        if version not in applied:
+            print(f"{version}: applying")
+            apply_schema(cursor, version, sql_path, args.allow_copy)
+            cursor.execute("INSERT INTO schema_migrations (version, checksum) VALUES (%s, %s)",
+                           (version, checksum(sql_path, py_path)))
+            conn.commit()
+        else:
+            print(f"{version}: resuming backfills")
+
+        for job in backfills:
+            run_backfill(conn, cursor, job, args.batch_size, args.sleep)
+
+        cursor.execute("UPDATE schema_migrations SET completed_at = NOW() WHERE version = %s", (version,))
+        conn.commit()
+
+    print(f"Applied {len(pending)} migration(s)")
+    return True
+
+
+def main(args):
+    from dbs.connection import get_connection
+
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    try:
+        # One runner at a time across containers
+        cursor.execute("SELECT GET_LOCK(%s, 0)", (LOCK_NAME,))
+        if not cursor.fetchone()[0]:
+            print("Another migration run holds the lock; exiting")
+            return False
+
+        try:
+            ensure_tables(cursor)
+            if args.command == 'status':
+                return status(cursor)
+            return up(conn, cursor, args)
+        finally:
+            cursor.execute("SELECT RELEASE_LOCK(%s)", (LOCK_NAME,))
+            cursor.fetchone()
+
+    except (Error, RuntimeError) as e:
+        print(f"Migration failed: {e}")
+        return False
+
+    finally:
+        cursor.close()
+        conn.close()
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Apply database migrations')
+    parser.add_argument('command', nargs='?', default='up', choices=['up', 'status'])
+    parser.add_argument('--baseline', help='Mark migrations up to this version as applied without running them')
+    parser.add_argument('--allow-copy', action='store_true', help='Permit table-copying ALTERs on large tables')
+    parser.add_argument('--batch-size', type=int, help='Override backfill batch size')
+    parser.add_argument('--sleep', type=float, default=0.1, help='Pause between backfill batches (default: 0.1s)')
+
+    args = parser.parse_args()
+    sys.exit(0 if main(args) else 1)
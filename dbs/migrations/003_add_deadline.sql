@@ -5,7 +5,7 @@ USE y6_practice_exam;
 
 -- Add deadline column to practice_exams
 ALTER TABLE practice_exams
-    ADD COLUMN IF NOT EXISTS deadline TIMESTAMP NULL AFTER exam_date;
+    ADD COLUMN deadline TIMESTAMP NULL AFTER exam_date;
 
 -- Create index for deadline lookups
-CREATE INDEX IF NOT EXISTS idx_practice_exams_deadline ON practice_exams(deadline);
+CREATE INDEX idx_practice_exams_deadline ON practice_exams(deadline);
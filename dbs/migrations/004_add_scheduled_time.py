@@ -0,0 +1,17 @@
+"""
+Migration 004 backfill: scheduled_at for exams created before the column existed
+"""
+
+from dbs.migrate import Backfill
+
+BACKFILLS = [
+    Backfill(
+        'practice_exams_scheduled_at',
+        table='practice_exams',
+        sql="""
+            UPDATE practice_exams
+            SET scheduled_at = TIMESTAMP(exam_date, '00:00:00')
+            WHERE id >= %(start)s AND id < %(end)s AND scheduled_at IS NULL
+        """
+    ),
+]
@@ -9,7 +9,5 @@ ADD COLUMN scheduled_at TIMESTAMP NULL AFTER exam_date;
 ALTER TABLE practice_exams
 ADD INDEX idx_practice_exams_scheduled_at (scheduled_at);
 
--- Update existing records to have scheduled_at based on exam_date at 00:00:00
-UPDATE practice_exams
-SET scheduled_at = TIMESTAMP(exam_date, '00:00:00')
-WHERE scheduled_at IS NULL;
+-- Existing records get scheduled_at = exam_date 00:00:00 from
+-- 004_add_scheduled_time.py, in primary-key batches
@@ -25,7 +25,15 @@ CREATE TABLE IF NOT EXISTS magic_links (
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
 COMMENT='Magic links for passwordless authentication';
 
--- Insert default SMTP settings if not exists (system_settings table already exists)
+-- Key/value settings (read by routes/settings.py)
+CREATE TABLE IF NOT EXISTS system_settings (
+    setting_key VARCHAR(100) PRIMARY KEY,
+    setting_value JSON NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+COMMENT='System-wide settings as JSON values';
+
+-- Insert default SMTP settings if not exists
 INSERT INTO system_settings (setting_key, setting_value) VALUES
 ('smtp_config', JSON_OBJECT(
     'host', '',
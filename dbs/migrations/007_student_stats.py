@@ -0,0 +1,51 @@
+"""
+Migration 007 backfill: student_stats rows for existing exams, one range of
+student ids at a time (safe to re-run)
+"""
+
+from dbs.migrate import Backfill
+
+BACKFILLS = [
+    Backfill(
+        'student_stats_from_exams',
+        table='users',
+        sql="""
+        INSERT INTO student_stats (
+            student_id, total_exams, pending_count, in_progress_count, submitted_count,
+            grading_count, released_count, percentage_sum, avg_percentage,
+            best_percentage, lowest_percentage, total_points, last_activity_at
+        )
+        SELECT
+            student_id,
+            COUNT(*),
+            SUM(status = 'pending'),
+            SUM(status = 'in_progress'),
+            SUM(status = 'submitted'),
+            SUM(status = 'grading'),
+            SUM(status = 'released'),
+            COALESCE(SUM(CASE WHEN status = 'released' THEN percentage END), 0),
+            AVG(CASE WHEN status = 'released' THEN percentage END),
+            MAX(CASE WHEN status = 'released' THEN percentage END),
+            MIN(CASE WHEN status = 'released' THEN percentage END),
+            COALESCE(SUM(CASE WHEN status = 'released' THEN total_score END), 0),
+            MAX(COALESCE(released_at, graded_at, submitted_at, started_at, created_at))
+        FROM practice_exams
+        WHERE student_id >= %(start)s AND student_id < %(end)s
+        GROUP BY student_id
+        ON DUPLICATE KEY UPDATE
+            total_exams = VALUES(total_exams),
+            pending_count = VALUES(pending_count),
+            in_progress_count = VALUES(in_progress_count),
+            submitted_count = VALUES(submitted_count),
+            grading_count = VALUES(grading_count),
+            released_count = VALUES(released_count),
+            percentage_sum = VALUES(percentage_sum),
+            avg_percentage = VALUES(avg_percentage),
+            best_percentage = VALUES(best_percentage),
+            lowest_percentage = VALUES(lowest_percentage),
+            total_points = VALUES(total_points),
+            last_activity_at = VALUES(last_activity_at)
+        """,
+        batch_size=500
+    ),
+]
@@ -0,0 +1,35 @@
+-- Migration 007: Per-student statistics table
+-- Y6 Practice Exam System
+-- One row per student, kept in step with practice_exams by the application
+-- (src/core/student_stats.py) in the same transaction as each status change
+
+USE y6_practice_exam;
+
+CREATE TABLE IF NOT EXISTS student_stats (
+    student_id INT PRIMARY KEY,
+
+    -- Exam counts by status
+    total_exams INT NOT NULL DEFAULT 0,
+    pending_count INT NOT NULL DEFAULT 0,
+    in_progress_count INT NOT NULL DEFAULT 0,
+    submitted_count INT NOT NULL DEFAULT 0,
+    grading_count INT NOT NULL DEFAULT 0,
+    released_count INT NOT NULL DEFAULT 0,
+
+    -- Released results
+    percentage_sum DECIMAL(12,2) NOT NULL DEFAULT 0,
+    avg_percentage DECIMAL(5,2) NULL,
+    best_percentage DECIMAL(5,2) NULL,
+    lowest_percentage DECIMAL(5,2) NULL,
+    total_points INT NOT NULL DEFAULT 0,
+
+    last_activity_at TIMESTAMP NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+
+    KEY idx_student_stats_avg (avg_percentage),
+
+    FOREIGN KEY (student_id) REFERENCES users(id) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+COMMENT='Per-student exam aggregates';
+
+-- Existing exams are backfilled per student range by 007_student_stats.py
@@ -0,0 +1,25 @@
+-- Migration 008: Composite indexes for the admin exam search
+-- Y6 Practice Exam System
+-- Backs src/core/exam_search.py: keyset pages ordered by (created_at, id) for
+-- each filter the exam list offers, and a covering index for the grouped
+-- facet pass over a date range. InnoDB appends the primary key (id) to every
+-- secondary index, so (x, created_at) also orders by id.
+
+USE y6_practice_exam;
+
+ALTER TABLE practice_exams
+    -- Unfiltered list, newest first
+    ADD INDEX idx_pe_created (created_at),
+    -- Status filter (replaces idx_status, its prefix)
+    ADD INDEX idx_pe_status_created (status, created_at),
+    -- Student filter
+    ADD INDEX idx_pe_student_created (student_id, created_at),
+    -- Subject filter (resolved to question sets) and exam lookups per set
+    ADD INDEX idx_pe_set_created (question_set_id, created_at),
+    -- Date-range filter and facet counts: status, set and month without touching rows
+    ADD INDEX idx_pe_date_facets (exam_date, status, question_set_id),
+    DROP INDEX idx_status,
+    DROP INDEX idx_exam_date;
+
+-- The subject filter resolves through question_sets.idx_subject_id, which
+-- (with the implicit id suffix) already covers subject -> set ids.
@@ -0,0 +1,26 @@
+-- Migration 009: Composite indexes for hot queries found by the plan audit
+-- Y6 Practice Exam System
+-- See tools/query_audit.py. Each index follows equality columns, then the
+-- sort, so the plans need neither a full scan nor a filesort. Single-column
+-- indexes made redundant by a new composite (same leading column) are dropped.
+
+USE y6_practice_exam;
+
+-- Student dashboard: pending/in-progress by exam_date, released by released_at
+ALTER TABLE practice_exams
+    ADD INDEX idx_pe_student_status_date (student_id, status, exam_date),
+    ADD INDEX idx_pe_student_status_released (student_id, status, released_at),
+    DROP INDEX idx_student_id;
+
+-- OTP verification: newest unused code for a user and purpose
+ALTER TABLE user_otps
+    ADD INDEX idx_otp_verify (user_id, otp_code, purpose, is_used, created_at),
+    DROP INDEX idx_otp_lookup,
+    DROP INDEX idx_user_id;
+
+-- Answer joins: (practice_exam_id, question_id) is served by uk_exam_question.
+-- Per-question analytics join on question_id alone and read only these columns.
+ALTER TABLE student_answers
+    ADD INDEX idx_sa_question_result (question_id, is_correct, marks_awarded),
+    DROP INDEX idx_question_id,
+    DROP INDEX idx_practice_exam_id;
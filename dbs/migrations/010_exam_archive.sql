@@ -0,0 +1,60 @@
+-- Migration 010: Cold storage for old released exams
+-- Y6 Practice Exam System
+-- src/core/exam_archive.py (run by tools/archive_exams.py) moves released
+-- exams older than ARCHIVE_AFTER_DAYS, with their answers, into the *_archive
+-- tables in small batches, keeping practice_exams and student_answers small.
+-- Drawing answers are stored COMPRESS()ed in the archive.
+--
+-- Pages that show history read the *_all views, which put hot and archived
+-- rows back together. Filter them with WHERE (not only in a JOIN ... ON):
+-- MySQL 8.0.29+ pushes WHERE conditions into both halves of the UNION, so a
+-- lookup by id or student_id stays an index lookup on each table.
+--
+-- Columns added to practice_exams or student_answers later must be added to
+-- the matching archive table (same position) and the views recreated.
+
+USE y6_practice_exam;
+
+-- Archive candidates: released exams by release time
+ALTER TABLE practice_exams
+    ADD INDEX idx_pe_status_released (status, released_at);
+
+-- Same columns and indexes as the hot tables; no foreign keys, so archived
+-- rows never block question or user changes
+CREATE TABLE practice_exams_archive LIKE practice_exams;
+
+ALTER TABLE practice_exams_archive
+    ADD COLUMN archived_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP;
+
+CREATE TABLE student_answers_archive LIKE student_answers;
+
+ALTER TABLE student_answers_archive
+    DROP COLUMN drawing_data,
+    ADD COLUMN drawing_data_z LONGBLOB NULL COMMENT 'COMPRESS()ed base64 canvas image data',
+    ADD COLUMN archived_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP;
+
+-- Every exam, hot or archived (archived_at is NULL for hot rows)
+CREATE OR REPLACE VIEW practice_exams_all AS
+    SELECT pe.*, NULL AS archived_at FROM practice_exams pe
+    UNION ALL
+    SELECT a.* FROM practice_exams_archive a;
+
+-- Every answer, with archived drawings decompressed
+CREATE OR REPLACE VIEW student_answers_all AS
+    SELECT id, practice_exam_id, question_id, student_answer, drawing_data,
+           is_correct, marks_awarded, auto_graded, admin_feedback,
+           answered_at, graded_at, created_at, updated_at
+    FROM student_answers
+    UNION ALL
+    SELECT id, practice_exam_id, question_id, student_answer,
+           CAST(UNCOMPRESS(drawing_data_z) AS CHAR CHARACTER SET utf8mb4),
+           is_correct, marks_awarded, auto_graded, admin_feedback,
+           answered_at, graded_at, created_at, updated_at
+    FROM student_answers_archive;
+
+-- Grading results only, for analytics that aggregate over every answer
+-- (never touches the answer text or drawings)
+CREATE OR REPLACE VIEW answer_results_all AS
+    SELECT id, practice_exam_id, question_id, is_correct, marks_awarded FROM student_answers
+    UNION ALL
+    SELECT id, practice_exam_id, question_id, is_correct, marks_awarded FROM student_answers_archive;
@@ -0,0 +1,17 @@
+-- Migration 011: Indexes for the expired-token reaper
+-- Y6 Practice Exam System
+-- src/core/token_reaper.py deletes expired and used rows from user_sessions,
+-- user_otps and magic_links in small batches. Each DELETE ... LIMIT must be
+-- an index range scan, not a table scan. user_sessions.idx_expires_at and
+-- magic_links.idx_expires already exist.
+
+USE y6_practice_exam;
+
+-- Expired OTPs (used ones expire within OTP_VALIDITY_MINUTES too)
+ALTER TABLE user_otps
+    ADD INDEX idx_otp_expires (expires_at);
+
+-- Used magic links; idx_token duplicates the UNIQUE index on token
+ALTER TABLE magic_links
+    ADD INDEX idx_ml_used (used_at),
+    DROP INDEX idx_token;
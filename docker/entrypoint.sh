@@ -61,6 +61,13 @@ check_updates() {
     fi
 }
 
+# Function to build fingerprinted static assets
+build_assets() {
+    echo -e "${YELLOW}Building static assets...${NC}"
+    cd /app
+    python3 tools/build_assets.py > /dev/null || echo -e "${RED}Asset build failed; serving unbuilt files${NC}"
+}
+
 # Function to wait for database
 wait_for_db() {
     echo -e "${YELLOW}Waiting for database connection...${NC}"
@@ -100,42 +107,10 @@ run_migrations() {
 
     cd /app
 
-    # Run schema creation
-    if [ -f "dbs/migrations/001_initial_schema.sql" ]; then
-        python3 -c "
-from dbs.connection import get_connection
-import os
-
-conn = get_connection()
-cursor = conn.cursor()
-
-# Check if tables exist
-cursor.execute(\"SHOW TABLES LIKE 'users'\")
-if not cursor.fetchone():
-    print('Creating database schema...')
-    # Read and execute migration
-    migration_dir = 'dbs/migrations'
-    for filename in sorted(os.listdir(migration_dir)):
-        if filename.endswith('.sql'):
-            filepath = os.path.join(migration_dir, filename)
-            print(f'Running {filename}...')
-            with open(filepath, 'r') as f:
-                sql = f.read()
-                for statement in sql.split(';'):
-                    statement = statement.strip()
-                    if statement:
-                        try:
-                            cursor.execute(statement)
-                        except Exception as e:
-                            print(f'Warning: {e}')
-    conn.commit()
-    print('Schema created successfully!')
-else:
-    print('Database schema already exists.')
-
-cursor.close()
-conn.close()
-" 2>/dev/null || echo -e "${YELLOW}Migration check completed${NC}"
+    # Apply pending migrations (recorded in schema_migrations). An existing
+    # database without history needs a one-off: python3 dbs/migrate.py up --baseline <version>
+    if ! python3 dbs/migrate.py up; then
+        echo -e "${RED}Migrations not applied - see output above (starting anyway)${NC}"
     fi
 
     echo -e "${GREEN}Migrations complete!${NC}"
@@ -199,8 +174,14 @@ start_app() {
     cd /app
 
     if [ "$APP_ENV" = "production" ]; then
+        # Per-worker metric files for /metrics; stale files from a previous run are removed
+        export PROMETHEUS_MULTIPROC_DIR="${PROMETHEUS_MULTIPROC_DIR:-/tmp/y6-metrics}"
+        rm -rf "$PROMETHEUS_MULTIPROC_DIR"
+        mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
+
         # Production mode with gunicorn
         exec gunicorn --bind 0.0.0.0:5001 \
+            --config docker/gunicorn.conf.py \
             --workers ${WORKERS:-2} \
             --threads ${THREADS:-4} \
             --timeout 120 \
@@ -261,6 +242,9 @@ case "${1:-serve}" in
         # Check for updates
         check_updates
 
+        # Rebuild static assets (pulled updates may have changed them)
+        build_assets
+
         # Wait for database
         wait_for_db || exit 1
 
@@ -302,11 +286,20 @@ case "${1:-serve}" in
         export_questions
         ;;
 
+    reap)
+        # Delete expired sessions, OTPs and magic links now (also runs in-process)
+        load_config
+        wait_for_db || exit 1
+        cd /app
+        python3 tools/reap_tokens.py "${@:2}"
+        ;;
+
     update)
         echo -e "${YELLOW}Forcing update from GitHub...${NC}"
         load_config
         AUTO_UPDATE=true
         check_updates
+        build_assets
         ;;
 
     shell)
@@ -323,6 +316,8 @@ case "${1:-serve}" in
         echo "  import    - Import questions from JSON/CSV files"
         echo "              Usage: import [dir] [subject] [--clear]"
         echo "  export    - Export questions to JSON/CSV files"
+        echo "  reap      - Delete expired sessions, OTPs and magic links"
+        echo "              Usage: reap [--dry-run] [--batch-size N]"
         echo "  update    - Pull updates from GitHub"
         echo "  shell     - Open a bash shell"
         echo "  help      - Show this help message"
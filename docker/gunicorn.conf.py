@@ -0,0 +1,13 @@
+"""
+Gunicorn hooks for the Y6 Practice Exam System
+Command-line options in docker/entrypoint.sh take precedence over this file.
+"""
+
+
+def child_exit(server, worker):
+    """Drop a dead worker's live gauges from the multiprocess metrics"""
+    try:
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
+    except ImportError:
+        pass
@@ -17,6 +17,12 @@ sys.path.insert(0, str(PROJECT_ROOT / "dbs"))
 from src.core.auth import login_required, role_required, AuditLogger, UserManager, PasswordManager, get_client_ip
 from src.core.pagination import Paginator, paginate_query
 from src.core.cache import get_cache, cache_key
+from src.core.dashboard import DashboardSnapshot
+from src.core.student_stats import StudentStats
+from src.core.leaderboard import Leaderboard
+from src.core.exam_search import ExamSearch
+from src.core.catalog import get_active_subjects
+from src.core.share_cache import SharePages, ShareViews
 from dbs.connection import get_connection
 
 admin_bp = Blueprint('admin', __name__, url_prefix='/admin')
@@ -32,26 +38,13 @@ def get_base_url():
 @role_required('Admin')
 def dashboard():
     """Admin dashboard with overview stats"""
+    # Counters come from the shared snapshot; only the lists hit the database
+    stats = DashboardSnapshot.get()
+
     conn = get_connection()
     cursor = conn.cursor(dictionary=True)
 
     try:
-        # Get stats
-        cursor.execute("SELECT COUNT(*) as count FROM users WHERE role_id = 2 AND is_active = TRUE")
-        student_count = cursor.fetchone()['count']
-
-        cursor.execute("SELECT COUNT(*) as count FROM question_sets WHERE is_active = TRUE")
-        question_set_count = cursor.fetchone()['count']
-
-        cursor.execute("SELECT COUNT(*) as count FROM practice_exams WHERE status = 'submitted'")
-        pending_grading = cursor.fetchone()['count']
-
-        cursor.execute("SELECT COUNT(*) as count FROM practice_exams WHERE status = 'released'")
-        completed_exams = cursor.fetchone()['count']
-
-        cursor.execute("SELECT AVG(percentage) as avg FROM practice_exams WHERE status = 'released'")
-        avg_score = cursor.fetchone()['avg'] or 0
-
         # Recent submissions (including released ones)
         cursor.execute("""
             SELECT pe.*, u.full_name as student_name, qs.title as exam_title, s.name as subject_name
@@ -95,11 +88,11 @@ def dashboard():
                 deadline['deadline'] = deadline['deadline'].strftime('%d %b %Y %H:%M')
 
         return render_template('admin/dashboard.html',
-                             student_count=student_count,
-                             question_set_count=question_set_count,
-                             pending_grading=pending_grading,
-                             completed_exams=completed_exams,
-                             avg_score=round(avg_score, 1),
+                             student_count=int(stats['total_students']),
+                             question_set_count=int(stats['total_question_sets']),
+                             pending_grading=int(stats['submitted']),
+                             completed_exams=int(stats['released']),
+                             avg_score=round(stats['avg_score'], 1),
                              recent_submissions=recent_submissions,
                              upcoming_deadlines=upcoming_deadlines,
                              user=request.current_user)
@@ -148,10 +141,11 @@ def students():
         # Data query
         cursor.execute(f"""
             SELECT u.*,
-                   (SELECT COUNT(*) FROM practice_exams WHERE student_id = u.id) as exam_count,
-                   (SELECT AVG(percentage) FROM practice_exams WHERE student_id = u.id AND status = 'released') as avg_score,
-                   (SELECT COUNT(*) FROM practice_exams WHERE student_id = u.id AND status = 'submitted') as pending_count
+                   COALESCE(ss.total_exams, 0) as exam_count,
+                   ss.avg_percentage as avg_score,
+                   COALESCE(ss.submitted_count, 0) as pending_count
             FROM users u
+            LEFT JOIN student_stats ss ON ss.student_id = u.id
             WHERE {where_sql}
             ORDER BY u.created_at DESC
             LIMIT %s OFFSET %s
@@ -205,6 +199,7 @@ def create_student():
 
         # Create student (role_id = 2)
         user_id = UserManager.create_user(email, password, full_name, role_id=2, created_by=request.current_user['id'])
+        DashboardSnapshot.invalidate()
 
         AuditLogger.log_action(request.current_user['id'], 'student_created',
                               resource_type='user', resource_id=str(user_id),
@@ -228,6 +223,8 @@ def toggle_student(student_id):
 
         cursor.execute("UPDATE users SET is_active = NOT is_active WHERE id = %s AND role_id = 2", (student_id,))
         conn.commit()
+        DashboardSnapshot.invalidate()
+        Leaderboard.invalidate()
 
         cursor.close()
         conn.close()
@@ -277,7 +274,7 @@ def get_student(student_id):
                 AVG(CASE WHEN status = 'released' THEN percentage ELSE NULL END) as avg_score,
                 MAX(CASE WHEN status = 'released' THEN percentage ELSE NULL END) as best_score,
                 MIN(CASE WHEN status = 'released' THEN percentage ELSE NULL END) as lowest_score
-            FROM practice_exams WHERE student_id = %s
+            FROM practice_exams_all WHERE student_id = %s
         """, (student_id,))
         stats = cursor.fetchone()
 
@@ -289,7 +286,7 @@ def get_student(student_id):
                 COUNT(*) as exam_count,
                 AVG(pe.percentage) as avg_score,
                 MAX(pe.percentage) as best_score
-            FROM practice_exams pe
+            FROM practice_exams_all pe
             JOIN question_sets qs ON pe.question_set_id = qs.id
             JOIN subjects s ON qs.subject_id = s.id
             WHERE pe.student_id = %s AND pe.status = 'released'
@@ -302,7 +299,7 @@ def get_student(student_id):
         cursor.execute("""
             SELECT pe.id, pe.status, pe.exam_date, pe.percentage,
                    qs.title as exam_title, s.name as subject_name, s.code as subject_code
-            FROM practice_exams pe
+            FROM practice_exams_all pe
             JOIN question_sets qs ON pe.question_set_id = qs.id
             JOIN subjects s ON qs.subject_id = s.id
             WHERE pe.student_id = %s
@@ -498,7 +495,6 @@ def exams():
     cursor = conn.cursor(dictionary=True)
 
     # Get query params
-    page = int(request.args.get('page', 1))
     per_page = int(request.args.get('per_page', 20))
     search = request.args.get('search', '').strip()
     subject_id = request.args.get('subject', '')
@@ -506,51 +502,16 @@ def exams():
 
     try:
         # Get subjects for filter
-        cursor.execute("SELECT * FROM subjects WHERE is_active = TRUE ORDER BY name")
-        subjects = cursor.fetchall()
-
-        # Build query
-        where_clauses = ["1=1"]
-        params = []
+        subjects = get_active_subjects()
 
-        if search:
-            where_clauses.append("(qs.title LIKE %s OR u.full_name LIKE %s)")
-            params.extend([f'%{search}%', f'%{search}%'])
-
-        if subject_id:
-            where_clauses.append("qs.subject_id = %s")
-            params.append(subject_id)
-
-        if status != 'all':
-            where_clauses.append("pe.status = %s")
-            params.append(status)
-
-        where_sql = " AND ".join(where_clauses)
-
-        # Count
-        cursor.execute(f"""
-            SELECT COUNT(*) as count FROM practice_exams pe
-            JOIN question_sets qs ON pe.question_set_id = qs.id
-            JOIN users u ON pe.student_id = u.id
-            WHERE {where_sql}
-        """, params)
-        total = cursor.fetchone()['count']
-
-        paginator = Paginator(total, page, per_page)
-
-        # Get exams
-        cursor.execute(f"""
-            SELECT pe.*, u.full_name as student_name, u.email as student_email,
-                   qs.title as exam_title, s.name as subject_name, s.code as subject_code
-            FROM practice_exams pe
-            JOIN users u ON pe.student_id = u.id
-            JOIN question_sets qs ON pe.question_set_id = qs.id
-            JOIN subjects s ON qs.subject_id = s.id
-            WHERE {where_sql}
-            ORDER BY pe.created_at DESC
-            LIMIT %s OFFSET %s
-        """, params + [paginator.limit, paginator.offset])
-        exams = cursor.fetchall()
+        # Newest exams, keyset-paginated, plus facet counts
+        try:
+            filters = ExamSearch.parse_filters(request.args)
+            exams, next_cursor = ExamSearch.page(filters, request.args.get('after'), per_page)
+        except ValueError:
+            filters = {}
+            exams, next_cursor = ExamSearch.page(filters, limit=per_page)
+        facets = ExamSearch.facets(filters)
 
         now = datetime.now()
         for exam in exams:
@@ -591,7 +552,9 @@ def exams():
                              subjects=subjects,
                              question_sets=question_sets,
                              students=students_list,
-                             pagination=paginator.to_dict(),
+                             facets=facets,
+                             filters=filters,
+                             next_cursor=next_cursor,
                              search=search,
                              selected_subject=subject_id,
                              selected_status=status,
@@ -666,9 +629,12 @@ def assign_exam():
                 INSERT INTO practice_exams (student_id, question_set_id, exam_date, scheduled_at, deadline, max_score, status)
                 VALUES (%s, %s, %s, %s, %s, %s, 'pending')
             """, (student_id, question_set_id, exam_date, scheduled_at, deadline if deadline else None, max_score))
+            exam_id = cursor.lastrowid
+            StudentStats.refresh(cursor, student_id)
 
             conn.commit()
-            exam_id = cursor.lastrowid
+            DashboardSnapshot.exam_created()
+            ExamSearch.invalidate_facets()
 
             # Send email with magic link if enabled
             email_sent = False
@@ -730,8 +696,7 @@ def question_sets():
 
     try:
         # Get subjects
-        cursor.execute("SELECT * FROM subjects WHERE is_active = TRUE ORDER BY name")
-        subjects = cursor.fetchall()
+        subjects = get_active_subjects()
 
         # Build query
         where_clauses = ["qs.is_active = TRUE"]
@@ -926,6 +891,9 @@ def grade_exam(exam_id):
         if exam['exam_date']:
             exam['exam_date'] = exam['exam_date'].strftime('%d %b %Y')
 
+        if exam['share_token']:
+            exam['share_views'] = (exam['share_views'] or 0) + ShareViews.pending('exam', exam_id)
+
         return render_template('admin/grade_exam.html',
                              exam=exam,
                              questions=questions,
@@ -948,6 +916,16 @@ def save_grades(exam_id):
         cursor = conn.cursor(dictionary=True)
 
         try:
+            # Everything Leaderboard.remove_result needs if this regrades a released exam
+            cursor.execute("""
+                SELECT pe.student_id, pe.status, pe.percentage, pe.share_token, pe.question_set_id,
+                       pe.total_score, pe.released_at, qs.subject_id
+                FROM practice_exams pe
+                JOIN question_sets qs ON pe.question_set_id = qs.id
+                WHERE pe.id = %s
+            """, (exam_id,))
+            previous = cursor.fetchone()
+
             total_score = 0
 
             for grade in grades:
@@ -987,8 +965,19 @@ def save_grades(exam_id):
                 WHERE id = %s
             """, (total_score, request.current_user['id'], exam_id))
 
+            if previous:
+                StudentStats.refresh(cursor, previous['student_id'])
+
             conn.commit()
 
+            if previous:
+                DashboardSnapshot.exam_status_changed(previous['status'], 'grading', previous['percentage'])
+                ExamSearch.invalidate_facets()
+                SharePages.invalidate('exam', previous['share_token'])
+                # Back to 'grading': release_results adds it again on re-release
+                if previous['status'] == 'released':
+                    Leaderboard.remove_result(previous)
+
             return jsonify({'success': True, 'message': 'Grades saved', 'total_score': total_score}), 200
 
         finally:
@@ -1023,7 +1012,8 @@ def release_results(exam_id):
 
             # Get exam and student info
             cursor.execute("""
-                SELECT pe.*, u.email as student_email, u.full_name as student_name, qs.title as exam_title
+                SELECT pe.*, u.email as student_email, u.full_name as student_name, qs.title as exam_title,
+                       qs.subject_id
                 FROM practice_exams pe
                 JOIN users u ON pe.student_id = u.id
                 JOIN question_sets qs ON pe.question_set_id = qs.id
@@ -1042,8 +1032,19 @@ def release_results(exam_id):
                 WHERE id = %s
             """, (total_score, percentage, exam_id))
 
+            if exam:
+                StudentStats.refresh(cursor, exam['student_id'])
+
             conn.commit()
 
+            if exam:
+                DashboardSnapshot.exam_status_changed(exam['status'], 'released', exam['percentage'], percentage)
+                ExamSearch.invalidate_facets()
+                SharePages.invalidate('exam', exam['share_token'])
+                if exam['status'] == 'released':
+                    Leaderboard.remove_result(exam)
+                Leaderboard.add_result(exam, percentage, total_score)
+
             # Send email notification
             email_sent = False
             if send_email and exam['student_email']:
@@ -1089,7 +1090,7 @@ def release_results(exam_id):
 @role_required('Admin')
 def reports():
     """View student reports with pagination"""
-    conn = get_connection()
+    conn = get_connection(readonly=True)
     cursor = conn.cursor(dictionary=True)
 
     page = int(request.args.get('page', 1))
@@ -1105,14 +1106,13 @@ def reports():
         # Get performance by student
         cursor.execute("""
             SELECT u.id, u.full_name, u.email,
-                   COUNT(pe.id) as total_exams,
-                   AVG(pe.percentage) as avg_score,
-                   MAX(pe.percentage) as best_score,
-                   MIN(pe.percentage) as lowest_score
+                   COALESCE(ss.released_count, 0) as total_exams,
+                   ss.avg_percentage as avg_score,
+                   ss.best_percentage as best_score,
+                   ss.lowest_percentage as lowest_score
             FROM users u
-            LEFT JOIN practice_exams pe ON pe.student_id = u.id AND pe.status = 'released'
+            LEFT JOIN student_stats ss ON ss.student_id = u.id
             WHERE u.role_id = 2 AND u.is_active = TRUE
-            GROUP BY u.id, u.full_name, u.email
             ORDER BY avg_score DESC
             LIMIT %s OFFSET %s
         """, (paginator.limit, paginator.offset))
@@ -1125,7 +1125,7 @@ def reports():
                    AVG(pe.percentage) as avg_score
             FROM subjects s
             LEFT JOIN question_sets qs ON qs.subject_id = s.id
-            LEFT JOIN practice_exams pe ON pe.question_set_id = qs.id AND pe.status = 'released'
+            LEFT JOIN practice_exams_all pe ON pe.question_set_id = qs.id AND pe.status = 'released'
             GROUP BY s.id, s.name, s.code
             ORDER BY s.name
         """)
@@ -1146,7 +1146,7 @@ def reports():
 @role_required('Admin')
 def audit_logs():
     """View audit logs with pagination and filters"""
-    conn = get_connection()
+    conn = get_connection(readonly=True)
     cursor = conn.cursor(dictionary=True)
 
     page = int(request.args.get('page', 1))
@@ -1217,6 +1217,48 @@ def audit_logs():
         conn.close()
 
 
+@admin_bp.route('/profiles')
+@role_required('Admin')
+def profiles():
+    """Captured request profiles"""
+    from config import PROFILER_ENABLED, PROFILE_SAMPLE_RATE, PROFILE_TOKEN_MAX_AGE
+    from src.core.profiler import list_profiles, PROFILE_HEADER
+
+    return render_template('admin/profiles.html',
+                         profiles=list_profiles(),
+                         profiler_enabled=PROFILER_ENABLED,
+                         sample_rate=PROFILE_SAMPLE_RATE,
+                         token_minutes=PROFILE_TOKEN_MAX_AGE // 60,
+                         profile_header=PROFILE_HEADER,
+                         user=request.current_user)
+
+
+@admin_bp.route('/profiles/<name>')
+@role_required('Admin')
+def download_profile(name):
+    """Download a profile (open it in https://www.speedscope.app)"""
+    from flask import send_from_directory, abort
+    from config import PROFILE_DIR
+    from src.core.profiler import is_profile_name
+
+    if not is_profile_name(name):
+        abort(404)
+
+    return send_from_directory(PROFILE_DIR, name, as_attachment=True, mimetype='application/json')
+
+
+@admin_bp.route('/profiles/token', methods=['POST'])
+@role_required('Admin')
+def profile_token():
+    """Create a signed token that enables profiling for requests sending it"""
+    from src.core.profiler import create_profile_token
+
+    admin_id = request.current_user['id']
+    AuditLogger.log_action(admin_id, 'profile_token_created', ip_address=get_client_ip())
+
+    return jsonify({'success': True, 'token': create_profile_token(admin_id)}), 200
+
+
 @admin_bp.route('/search')
 @role_required('Admin')
 def global_search():
@@ -1382,6 +1424,7 @@ def update_exam_schedule(exam_id):
                 WHERE id = %s
             """, (exam_date, scheduled_at, exam_id))
             conn.commit()
+            ExamSearch.invalidate_facets()
 
             # Format for display
             from datetime import datetime
@@ -1413,7 +1456,8 @@ def reset_exam(exam_id):
         try:
             # Get exam info
             cursor.execute("""
-                SELECT pe.*, u.full_name as student_name, u.email as student_email, qs.title as exam_title
+                SELECT pe.*, u.full_name as student_name, u.email as student_email, qs.title as exam_title,
+                       qs.subject_id
                 FROM practice_exams pe
                 JOIN users u ON pe.student_id = u.id
                 JOIN question_sets qs ON pe.question_set_id = qs.id
@@ -1446,8 +1490,16 @@ def reset_exam(exam_id):
                 WHERE id = %s
             """, (exam_id,))
 
+            StudentStats.refresh(cursor, exam['student_id'])
+
             conn.commit()
 
+            DashboardSnapshot.exam_status_changed(exam['status'], 'pending', exam['percentage'])
+            ExamSearch.invalidate_facets()
+            SharePages.invalidate('exam', exam['share_token'])
+            if exam['status'] == 'released':
+                Leaderboard.remove_result(exam)
+
             AuditLogger.log_action(request.current_user['id'], 'exam_reset',
                                   resource_type='practice_exam', resource_id=str(exam_id),
                                   details={
@@ -1477,94 +1529,43 @@ def reset_exam(exam_id):
 @admin_bp.route('/exams/filter')
 @role_required('Admin')
 def exams_filter():
-    """Filter exams with multiple criteria - AJAX endpoint"""
-    conn = get_connection()
-    cursor = conn.cursor(dictionary=True)
-
+    """Filter exams with multiple criteria - AJAX endpoint (keyset pages + facet counts)"""
     try:
-        # Get filter params
-        subject_id = request.args.get('subject', '')
-        student_id = request.args.get('student', '')
-        status = request.args.get('status', '')
-        date_from = request.args.get('date_from', '')
-        date_to = request.args.get('date_to', '')
-        search = request.args.get('search', '').strip()
-
-        # Build query
-        where_clauses = ["1=1"]
-        params = []
-
-        if subject_id:
-            where_clauses.append("qs.subject_id = %s")
-            params.append(subject_id)
-
-        if student_id:
-            where_clauses.append("pe.student_id = %s")
-            params.append(student_id)
-
-        if status:
-            where_clauses.append("pe.status = %s")
-            params.append(status)
-
-        if date_from:
-            where_clauses.append("pe.exam_date >= %s")
-            params.append(date_from)
-
-        if date_to:
-            where_clauses.append("pe.exam_date <= %s")
-            params.append(date_to)
-
-        if search:
-            where_clauses.append("(qs.title LIKE %s OR u.full_name LIKE %s)")
-            params.extend([f'%{search}%', f'%{search}%'])
-
-        where_sql = " AND ".join(where_clauses)
-
-        # Get filtered exams
-        cursor.execute(f"""
-            SELECT pe.id, pe.status, pe.exam_date, pe.deadline, pe.scheduled_at,
-                   u.full_name as student_name, u.id as student_id,
-                   qs.title as exam_title, qs.id as question_set_id,
-                   s.name as subject_name, s.code as subject_code, s.id as subject_id
-            FROM practice_exams pe
-            JOIN users u ON pe.student_id = u.id
-            JOIN question_sets qs ON pe.question_set_id = qs.id
-            JOIN subjects s ON qs.subject_id = s.id
-            WHERE {where_sql}
-            ORDER BY pe.created_at DESC
-            LIMIT 100
-        """, params)
-        exams = cursor.fetchall()
-
-        # Format dates and calculate display status
-        now = datetime.now()
-        for exam in exams:
-            # Calculate display status for pending exams
-            exam['display_status'] = exam['status']
-            if exam['status'] == 'pending' and exam.get('scheduled_at'):
-                scheduled = exam['scheduled_at']
-                if scheduled > now:
-                    time_until = (scheduled - now).total_seconds()
-                    if time_until <= 3600:  # Within 1 hour
-                        exam['display_status'] = 'soon'
-                    else:
-                        exam['display_status'] = 'scheduled'
-
-            # Format dates for JSON
-            if exam['exam_date']:
-                exam['exam_date'] = exam['exam_date'].strftime('%d %b %Y')
-            if exam['scheduled_at']:
-                exam['scheduled_time'] = exam['scheduled_at'].strftime('%H:%M')
-                exam['scheduled_at'] = exam['scheduled_at'].strftime('%d %b %Y %H:%M')
-            if exam['deadline']:
-                exam['deadline'] = exam['deadline'].strftime('%d %b %Y %H:%M')
+        filters = ExamSearch.parse_filters(request.args)
+        limit = int(request.args.get('limit', 20))
+        exams, next_cursor = ExamSearch.page(filters, request.args.get('after'), limit)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': f'Invalid filter: {e}'}), 400
+
+    facets = ExamSearch.facets(filters)
+
+    # Format dates and calculate display status
+    now = datetime.now()
+    for exam in exams:
+        # Calculate display status for pending exams
+        exam['display_status'] = exam['status']
+        if exam['status'] == 'pending' and exam.get('scheduled_at'):
+            scheduled = exam['scheduled_at']
+            if scheduled > now:
+                time_until = (scheduled - now).total_seconds()
+                if time_until <= 3600:  # Within 1 hour
+                    exam['display_status'] = 'soon'
+                else:
+                    exam['display_status'] = 'scheduled'
 
-        return jsonify({
-            'success': True,
-            'exams': exams,
-            'count': len(exams)
-        }), 200
+        # Format dates for JSON
+        if exam['exam_date']:
+            exam['exam_date'] = exam['exam_date'].strftime('%d %b %Y')
+        if exam['scheduled_at']:
+            exam['scheduled_time'] = exam['scheduled_at'].strftime('%H:%M')
+            exam['scheduled_at'] = exam['scheduled_at'].strftime('%d %b %Y %H:%M')
+        if exam['deadline']:
+            exam['deadline'] = exam['deadline'].strftime('%d %b %Y %H:%M')
 
-    finally:
-        cursor.close()
-        conn.close()
+    return jsonify({
+        'success': True,
+        'exams': exams,
+        'count': facets['total'],
+        'facets': facets,
+        'next_cursor': next_cursor
+    }), 200
@@ -15,12 +15,22 @@ sys.path.insert(0, str(PROJECT_ROOT / "src" / "core"))
 sys.path.insert(0, str(PROJECT_ROOT / "dbs"))
 
 from src.core.auth import role_required
-from src.core.cache import get_cache, cache_key, CACHE_TTL
+from src.core.cache import cached
+from src.core.dashboard import DashboardSnapshot
+from src.core.leaderboard import Leaderboard
+from src.core.http_cache import tag_json
 from dbs.connection import get_connection
+from config import HTTP_API_MAX_AGE
 
 analytics_bp = Blueprint('analytics', __name__, url_prefix='/analytics')
 
 
+@analytics_bp.after_request
+def tag_api_responses(response):
+    """ETag the chart JSON so dashboard refreshes get 304s while the server-side cache holds"""
+    return tag_json(response, HTTP_API_MAX_AGE)
+
+
 @analytics_bp.route('/')
 @role_required('Admin')
 def dashboard():
@@ -32,75 +42,25 @@ def dashboard():
 @role_required('Admin')
 def api_overview():
     """Get overview statistics"""
-    cache = get_cache()
-    key = cache_key('analytics', 'overview')
-
-    # Check cache
-    cached = cache.get(key)
-    if cached:
-        return jsonify(cached)
-
-    conn = get_connection()
-    cursor = conn.cursor(dictionary=True)
-
-    try:
-        # Total stats
-        cursor.execute("""
-            SELECT
-                (SELECT COUNT(*) FROM users WHERE role_id = 2 AND is_active = TRUE) as total_students,
-                (SELECT COUNT(*) FROM question_sets WHERE is_active = TRUE) as total_question_sets,
-                (SELECT COUNT(*) FROM questions WHERE is_active = TRUE) as total_questions,
-                (SELECT COUNT(*) FROM practice_exams) as total_exams,
-                (SELECT COUNT(*) FROM practice_exams WHERE status = 'released') as completed_exams,
-                (SELECT COUNT(*) FROM practice_exams WHERE status = 'submitted') as pending_grading,
-                (SELECT AVG(percentage) FROM practice_exams WHERE status = 'released') as avg_score
-        """)
-        stats = cursor.fetchone()
-
-        # This week's activity
-        cursor.execute("""
-            SELECT COUNT(*) as count FROM practice_exams
-            WHERE created_at >= DATE_SUB(NOW(), INTERVAL 7 DAY)
-        """)
-        week_exams = cursor.fetchone()['count']
-
-        # Last week comparison
-        cursor.execute("""
-            SELECT COUNT(*) as count FROM practice_exams
-            WHERE created_at >= DATE_SUB(NOW(), INTERVAL 14 DAY)
-            AND created_at < DATE_SUB(NOW(), INTERVAL 7 DAY)
-        """)
-        last_week = cursor.fetchone()['count']
-
-        result = {
-            'total_students': stats['total_students'] or 0,
-            'total_question_sets': stats['total_question_sets'] or 0,
-            'total_questions': stats['total_questions'] or 0,
-            'total_exams': stats['total_exams'] or 0,
-            'completed_exams': stats['completed_exams'] or 0,
-            'pending_grading': stats['pending_grading'] or 0,
-            'avg_score': round(stats['avg_score'] or 0, 1),
-            'week_exams': week_exams,
-            'week_change': week_exams - last_week
-        }
-
-        # Cache for 5 minutes
-        cache.set(key, result, 300)
-
-        return jsonify(result)
-
-    finally:
-        cursor.close()
-        conn.close()
-
-
-@analytics_bp.route('/api/performance-trend')
-@role_required('Admin')
-def api_performance_trend():
-    """Get performance trend over time"""
-    days = int(request.args.get('days', 30))
-
-    conn = get_connection()
+    stats = DashboardSnapshot.get()
+
+    return jsonify({
+        'total_students': int(stats['total_students']),
+        'total_question_sets': int(stats['total_question_sets']),
+        'total_questions': int(stats['total_questions']),
+        'total_exams': int(stats['total_exams']),
+        'completed_exams': int(stats['released']),
+        'pending_grading': int(stats['submitted']),
+        'avg_score': round(stats['avg_score'], 1),
+        'week_exams': int(stats['week_exams']),
+        'week_change': int(stats['week_exams'] - stats['last_week_exams'])
+    })
+
+
+@cached('analytics', ttl=300)
+def performance_trend(days: int):
+    """Daily released-exam counts and average scores"""
+    conn = get_connection(readonly=True)
     cursor = conn.cursor(dictionary=True)
 
     try:
@@ -109,7 +69,7 @@ def api_performance_trend():
                 DATE(released_at) as date,
                 COUNT(*) as exams,
                 AVG(percentage) as avg_score
-            FROM practice_exams
+            FROM practice_exams_all
             WHERE status = 'released'
             AND released_at >= DATE_SUB(NOW(), INTERVAL %s DAY)
             GROUP BY DATE(released_at)
@@ -120,21 +80,28 @@ def api_performance_trend():
         result = {
             'labels': [d['date'].strftime('%d %b') for d in data],
             'exams': [d['exams'] for d in data],
-            'scores': [round(d['avg_score'] or 0, 1) for d in data]
+            'scores': [round(float(d['avg_score'] or 0), 1) for d in data]
         }
 
-        return jsonify(result)
+        return result
 
     finally:
         cursor.close()
         conn.close()
 
 
-@analytics_bp.route('/api/subject-performance')
+@analytics_bp.route('/api/performance-trend')
 @role_required('Admin')
-def api_subject_performance():
-    """Get performance breakdown by subject"""
-    conn = get_connection()
+def api_performance_trend():
+    """Get performance trend over time"""
+    days = int(request.args.get('days', 30))
+    return jsonify(performance_trend(days))
+
+
+@cached('analytics', ttl=300)
+def subject_performance():
+    """Released-exam scores per subject"""
+    conn = get_connection(readonly=True)
     cursor = conn.cursor(dictionary=True)
 
     try:
@@ -148,7 +115,7 @@ def api_subject_performance():
                 MIN(pe.percentage) as lowest_score
             FROM subjects s
             LEFT JOIN question_sets qs ON qs.subject_id = s.id
-            LEFT JOIN practice_exams pe ON pe.question_set_id = qs.id AND pe.status = 'released'
+            LEFT JOIN practice_exams_all pe ON pe.question_set_id = qs.id AND pe.status = 'released'
             WHERE s.is_active = TRUE
             GROUP BY s.id, s.name, s.code
             ORDER BY s.name
@@ -159,23 +126,29 @@ def api_subject_performance():
             'subjects': [d['subject'] for d in data],
             'codes': [d['code'] for d in data],
             'total_exams': [d['total_exams'] or 0 for d in data],
-            'avg_scores': [round(d['avg_score'] or 0, 1) for d in data],
-            'best_scores': [round(d['best_score'] or 0, 1) for d in data],
-            'lowest_scores': [round(d['lowest_score'] or 0, 1) for d in data]
+            'avg_scores': [round(float(d['avg_score'] or 0), 1) for d in data],
+            'best_scores': [round(float(d['best_score'] or 0), 1) for d in data],
+            'lowest_scores': [round(float(d['lowest_score'] or 0), 1) for d in data]
         }
 
-        return jsonify(result)
+        return result
 
     finally:
         cursor.close()
         conn.close()
 
 
-@analytics_bp.route('/api/question-type-stats')
+@analytics_bp.route('/api/subject-performance')
 @role_required('Admin')
-def api_question_type_stats():
-    """Get statistics by question type"""
-    conn = get_connection()
+def api_subject_performance():
+    """Get performance breakdown by subject"""
+    return jsonify(subject_performance())
+
+
+@cached('analytics', ttl=300)
+def question_type_stats():
+    """Answer counts and accuracy per question type"""
+    conn = get_connection(readonly=True)
     cursor = conn.cursor(dictionary=True)
 
     try:
@@ -187,7 +160,7 @@ def api_question_type_stats():
                 SUM(CASE WHEN sa.is_correct = TRUE THEN 1 ELSE 0 END) as correct_count,
                 AVG(CASE WHEN sa.marks_awarded IS NOT NULL THEN sa.marks_awarded / q.marks * 100 END) as avg_score
             FROM questions q
-            LEFT JOIN student_answers sa ON sa.question_id = q.id
+            LEFT JOIN answer_results_all sa ON sa.question_id = q.id
             WHERE q.is_active = TRUE
             GROUP BY q.question_type
         """)
@@ -197,24 +170,51 @@ def api_question_type_stats():
             'types': [d['question_type'] for d in data],
             'counts': [d['question_count'] for d in data],
             'answers': [d['answer_count'] or 0 for d in data],
-            'correct': [d['correct_count'] or 0 for d in data],
-            'accuracy': [round(d['avg_score'] or 0, 1) for d in data]
+            'correct': [int(d['correct_count'] or 0) for d in data],
+            'accuracy': [round(float(d['avg_score'] or 0), 1) for d in data]
         }
 
-        return jsonify(result)
+        return result
 
     finally:
         cursor.close()
         conn.close()
 
 
+@analytics_bp.route('/api/question-type-stats')
+@role_required('Admin')
+def api_question_type_stats():
+    """Get statistics by question type"""
+    return jsonify(question_type_stats())
+
+
 @analytics_bp.route('/api/student-leaderboard')
 @role_required('Admin')
 def api_student_leaderboard():
-    """Get student leaderboard"""
+    """Get student leaderboard (overall, ?subject_id=, ?question_set_id= or ?window=7d|30d)"""
     limit = int(request.args.get('limit', 10))
+    subject_id = request.args.get('subject_id', type=int)
+    question_set_id = request.args.get('question_set_id', type=int)
+    window = request.args.get('window', '')
+
+    if window in Leaderboard.WINDOWS:
+        board = window
+    elif question_set_id:
+        board = f'set:{question_set_id}'
+    elif subject_id:
+        board = f'subject:{subject_id}'
+    else:
+        board = 'overall'
+
+    result = Leaderboard.top(board, limit)
+    if result is not None:
+        return jsonify(result)
+
+    # Redis unavailable or boards rebuilding - overall ranking from student_stats
+    if board != 'overall':
+        return jsonify([])
 
-    conn = get_connection()
+    conn = get_connection(readonly=True)
     cursor = conn.cursor(dictionary=True)
 
     try:
@@ -222,16 +222,14 @@ def api_student_leaderboard():
             SELECT
                 u.id,
                 u.full_name,
-                COUNT(pe.id) as total_exams,
-                AVG(pe.percentage) as avg_score,
-                MAX(pe.percentage) as best_score,
-                SUM(pe.total_score) as total_points
-            FROM users u
-            LEFT JOIN practice_exams pe ON pe.student_id = u.id AND pe.status = 'released'
-            WHERE u.role_id = 2 AND u.is_active = TRUE
-            GROUP BY u.id, u.full_name
-            HAVING total_exams > 0
-            ORDER BY avg_score DESC
+                ss.released_count as total_exams,
+                ss.avg_percentage as avg_score,
+                ss.best_percentage as best_score,
+                ss.total_points
+            FROM student_stats ss
+            JOIN users u ON u.id = ss.student_id
+            WHERE u.role_id = 2 AND u.is_active = TRUE AND ss.released_count > 0
+            ORDER BY ss.avg_percentage DESC
             LIMIT %s
         """, (limit,))
         data = cursor.fetchall()
@@ -259,7 +257,7 @@ def api_recent_activity():
     """Get recent exam activity"""
     limit = int(request.args.get('limit', 20))
 
-    conn = get_connection()
+    conn = get_connection(readonly=True)
     cursor = conn.cursor(dictionary=True)
 
     try:
@@ -303,11 +301,10 @@ def api_recent_activity():
         conn.close()
 
 
-@analytics_bp.route('/api/difficulty-analysis')
-@role_required('Admin')
-def api_difficulty_analysis():
-    """Analyze question difficulty based on success rate"""
-    conn = get_connection()
+@cached('analytics', ttl=300)
+def difficulty_analysis():
+    """Hardest and easiest questions by success rate"""
+    conn = get_connection(readonly=True)
     cursor = conn.cursor(dictionary=True)
 
     try:
@@ -325,7 +322,7 @@ def api_difficulty_analysis():
             FROM questions q
             JOIN question_sets qs ON q.question_set_id = qs.id
             JOIN subjects s ON qs.subject_id = s.id
-            LEFT JOIN student_answers sa ON sa.question_id = q.id
+            LEFT JOIN answer_results_all sa ON sa.question_id = q.id
             WHERE q.is_active = TRUE
             GROUP BY q.id, q.question_number, q.question_type, q.question_text, qs.title, s.name
             HAVING attempts > 0
@@ -348,7 +345,7 @@ def api_difficulty_analysis():
             FROM questions q
             JOIN question_sets qs ON q.question_set_id = qs.id
             JOIN subjects s ON qs.subject_id = s.id
-            LEFT JOIN student_answers sa ON sa.question_id = q.id
+            LEFT JOIN answer_results_all sa ON sa.question_id = q.id
             WHERE q.is_active = TRUE
             GROUP BY q.id
             HAVING attempts > 0
@@ -358,14 +355,22 @@ def api_difficulty_analysis():
         easiest = cursor.fetchall()
 
         for q in hardest + easiest:
+            q['correct'] = int(q['correct'] or 0)
             if q['success_rate']:
-                q['success_rate'] = round(q['success_rate'], 1)
+                q['success_rate'] = round(float(q['success_rate']), 1)
 
-        return jsonify({
+        return {
             'hardest': hardest,
             'easiest': easiest
-        })
+        }
 
     finally:
         cursor.close()
         conn.close()
+
+
+@analytics_bp.route('/api/difficulty-analysis')
+@role_required('Admin')
+def api_difficulty_analysis():
+    """Analyze question difficulty based on success rate"""
+    return jsonify(difficulty_analysis())
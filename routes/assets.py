@@ -0,0 +1,39 @@
+"""
+Y6 Practice Exam - Static Asset Routes
+Fingerprinted builds from tools/build_assets.py, cached by browsers for a year
+"""
+
+from flask import Blueprint, request, send_from_directory
+import mimetypes
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.core.assets import DIST_DIR
+from src.core.http_cache import cache_control
+from config import ASSET_MAX_AGE
+
+assets_bp = Blueprint('assets', __name__, url_prefix='/assets')
+
+# Precompressed variants in order of preference
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+
+@assets_bp.route('/<path:filename>')
+def serve(filename):
+    """Serve a built asset, precompressed when the browser accepts it"""
+    mimetype = mimetypes.guess_type(filename)[0]
+
+    for encoding, suffix in ENCODINGS:
+        if request.accept_encodings[encoding] and (DIST_DIR / (filename + suffix)).is_file():
+            response = send_from_directory(DIST_DIR, filename + suffix, mimetype=mimetype)
+            response.headers['Content-Encoding'] = encoding
+            break
+    else:
+        response = send_from_directory(DIST_DIR, filename, mimetype=mimetype)
+
+    # A built file never changes under its name, so there is nothing to revalidate
+    response.vary.add('Accept-Encoding')
+    return cache_control(response, ASSET_MAX_AGE, private=False, immutable=True)
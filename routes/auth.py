@@ -187,10 +187,12 @@ def logout():
         if request.method == 'GET':
             response = make_response(redirect(url_for('auth.login_page')))
             response.delete_cookie('session_token', path='/', samesite='Lax')
+            response.headers['Clear-Site-Data'] = '"cache"'  # Drop privately cached results pages
             return response
 
         response = make_response(jsonify({'success': True, 'message': 'Logged out successfully'}))
         response.delete_cookie('session_token', path='/', samesite='Lax')
+        response.headers['Clear-Site-Data'] = '"cache"'
 
         return response, 200
 
@@ -280,11 +282,11 @@ def magic_login(token):
             request.user_agent.string if request.user_agent else 'Magic Link'
         )
 
-        # Log the action
-        AuditLogger.log_action(user_id, 'magic_login',
-                              resource_type='practice_exam', resource_id=str(exam_id),
-                              details={'purpose': link_data['purpose']},
-                              ip_address=get_client_ip())
+        # Log the action (queued; the redirect doesn't wait for the INSERT)
+        AuditLogger.log_action_async(user_id, 'magic_login',
+                                     resource_type='practice_exam', resource_id=str(exam_id),
+                                     details={'purpose': link_data['purpose']},
+                                     ip_address=get_client_ip())
 
         # Update last login
         conn = get_connection()
@@ -328,30 +330,15 @@ def reset_password_page(token):
     from src.core.email import MagicLinkManager
 
     # Check if token is valid (without consuming it)
-    conn = get_connection()
-    cursor = conn.cursor(dictionary=True)
-
-    try:
-        cursor.execute("""
-            SELECT ml.*, u.full_name, u.email
-            FROM magic_links ml
-            JOIN users u ON ml.user_id = u.id
-            WHERE ml.token = %s AND ml.used_at IS NULL AND ml.expires_at > NOW()
-            AND ml.purpose = 'password_reset'
-        """, (token,))
-        link = cursor.fetchone()
-
-        if not link:
-            return render_template('auth/magic_expired.html'), 400
+    link = MagicLinkManager.peek_magic_link(token, 'password_reset')
 
-        return render_template('auth/reset_password.html',
-                             token=token,
-                             user_name=link['full_name'],
-                             user_email=link['email'])
+    if not link:
+        return render_template('auth/magic_expired.html'), 400
 
-    finally:
-        cursor.close()
-        conn.close()
+    return render_template('auth/reset_password.html',
+                         token=token,
+                         user_name=link['full_name'],
+                         user_email=link['email'])
 
 
 @auth_bp.route('/reset-password/<token>', methods=['POST'])
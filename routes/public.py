@@ -16,11 +16,21 @@ sys.path.insert(0, str(PROJECT_ROOT / "src" / "core"))
 sys.path.insert(0, str(PROJECT_ROOT / "dbs"))
 
 from src.core.auth import login_required, AuditLogger, get_client_ip
+from src.core.token_filter import TokenFilter
+from src.core.share_cache import SharePages, ShareViews
+from src.core.http_cache import not_modified, with_etag
+from config import HTTP_SHARE_MAX_AGE
 from dbs.connection import get_connection
 
 public_bp = Blueprint('public', __name__, url_prefix='/share')
 
 
+def _share_response(page):
+    """Cached share page, or 304 if the browser already has it"""
+    return (not_modified(page['etag'], HTTP_SHARE_MAX_AGE, private=False)
+            or with_etag(page['html'], page['etag'], HTTP_SHARE_MAX_AGE, private=False))
+
+
 def generate_share_token():
     """Generate a unique share token"""
     return secrets.token_urlsafe(16)
@@ -29,6 +39,14 @@ def generate_share_token():
 @public_bp.route('/exam/<token>')
 def view_shared_exam(token):
     """View a publicly shared exam result"""
+    if not TokenFilter.might_contain('share', token):
+        abort(404)
+
+    page = SharePages.get('exam', token)
+    if page:
+        ShareViews.hit('exam', page['id'])
+        return _share_response(page)
+
     conn = get_connection()
     cursor = conn.cursor(dictionary=True)
 
@@ -37,7 +55,7 @@ def view_shared_exam(token):
         cursor.execute("""
             SELECT pe.*, qs.title as exam_title, s.name as subject_name,
                    u.full_name as student_name, pe.share_token
-            FROM practice_exams pe
+            FROM practice_exams_all pe
             JOIN question_sets qs ON pe.question_set_id = qs.id
             JOIN subjects s ON qs.subject_id = s.id
             JOIN users u ON pe.student_id = u.id
@@ -56,7 +74,9 @@ def view_shared_exam(token):
         cursor.execute("""
             SELECT q.*, sa.student_answer, sa.is_correct, sa.marks_awarded
             FROM questions q
-            LEFT JOIN student_answers sa ON sa.question_id = q.id AND sa.practice_exam_id = %s
+            LEFT JOIN (
+                SELECT * FROM student_answers_all WHERE practice_exam_id = %s
+            ) sa ON sa.question_id = q.id
             WHERE q.question_set_id = %s AND q.is_active = TRUE
             ORDER BY q.question_number
         """, (exam['id'], exam['question_set_id']))
@@ -67,16 +87,15 @@ def view_shared_exam(token):
             if q['options']:
                 q['options'] = json.loads(q['options']) if isinstance(q['options'], str) else q['options']
 
-        # Increment view count
-        cursor.execute("""
-            UPDATE practice_exams SET share_views = COALESCE(share_views, 0) + 1 WHERE id = %s
-        """, (exam['id'],))
-        conn.commit()
+        html = render_template('public/shared_exam.html',
+                               exam=exam,
+                               questions=questions,
+                               is_public=True)
+        page = SharePages.put('exam', token, exam['id'], html)
 
-        return render_template('public/shared_exam.html',
-                             exam=exam,
-                             questions=questions,
-                             is_public=True)
+        # Counted in Redis, written to MySQL in batches
+        ShareViews.hit('exam', exam['id'])
+        return _share_response(page)
 
     finally:
         cursor.close()
@@ -86,6 +105,14 @@ def view_shared_exam(token):
 @public_bp.route('/question/<token>')
 def view_shared_question(token):
     """View a publicly shared question set"""
+    if not TokenFilter.might_contain('share', token):
+        abort(404)
+
+    page = SharePages.get('question_set', token)
+    if page:
+        ShareViews.hit('question_set', page['id'])
+        return _share_response(page)
+
     conn = get_connection()
     cursor = conn.cursor(dictionary=True)
 
@@ -117,16 +144,15 @@ def view_shared_question(token):
             if q['options']:
                 q['options'] = json.loads(q['options']) if isinstance(q['options'], str) else q['options']
 
-        # Increment view count
-        cursor.execute("""
-            UPDATE question_sets SET share_views = COALESCE(share_views, 0) + 1 WHERE id = %s
-        """, (question_set['id'],))
-        conn.commit()
+        html = render_template('public/shared_questions.html',
+                               question_set=question_set,
+                               questions=questions,
+                               is_public=True)
+        page = SharePages.put('question_set', token, question_set['id'], html)
 
-        return render_template('public/shared_questions.html',
-                             question_set=question_set,
-                             questions=questions,
-                             is_public=True)
+        # Counted in Redis, written to MySQL in batches
+        ShareViews.hit('question_set', question_set['id'])
+        return _share_response(page)
 
     finally:
         cursor.close()
@@ -166,7 +192,8 @@ def create_share_link():
                 if user['role_name'] != 'Admin' and exam['student_id'] != user['id']:
                     return jsonify({'success': False, 'error': 'Permission denied'}), 403
 
-                # Update exam with share token
+                # Update exam with share token (replacing any previous one)
+                previous_token = exam['share_token']
                 cursor.execute("""
                     UPDATE practice_exams
                     SET is_public = TRUE, share_token = %s, shared_at = NOW(), shared_by = %s
@@ -178,6 +205,10 @@ def create_share_link():
                 if request.current_user['role_name'] != 'Admin':
                     return jsonify({'success': False, 'error': 'Admin only'}), 403
 
+                cursor.execute("SELECT share_token FROM question_sets WHERE id = %s", (item_id,))
+                row = cursor.fetchone()
+                previous_token = row['share_token'] if row else None
+
                 cursor.execute("""
                     UPDATE question_sets
                     SET is_public = TRUE, share_token = %s, shared_at = NOW()
@@ -188,6 +219,8 @@ def create_share_link():
                 return jsonify({'success': False, 'error': 'Invalid share type'}), 400
 
             conn.commit()
+            TokenFilter.add('share', token)
+            SharePages.invalidate(share_type, previous_token)
 
             share_url = f"/share/{share_type.replace('_', '-')}/{token}"
 
@@ -228,7 +261,13 @@ def revoke_share():
         cursor = conn.cursor()
 
         try:
+            previous_token = None
+
             if share_type == 'exam':
+                cursor.execute("SELECT share_token FROM practice_exams WHERE id = %s", (item_id,))
+                row = cursor.fetchone()
+                previous_token = row[0] if row else None
+
                 cursor.execute("""
                     UPDATE practice_exams
                     SET is_public = FALSE, share_token = NULL
@@ -236,6 +275,10 @@ def revoke_share():
                 """, (item_id,))
 
             elif share_type == 'question_set':
+                cursor.execute("SELECT share_token FROM question_sets WHERE id = %s", (item_id,))
+                row = cursor.fetchone()
+                previous_token = row[0] if row else None
+
                 cursor.execute("""
                     UPDATE question_sets
                     SET is_public = FALSE, share_token = NULL
@@ -243,6 +286,7 @@ def revoke_share():
                 """, (item_id,))
 
             conn.commit()
+            SharePages.invalidate(share_type, previous_token)
 
             AuditLogger.log_action(request.current_user['id'], 'share_revoked',
                                   resource_type=share_type, resource_id=str(item_id),
@@ -18,11 +18,29 @@ sys.path.insert(0, str(PROJECT_ROOT / "dbs"))
 
 from src.core.auth import role_required, AuditLogger, get_client_ip
 from src.core.pagination import Paginator
+from src.core.pdf_export import exam_styles, question_flowables
+from src.core.http_cache import weak_etag, not_modified, with_etag
 from dbs.connection import get_connection
 
 questions_bp = Blueprint('questions', __name__, url_prefix='/questions')
 
 
+def _question_set_etag(cursor, set_id: int, *extra):
+    """ETag for a page built from a question set and its questions (None if the set doesn't exist)"""
+    cursor.execute("""
+        SELECT qs.updated_at, COUNT(q.id) as question_count, MAX(q.updated_at) as questions_updated
+        FROM question_sets qs
+        LEFT JOIN questions q ON q.question_set_id = qs.id
+        WHERE qs.id = %s
+        GROUP BY qs.id, qs.updated_at
+    """, (set_id,))
+    version = cursor.fetchone()
+    if not version:
+        return None
+    return weak_etag('question_set', set_id, version['updated_at'], version['question_count'],
+                     version['questions_updated'], *extra)
+
+
 @questions_bp.route('/')
 @questions_bp.route('/bank')
 @role_required('Admin')
@@ -33,7 +51,7 @@ def question_bank():
     - Level 2 (subject param): Show all question sets for that subject
     - Level 3 (subject + set params): Show all questions in that set
     """
-    conn = get_connection()
+    conn = get_connection(readonly=True)
     cursor = conn.cursor(dictionary=True)
 
     subject_param = request.args.get('subject', '')
@@ -126,7 +144,7 @@ def question_bank():
 @role_required('Admin')
 def get_question(question_id):
     """Get single question details for preview"""
-    conn = get_connection()
+    conn = get_connection(readonly=True)
     cursor = conn.cursor(dictionary=True)
 
     try:
@@ -159,10 +177,16 @@ def get_question(question_id):
 @role_required('Admin')
 def get_question_set(set_id):
     """Get all questions in a set for preview"""
-    conn = get_connection()
+    conn = get_connection(readonly=True)
     cursor = conn.cursor(dictionary=True)
 
     try:
+        # Admins flip between sets; an unchanged set costs one small query
+        etag = _question_set_etag(cursor, set_id)
+        cached = etag and not_modified(etag)
+        if cached:
+            return cached
+
         # Get question set info
         cursor.execute("""
             SELECT qs.*, s.name as subject_name, s.code as subject_code
@@ -190,11 +214,11 @@ def get_question_set(set_id):
                 except:
                     q['options'] = []
 
-        return jsonify({
+        return with_etag(jsonify({
             'success': True,
             'question_set': question_set,
             'questions': questions
-        })
+        }), etag)
 
     finally:
         cursor.close()
@@ -205,7 +229,7 @@ def get_question_set(set_id):
 @role_required('Admin')
 def export_json(set_id):
     """Export question set as JSON"""
-    conn = get_connection()
+    conn = get_connection(readonly=True)
     cursor = conn.cursor(dictionary=True)
 
     try:
@@ -263,7 +287,7 @@ def export_json(set_id):
 @role_required('Admin')
 def export_csv(set_id):
     """Export question set as CSV"""
-    conn = get_connection()
+    conn = get_connection(readonly=True)
     cursor = conn.cursor(dictionary=True)
 
     try:
@@ -321,7 +345,7 @@ def export_csv(set_id):
 @role_required('Admin')
 def export_pdf(set_id):
     """Export question set as PDF"""
-    conn = get_connection()
+    conn = get_connection(readonly=True)
     cursor = conn.cursor(dictionary=True)
 
     try:
@@ -345,21 +369,13 @@ def export_pdf(set_id):
 
         # Generate PDF using reportlab
         from reportlab.lib.pagesizes import A4
-        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
         from reportlab.lib.units import inch, cm
-        from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-        from reportlab.lib import colors
-        from reportlab.lib.enums import TA_CENTER, TA_LEFT
+        from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
 
         buffer = io.BytesIO()
         doc = SimpleDocTemplate(buffer, pagesize=A4, rightMargin=2*cm, leftMargin=2*cm, topMargin=2*cm, bottomMargin=2*cm)
 
-        styles = getSampleStyleSheet()
-        styles.add(ParagraphStyle(name='Title2', fontSize=18, spaceAfter=12, alignment=TA_CENTER, fontName='Helvetica-Bold'))
-        styles.add(ParagraphStyle(name='Subtitle', fontSize=12, spaceAfter=20, alignment=TA_CENTER, textColor=colors.grey))
-        styles.add(ParagraphStyle(name='QuestionNum', fontSize=11, fontName='Helvetica-Bold', textColor=colors.HexColor('#0078D4')))
-        styles.add(ParagraphStyle(name='QuestionText', fontSize=11, spaceAfter=6, leading=14))
-        styles.add(ParagraphStyle(name='Option', fontSize=10, leftIndent=20, spaceAfter=3))
+        styles = exam_styles()
 
         elements = []
 
@@ -370,27 +386,7 @@ def export_pdf(set_id):
         elements.append(Spacer(1, 0.5*inch))
 
         # Questions
-        for q in questions:
-            # Question number and type
-            q_type = q['question_type'].upper().replace('_', ' ')
-            elements.append(Paragraph(f"Question {q['question_number']} ({q_type}) - {q['marks']} mark(s)", styles['QuestionNum']))
-
-            # Question text
-            elements.append(Paragraph(q['question_text'], styles['QuestionText']))
-
-            # Options for MCQ
-            if q['question_type'] == 'mcq' and q['options']:
-                try:
-                    options = json.loads(q['options']) if isinstance(q['options'], str) else q['options']
-                    if isinstance(options, list):
-                        for i, opt in enumerate(options):
-                            letter = chr(65 + i)  # A, B, C, D
-                            elements.append(Paragraph(f"({letter}) {opt}", styles['Option']))
-                except:
-                    pass
-
-            # Space between questions
-            elements.append(Spacer(1, 0.3*inch))
+        elements.extend(question_flowables(questions, styles))
 
         # Build PDF
         doc.build(elements)
@@ -415,7 +411,7 @@ def export_pdf(set_id):
 @role_required('Admin')
 def export_pdf_with_answers(set_id):
     """Export question set as PDF with answers (answer key)"""
-    conn = get_connection()
+    conn = get_connection(readonly=True)
     cursor = conn.cursor(dictionary=True)
 
     try:
@@ -438,22 +434,13 @@ def export_pdf_with_answers(set_id):
         questions = cursor.fetchall()
 
         from reportlab.lib.pagesizes import A4
-        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
         from reportlab.lib.units import inch, cm
         from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
-        from reportlab.lib import colors
-        from reportlab.lib.enums import TA_CENTER
 
         buffer = io.BytesIO()
         doc = SimpleDocTemplate(buffer, pagesize=A4, rightMargin=2*cm, leftMargin=2*cm, topMargin=2*cm, bottomMargin=2*cm)
 
-        styles = getSampleStyleSheet()
-        styles.add(ParagraphStyle(name='Title2', fontSize=18, spaceAfter=12, alignment=TA_CENTER, fontName='Helvetica-Bold'))
-        styles.add(ParagraphStyle(name='Subtitle', fontSize=12, spaceAfter=20, alignment=TA_CENTER, textColor=colors.grey))
-        styles.add(ParagraphStyle(name='QuestionNum', fontSize=11, fontName='Helvetica-Bold', textColor=colors.HexColor('#0078D4')))
-        styles.add(ParagraphStyle(name='QuestionText', fontSize=11, spaceAfter=6, leading=14))
-        styles.add(ParagraphStyle(name='Option', fontSize=10, leftIndent=20, spaceAfter=3))
-        styles.add(ParagraphStyle(name='Answer', fontSize=10, leftIndent=20, spaceAfter=3, textColor=colors.HexColor('#107C10'), fontName='Helvetica-Bold'))
+        styles = exam_styles(answer_key=True)
 
         elements = []
 
@@ -464,26 +451,7 @@ def export_pdf_with_answers(set_id):
         elements.append(Spacer(1, 0.5*inch))
 
         # Questions with answers
-        for q in questions:
-            q_type = q['question_type'].upper().replace('_', ' ')
-            elements.append(Paragraph(f"Question {q['question_number']} ({q_type}) - {q['marks']} mark(s)", styles['QuestionNum']))
-            elements.append(Paragraph(q['question_text'], styles['QuestionText']))
-
-            if q['question_type'] == 'mcq' and q['options']:
-                try:
-                    options = json.loads(q['options']) if isinstance(q['options'], str) else q['options']
-                    if isinstance(options, list):
-                        for i, opt in enumerate(options):
-                            letter = chr(65 + i)
-                            style = styles['Answer'] if opt.lower() == q['correct_answer'].lower() else styles['Option']
-                            prefix = "* " if opt.lower() == q['correct_answer'].lower() else ""
-                            elements.append(Paragraph(f"{prefix}({letter}) {opt}", style))
-                except:
-                    pass
-            else:
-                elements.append(Paragraph(f"Answer: {q['correct_answer']}", styles['Answer']))
-
-            elements.append(Spacer(1, 0.3*inch))
+        elements.extend(question_flowables(questions, styles, answer_key=True))
 
         doc.build(elements)
         buffer.seek(0)
@@ -503,10 +471,15 @@ def export_pdf_with_answers(set_id):
 @role_required('Admin')
 def preview_set(set_id):
     """Preview question set in browser"""
-    conn = get_connection()
+    conn = get_connection(readonly=True)
     cursor = conn.cursor(dictionary=True)
 
     try:
+        etag = _question_set_etag(cursor, set_id)
+        cached = etag and not_modified(etag)
+        if cached:
+            return cached
+
         cursor.execute("""
             SELECT qs.*, s.name as subject_name, s.code as subject_code
             FROM question_sets qs
@@ -532,10 +505,10 @@ def preview_set(set_id):
                 except:
                     q['options'] = []
 
-        return render_template('admin/question_preview.html',
-                             question_set=question_set,
-                             questions=questions,
-                             user=request.current_user)
+        return with_etag(render_template('admin/question_preview.html',
+                                         question_set=question_set,
+                                         questions=questions,
+                                         user=request.current_user), etag)
 
     finally:
         cursor.close()
@@ -546,13 +519,18 @@ def preview_set(set_id):
 @role_required('Admin')
 def print_exam_paper(set_id):
     """Render a printable exam paper template with optional answers"""
-    conn = get_connection()
+    conn = get_connection(readonly=True)
     cursor = conn.cursor(dictionary=True)
 
     # Check if answers should be shown (query param: ?answers=true)
     show_answers = request.args.get('answers', 'false').lower() in ('true', '1', 'yes')
 
     try:
+        etag = _question_set_etag(cursor, set_id, show_answers)
+        cached = etag and not_modified(etag)
+        if cached:
+            return cached
+
         # Get question set info
         cursor.execute("""
             SELECT qs.*, s.name as subject_name, s.code as subject_code
@@ -581,11 +559,11 @@ def print_exam_paper(set_id):
                 except:
                     q['options'] = []
 
-        return render_template('admin/question_print.html',
-                             question_set=question_set,
-                             questions=questions,
-                             show_answers=show_answers,
-                             user=request.current_user)
+        return with_etag(render_template('admin/question_print.html',
+                                         question_set=question_set,
+                                         questions=questions,
+                                         show_answers=show_answers,
+                                         user=request.current_user), etag)
 
     finally:
         cursor.close()
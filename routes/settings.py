@@ -16,7 +16,7 @@ sys.path.insert(0, str(PROJECT_ROOT / "dbs"))
 
 from src.core.auth import role_required, AuditLogger, get_client_ip
 from src.core.email import EmailSettings, EmailService
-from src.core.cache import get_cache
+from src.core.settings_store import SettingsStore
 from dbs.connection import get_connection
 
 settings_bp = Blueprint('settings', __name__, url_prefix='/settings')
@@ -27,64 +27,15 @@ class SystemSettings:
 
     @classmethod
     def get_all_settings(cls) -> dict:
-        """Get all system settings"""
-        conn = get_connection()
-        cursor = conn.cursor(dictionary=True)
-
-        try:
-            cursor.execute("SELECT setting_key, setting_value FROM system_settings")
-            rows = cursor.fetchall()
-
-            settings = {}
-            for row in rows:
-                try:
-                    settings[row['setting_key']] = json.loads(row['setting_value'])
-                except:
-                    settings[row['setting_key']] = row['setting_value']
-
-            # Set defaults if not present
-            defaults = cls.get_defaults()
-            for key, value in defaults.items():
-                if key not in settings:
-                    settings[key] = value
-
-            return settings
-
-        finally:
-            cursor.close()
-            conn.close()
+        """Get all system settings, with defaults for missing keys"""
+        settings = dict(cls.get_defaults())
+        settings.update(SettingsStore.snapshot())
+        return settings
 
     @classmethod
     def get_setting(cls, key: str, default=None):
-        """Get a specific setting"""
-        cache = get_cache()
-        cache_key = f"settings:{key}"
-
-        cached = cache.get(cache_key)
-        if cached is not None:
-            return cached
-
-        conn = get_connection()
-        cursor = conn.cursor(dictionary=True)
-
-        try:
-            cursor.execute("SELECT setting_value FROM system_settings WHERE setting_key = %s", (key,))
-            row = cursor.fetchone()
-
-            if row and row['setting_value']:
-                try:
-                    value = json.loads(row['setting_value'])
-                except:
-                    value = row['setting_value']
-            else:
-                value = default
-
-            cache.set(cache_key, value, 3600)
-            return value
-
-        finally:
-            cursor.close()
-            conn.close()
+        """Get a specific setting (read-only)"""
+        return SettingsStore.get(key, default)
 
     @classmethod
     def save_setting(cls, key: str, value) -> bool:
@@ -102,10 +53,7 @@ class SystemSettings:
             """, (key, value_json, value_json))
 
             conn.commit()
-
-            # Clear cache
-            cache = get_cache()
-            cache.delete(f"settings:{key}")
+            SettingsStore.changed(key)
 
             return True
 
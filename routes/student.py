@@ -5,7 +5,6 @@ Dashboard, take exam, view results
 
 from flask import Blueprint, request, jsonify, render_template, redirect, url_for
 from datetime import datetime, timedelta
-import json
 import sys
 from pathlib import Path
 
@@ -16,6 +15,17 @@ sys.path.insert(0, str(PROJECT_ROOT / "dbs"))
 
 from src.core.auth import login_required, role_required, AuditLogger, get_client_ip
 from dbs.connection import get_connection
+from src.core.metrics import EXAM_SUBMISSIONS
+from src.core.question_utils import parse_json_fields, grade_answer
+from src.core.dashboard import DashboardSnapshot
+from src.core.student_stats import StudentStats
+from src.core.leaderboard import Leaderboard
+from src.core.exam_search import ExamSearch
+from src.core.catalog import get_exam_questions, get_subject_options
+from src.core.share_cache import ShareViews
+from src.core.http_cache import weak_etag, not_modified, with_etag
+from routes.settings import SystemSettings
+from config import HTTP_RELEASED_MAX_AGE
 
 student_bp = Blueprint('student', __name__, url_prefix='/student')
 
@@ -44,7 +54,7 @@ def dashboard():
         # Get completed exams
         cursor.execute("""
             SELECT pe.*, qs.title as exam_title, s.name as subject_name, s.code as subject_code
-            FROM practice_exams pe
+            FROM practice_exams_all pe
             JOIN question_sets qs ON pe.question_set_id = qs.id
             JOIN subjects s ON qs.subject_id = s.id
             WHERE pe.student_id = %s AND pe.status = 'released'
@@ -58,11 +68,21 @@ def dashboard():
             SELECT COUNT(*) as total_exams,
                    AVG(percentage) as avg_score,
                    MAX(percentage) as best_score
-            FROM practice_exams
+            FROM practice_exams_all
             WHERE student_id = %s AND status = 'released'
         """, (student_id,))
         stats = cursor.fetchone()
 
+        # Class rank from the Redis leaderboards (no database work)
+        my_rank = None
+        if (SystemSettings.get_setting('display') or {}).get('show_leaderboard', True):
+            overall = Leaderboard.position(student_id, 'overall', neighbours=1)
+            if overall:
+                my_rank = {
+                    'overall': overall,
+                    'week': Leaderboard.position(student_id, '7d', neighbours=1)
+                }
+
         # Format dates and calculate status indicators
         now = datetime.now()
         for exam in pending_exams:
@@ -124,6 +144,7 @@ def dashboard():
                              pending_exams=pending_exams,
                              completed_exams=completed_exams,
                              stats=stats,
+                             my_rank=my_rank,
                              user=request.current_user)
 
     finally:
@@ -170,9 +191,15 @@ def take_exam(exam_id):
             cursor.execute("""
                 UPDATE practice_exams
                 SET status = 'in_progress', started_at = NOW()
-                WHERE id = %s
+                WHERE id = %s AND status = 'pending'
             """, (exam_id,))
+            started = cursor.rowcount
+            if started:
+                StudentStats.refresh(cursor, student_id)
             conn.commit()
+            if started:
+                DashboardSnapshot.exam_status_changed('pending', 'in_progress')
+                ExamSearch.invalidate_facets()
             # Refetch exam to get the updated started_at
             cursor.execute("""
                 SELECT pe.*, qs.title as exam_title, qs.duration_minutes,
@@ -184,27 +211,19 @@ def take_exam(exam_id):
             """, (exam_id, student_id))
             exam = cursor.fetchone()
 
-        # Get questions
+        # Get questions (cached per set) and this exam's saved answers
+        questions = get_exam_questions(exam['question_set_id'])
         cursor.execute("""
-            SELECT q.id, q.question_number, q.question_type, q.question_text,
-                   q.question_html, q.image_url, q.marks, q.options, q.hint,
-                   q.matching_pairs, q.drawing_template,
-                   sa.student_answer, sa.drawing_data
-            FROM questions q
-            LEFT JOIN student_answers sa ON sa.question_id = q.id AND sa.practice_exam_id = %s
-            WHERE q.question_set_id = %s AND q.is_active = TRUE
-            ORDER BY q.question_number
-        """, (exam_id, exam['question_set_id']))
-        questions = cursor.fetchall()
+            SELECT question_id, student_answer, drawing_data
+            FROM student_answers
+            WHERE practice_exam_id = %s
+        """, (exam_id,))
+        answers = {row['question_id']: row for row in cursor.fetchall()}
 
-        # Parse JSON fields
         for q in questions:
-            if q['options']:
-                q['options'] = json.loads(q['options']) if isinstance(q['options'], str) else q['options']
-            if q['matching_pairs']:
-                q['matching_pairs'] = json.loads(q['matching_pairs']) if isinstance(q['matching_pairs'], str) else q['matching_pairs']
-            if q['drawing_template']:
-                q['drawing_template'] = json.loads(q['drawing_template']) if isinstance(q['drawing_template'], str) else q['drawing_template']
+            answer = answers.get(q['id'], {})
+            q['student_answer'] = answer.get('student_answer')
+            q['drawing_data'] = answer.get('drawing_data')
             # Use drawing_data if available, otherwise use student_answer for drawing questions
             if q['question_type'] == 'drawing' and q.get('drawing_data'):
                 q['student_answer'] = q['drawing_data']
@@ -318,9 +337,6 @@ def submit_exam(exam_id):
                 """, (question_id,))
                 question = cursor.fetchone()
 
-                is_correct = None
-                marks_awarded = None
-                auto_graded = False
                 drawing_data = None
 
                 # Check if this is a drawing answer
@@ -330,12 +346,8 @@ def submit_exam(exam_id):
                     student_answer = ''  # Don't store base64 in student_answer column
 
                 # Auto-grade MCQ and fill_blank
-                if question and question['question_type'] in ('mcq', 'fill_blank'):
-                    correct = question['correct_answer'].strip().lower()
-                    given = str(student_answer).strip().lower()
-                    is_correct = (correct == given)
-                    marks_awarded = question['marks'] if is_correct else 0
-                    auto_graded = True
+                is_correct, marks_awarded, auto_graded = grade_answer(question, student_answer)
+                if auto_graded:
                     auto_graded_score += marks_awarded
 
                 # Upsert answer
@@ -375,7 +387,12 @@ def submit_exam(exam_id):
                 WHERE id = %s
             """, (auto_graded_score, is_delayed, exam_id))
 
+            StudentStats.refresh(cursor, student_id)
+
             conn.commit()
+            EXAM_SUBMISSIONS.labels(str(is_delayed).lower()).inc()
+            DashboardSnapshot.exam_status_changed(exam['status'], 'submitted', exam['percentage'])
+            ExamSearch.invalidate_facets()
 
             AuditLogger.log_action(student_id, 'exam_submitted',
                                   resource_type='practice_exam', resource_id=str(exam_id),
@@ -416,8 +433,8 @@ def view_results(exam_id):
         # Get exam info with sharing fields
         cursor.execute("""
             SELECT pe.*, qs.title as exam_title, s.name as subject_name,
-                   pe.is_public, pe.share_token, pe.share_views
-            FROM practice_exams pe
+                   pe.is_public, pe.share_token, pe.share_views, qs.updated_at as set_updated_at
+            FROM practice_exams_all pe
             JOIN question_sets qs ON pe.question_set_id = qs.id
             JOIN subjects s ON qs.subject_id = s.id
             WHERE pe.id = %s AND pe.student_id = %s
@@ -427,34 +444,51 @@ def view_results(exam_id):
         if not exam:
             return redirect(url_for('student.dashboard'))
 
+        shared = exam['answers_released'] and exam['is_public'] and exam['share_token']
+        if shared:
+            # The page shows the live view count (flushed plus still buffered)
+            exam['share_views'] = (exam['share_views'] or 0) + ShareViews.pending('exam', exam_id)
+
+        # Regrades bump graded_at; not updated_at, which share-view flushes touch
+        etag = weak_etag('results', exam_id, exam['status'], exam['answers_released'], exam['graded_at'],
+                         exam['released_at'], exam['total_score'], exam['is_public'], exam['share_token'],
+                         exam['set_updated_at'], exam['share_views'] if shared else None)
+        # Released results only change on a regrade, but a shared page's view count
+        # moves on its own and the waiting page must notice the release
+        max_age = HTTP_RELEASED_MAX_AGE if exam['answers_released'] and not shared else 0
+        cached = not_modified(etag, max_age)
+        if cached:
+            return cached
+
         # Check if results are released
         if not exam['answers_released']:
-            return render_template('student/waiting.html', exam=exam, user=request.current_user)
+            return with_etag(render_template('student/waiting.html', exam=exam, user=request.current_user),
+                             etag, max_age)
 
         # Get questions with answers
         cursor.execute("""
             SELECT q.*, sa.student_answer, sa.drawing_data, sa.is_correct, sa.marks_awarded, sa.admin_feedback
             FROM questions q
-            LEFT JOIN student_answers sa ON sa.question_id = q.id AND sa.practice_exam_id = %s
+            LEFT JOIN (
+                SELECT * FROM student_answers_all WHERE practice_exam_id = %s
+            ) sa ON sa.question_id = q.id
             WHERE q.question_set_id = %s
             ORDER BY q.question_number
         """, (exam_id, exam['question_set_id']))
         questions = cursor.fetchall()
 
         # Parse JSON fields and handle drawing answers
+        parse_json_fields(questions, ('options', 'matching_pairs'))
         for q in questions:
-            if q['options']:
-                q['options'] = json.loads(q['options']) if isinstance(q['options'], str) else q['options']
-            if q.get('matching_pairs'):
-                q['matching_pairs'] = json.loads(q['matching_pairs']) if isinstance(q['matching_pairs'], str) else q['matching_pairs']
             # Use drawing_data for drawing questions
             if q['question_type'] == 'drawing' and q.get('drawing_data'):
                 q['student_answer'] = q['drawing_data']
 
-        return render_template('student/results.html',
-                             exam=exam,
-                             questions=questions,
-                             user=request.current_user)
+        return with_etag(render_template('student/results.html',
+                                         exam=exam,
+                                         questions=questions,
+                                         user=request.current_user),
+                         etag, max_age)
 
     finally:
         cursor.close()
@@ -477,13 +511,12 @@ def my_exams():
 
     try:
         # Get subjects for filter dropdown
-        cursor.execute("SELECT code, name FROM subjects ORDER BY name")
-        subjects = cursor.fetchall()
+        subjects = get_subject_options()
 
         # Build query with filters
         query = """
             SELECT pe.*, pe.scheduled_at, qs.title as exam_title, s.name as subject_name, s.code as subject_code
-            FROM practice_exams pe
+            FROM practice_exams_all pe
             JOIN question_sets qs ON pe.question_set_id = qs.id
             JOIN subjects s ON qs.subject_id = s.id
             WHERE pe.student_id = %s
@@ -560,13 +593,12 @@ def results():
 
     try:
         # Get subjects for filter
-        cursor.execute("SELECT code, name FROM subjects ORDER BY name")
-        subjects = cursor.fetchall()
+        subjects = get_subject_options()
 
         # Get released exams
         query = """
             SELECT pe.*, qs.title as exam_title, s.name as subject_name, s.code as subject_code
-            FROM practice_exams pe
+            FROM practice_exams_all pe
             JOIN question_sets qs ON pe.question_set_id = qs.id
             JOIN subjects s ON qs.subject_id = s.id
             WHERE pe.student_id = %s AND pe.status = 'released'
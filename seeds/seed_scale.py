@@ -0,0 +1,395 @@
+"""
+Y6 Practice Exam - Scale Data Generator
+Bulk-loads synthetic students, exams, answers, drawings, sessions and audit
+logs so analytics, search and pagination can be measured at realistic volume
+
+Questions must already exist (run tools/import_questions.py first).
+All generated students use emails scale<N>@scale.invalid and can be
+removed again with --clear.
+
+Usage:
+    python seeds/seed_scale.py --students 5000 --exams-per-student 60
+    python seeds/seed_scale.py --students 5000 --mode infile   # LOAD DATA LOCAL INFILE
+    python seeds/seed_scale.py --clear
+"""
+
+import sys
+import os
+import json
+import time
+import base64
+import random
+import secrets
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+sys.path.insert(0, str(PROJECT_ROOT / "dbs"))
+
+from config import DB_CONFIG
+from dbs.connection import get_connection
+from src.core.auth import PasswordManager
+from src.core.question_utils import grade_answer
+from src.core.student_stats import StudentStats
+
+EMAIL_PATTERN = 'scale{}@scale.invalid'
+EMAIL_LIKE = 'scale%@scale.invalid'
+PASSWORD = 'scale123'
+
+# Share of exams in each status (the rest are pending)
+STATUS_MIX = [('released', 0.70), ('submitted', 0.08), ('grading', 0.04), ('in_progress', 0.03)]
+
+AUDIT_ACTIONS = ['login_success', 'exam_submitted', 'view_results', 'login_trusted_device', 'logout']
+USER_AGENTS = [
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 Chrome/120.0 Safari/537.36',
+    'Mozilla/5.0 (iPad; CPU OS 17_1 like Mac OS X) AppleWebKit/605.1.15 Mobile/15E148 Safari/604.1',
+    'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 Version/17.1 Safari/605.1.15',
+]
+
+TABLE_COLUMNS = {
+    'users': ('id', 'email', 'password_hash', 'full_name', 'role_id', 'is_active',
+              'is_email_verified', 'created_at'),
+    'practice_exams': ('id', 'student_id', 'question_set_id', 'exam_date', 'status', 'started_at',
+                       'submitted_at', 'is_delayed', 'graded_at', 'released_at', 'total_score',
+                       'max_score', 'auto_graded_score', 'manual_graded_score', 'percentage',
+                       'answers_released', 'created_at'),
+    'student_answers': ('practice_exam_id', 'question_id', 'student_answer', 'drawing_data',
+                        'is_correct', 'marks_awarded', 'auto_graded', 'answered_at', 'graded_at'),
+    'user_sessions': ('user_id', 'session_token', 'ip_address', 'user_agent', 'expires_at', 'created_at'),
+    'audit_logs': ('user_id', 'action', 'resource_type', 'resource_id', 'details', 'ip_address', 'created_at'),
+}
+
+
+# =============================================================================
+# Writers
+# =============================================================================
+
+class InsertWriter:
+    """Buffers rows and flushes them as multi-row INSERTs"""
+
+    def __init__(self, cursor, table, batch_size):
+        self.cursor = cursor
+        self.table = table
+        self.columns = TABLE_COLUMNS[table]
+        self.batch_size = batch_size
+        self.rows = []
+        self.count = 0
+        placeholders = ', '.join(['%s'] * len(self.columns))
+        self.sql = f"INSERT INTO {table} ({', '.join(self.columns)}) VALUES ({placeholders})"
+
+    def add(self, row):
+        self.rows.append(row)
+        if len(self.rows) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if self.rows:
+            # mysql-connector rewrites executemany INSERTs into one multi-row statement
+            self.cursor.executemany(self.sql, self.rows)
+            self.count += len(self.rows)
+            self.rows = []
+
+    def close(self):
+        self.flush()
+
+
+class InfileWriter:
+    """Streams rows to a tab-separated file and loads it with LOAD DATA LOCAL INFILE"""
+
+    def __init__(self, cursor, table, batch_size):
+        self.cursor = cursor
+        self.table = table
+        self.columns = TABLE_COLUMNS[table]
+        self.count = 0
+        self.file = tempfile.NamedTemporaryFile('w', encoding='utf-8', suffix=f'.{table}.tsv', delete=False)
+
+    @staticmethod
+    def _field(value):
+        if value is None:
+            return '\\N'
+        if isinstance(value, bool):
+            return '1' if value else '0'
+        return str(value).replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n')
+
+    def add(self, row):
+        self.file.write('\t'.join(self._field(v) for v in row) + '\n')
+        self.count += 1
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.file.close()
+        try:
+            self.cursor.execute(f"""
+                LOAD DATA LOCAL INFILE %s INTO TABLE {self.table}
+                CHARACTER SET utf8mb4
+                FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\'
+                LINES TERMINATED BY '\\n'
+                ({', '.join(self.columns)})
+            """, (self.file.name,))
+        finally:
+            os.remove(self.file.name)
+
+
+def open_connection(mode):
+    """Pooled connection for INSERTs; a dedicated one with local_infile for LOAD DATA"""
+    if mode == 'infile':
+        import mysql.connector
+        return mysql.connector.connect(**DB_CONFIG, allow_local_infile=True)
+    return get_connection()
+
+
+# =============================================================================
+# Generation
+# =============================================================================
+
+def load_question_sets(cursor):
+    """Active question sets with their questions"""
+    cursor.execute("""
+        SELECT qs.id, qs.duration_minutes, q.id as question_id, q.question_type,
+               q.correct_answer, q.marks, q.options
+        FROM question_sets qs
+        JOIN questions q ON q.question_set_id = qs.id AND q.is_active = TRUE
+        WHERE qs.is_active = TRUE
+        ORDER BY qs.id, q.question_number
+    """)
+
+    sets = {}
+    for row in cursor.fetchall():
+        qs = sets.setdefault(row['id'], {'id': row['id'], 'duration': row['duration_minutes'] or 60,
+                                         'questions': []})
+        if row['options'] and isinstance(row['options'], str):
+            row['options'] = json.loads(row['options'])
+        qs['questions'].append(row)
+
+    for qs in sets.values():
+        qs['max_score'] = sum(q['marks'] or 0 for q in qs['questions'])
+    return list(sets.values())
+
+
+def next_id(cursor, table):
+    """First free primary key; IDs are pre-allocated so children need no lastrowid"""
+    cursor.execute(f"SELECT COALESCE(MAX(id), 0) + 1 as next_id FROM {table}")
+    return cursor.fetchone()['next_id']
+
+
+def pick_status(rng):
+    roll = rng.random()
+    for status, share in STATUS_MIX:
+        if roll < share:
+            return status
+        roll -= share
+    return 'pending'
+
+
+def fake_answer(rng, question):
+    """Right about 60% of the time"""
+    if question['question_type'] == 'mcq' and question['options'] and rng.random() > 0.6:
+        return str(rng.choice(question['options']))
+    if rng.random() < 0.6:
+        return question['correct_answer']
+    return rng.choice(['I am not sure', 'because it is bigger', 'the water cycle', '42', 'photosynthesis'])
+
+
+def generate(args):
+    rng = random.Random(args.seed)
+    started = time.time()
+
+    conn = open_connection(args.mode)
+    cursor = conn.cursor(dictionary=True)
+
+    try:
+        question_sets = load_question_sets(cursor)
+        if not question_sets:
+            print("Error: no active question sets - run tools/import_questions.py first")
+            return False
+
+        # Bulk-load settings for this session only
+        cursor.execute("SET unique_checks = 0")
+        cursor.execute("SET foreign_key_checks = 0")
+
+        writer_class = InfileWriter if args.mode == 'infile' else InsertWriter
+        writers = {table: writer_class(cursor, table, args.batch) for table in TABLE_COLUMNS}
+
+        user_id = next_id(cursor, 'users')
+        exam_id = next_id(cursor, 'practice_exams')
+        password_hash = PasswordManager.hash_password(PASSWORD)
+
+        # A small pool of drawing payloads keeps generation CPU-cheap
+        drawings = ['data:image/png;base64,' + base64.b64encode(rng.randbytes(args.drawing_kb * 1024)).decode('ascii')
+                    for _ in range(16)]
+
+        now = datetime.now().replace(microsecond=0)
+        print(f"Generating {args.students} students x {args.exams_per_student} exams "
+              f"({len(question_sets)} question sets, mode={args.mode})...")
+
+        for i in range(args.students):
+            student_id = user_id + i
+            joined = now - timedelta(days=rng.randint(args.days, args.days + 90))
+            writers['users'].add((student_id, EMAIL_PATTERN.format(student_id), password_hash,
+                                  f'Scale Student {student_id}', 2, True, True, joined))
+
+            for _ in range(args.sessions_per_student):
+                created = now - timedelta(minutes=rng.randint(0, args.days * 1440))
+                writers['user_sessions'].add((student_id, secrets.token_urlsafe(32),
+                                              f'10.{rng.randint(0, 255)}.{rng.randint(0, 255)}.{rng.randint(1, 254)}',
+                                              rng.choice(USER_AGENTS), created + timedelta(days=30), created))
+
+            for _ in range(args.exams_per_student):
+                write_exam(rng, writers, exam_id, student_id, rng.choice(question_sets), now, args, drawings)
+                exam_id += 1
+
+            if (i + 1) % 100 == 0:
+                for writer in writers.values():
+                    writer.flush()
+                conn.commit()
+                print(f"  {i + 1}/{args.students} students ({time.time() - started:.0f}s)")
+
+        for writer in writers.values():
+            writer.close()
+        conn.commit()
+
+        cursor.execute("SET unique_checks = 1")
+        cursor.execute("SET foreign_key_checks = 1")
+
+        # Rows were bulk-loaded around the app, so derive their aggregates here
+        print("Rebuilding student_stats...")
+        StudentStats.rebuild(cursor, user_id, user_id + args.students - 1)
+        conn.commit()
+
+        elapsed = time.time() - started
+        print(f"\n{'=' * 60}")
+        print(f"Scale data loaded in {elapsed:.0f}s")
+        print(f"{'=' * 60}")
+        for table, writer in writers.items():
+            print(f"  {table:<16} {writer.count:>12,} rows  ({writer.count / max(elapsed, 1):,.0f}/s)")
+        print(f"\nStudent password: {PASSWORD}")
+        return True
+
+    except Exception as e:
+        conn.rollback()
+        print(f"Error generating scale data: {e}")
+        raise
+
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def write_exam(rng, writers, exam_id, student_id, qs, now, args, drawings):
+    """One practice exam with its answers and audit trail"""
+    status = pick_status(rng)
+    created = now - timedelta(minutes=rng.randint(60, args.days * 1440))
+    started_at = submitted_at = graded_at = released_at = None
+    total_score = auto_score = manual_score = percentage = None
+    is_delayed = False
+
+    if status != 'pending':
+        started_at = created + timedelta(hours=rng.randint(1, 72))
+
+    if status in ('submitted', 'grading', 'released'):
+        taken = rng.gauss(qs['duration'] * 0.8, qs['duration'] * 0.15)
+        submitted_at = started_at + timedelta(minutes=max(5, taken))
+        is_delayed = taken > qs['duration']
+
+    if status != 'pending':
+        auto_score = manual_score = 0
+        answered_until = submitted_at or now
+
+        for q in qs['questions']:
+            if rng.random() > args.answer_rate:
+                continue
+
+            answered_at = started_at + (answered_until - started_at) * rng.random()
+            drawing = None
+            if q['question_type'] == 'drawing':
+                answer, drawing = '', rng.choice(drawings)
+            else:
+                answer = fake_answer(rng, q)
+
+            is_correct, marks, auto_graded = (None, None, False)
+            if submitted_at:
+                is_correct, marks, auto_graded = grade_answer(q, answer)
+                if auto_graded:
+                    auto_score += marks
+                elif status == 'released':
+                    marks = rng.randint(0, q['marks'] or 0)
+                    manual_score += marks
+
+            writers['student_answers'].add((exam_id, q['question_id'], answer, drawing, is_correct, marks,
+                                            auto_graded, answered_at, submitted_at if marks is not None else None))
+
+    if status == 'released':
+        graded_at = submitted_at + timedelta(hours=rng.randint(1, 48))
+        released_at = graded_at + timedelta(minutes=rng.randint(1, 600))
+        total_score = auto_score + manual_score
+        percentage = round(total_score / qs['max_score'] * 100, 2) if qs['max_score'] else 0
+
+    writers['practice_exams'].add((exam_id, student_id, qs['id'], created.date(), status, started_at,
+                                   submitted_at, is_delayed, graded_at, released_at, total_score,
+                                   qs['max_score'], auto_score if submitted_at else None,
+                                   manual_score if status == 'released' else None, percentage,
+                                   status == 'released', created))
+
+    for _ in range(args.audit_per_exam):
+        when = submitted_at or started_at or created
+        writers['audit_logs'].add((student_id, rng.choice(AUDIT_ACTIONS), 'practice_exam', str(exam_id),
+                                   json.dumps({'generated': True}), f'10.0.{rng.randint(0, 255)}.{rng.randint(1, 254)}',
+                                   when + timedelta(seconds=rng.randint(0, 3600))))
+
+
+def clear():
+    """Remove generated students; exams, answers and sessions cascade"""
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    try:
+        print("Removing scale data...")
+        cursor.execute("""
+            DELETE al FROM audit_logs al
+            JOIN users u ON al.user_id = u.id
+            WHERE u.email LIKE %s
+        """, (EMAIL_LIKE,))
+        audit = cursor.rowcount
+
+        # Delete in chunks to keep transactions small
+        students = 0
+        while True:
+            cursor.execute("DELETE FROM users WHERE email LIKE %s LIMIT 200", (EMAIL_LIKE,))
+            conn.commit()
+            if cursor.rowcount == 0:
+                break
+            students += cursor.rowcount
+
+        print(f"Removed {students} students and {audit} audit log entries")
+        return True
+
+    finally:
+        cursor.close()
+        conn.close()
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Bulk-load synthetic data for scale testing')
+    parser.add_argument('--students', type=int, default=2000, help='Students to create (default: 2000)')
+    parser.add_argument('--exams-per-student', type=int, default=100, help='Exams per student (default: 100)')
+    parser.add_argument('--answer-rate', type=float, default=0.9, help='Share of questions answered (default: 0.9)')
+    parser.add_argument('--drawing-kb', type=int, default=20, help='Size of each drawing answer in KB (default: 20)')
+    parser.add_argument('--sessions-per-student', type=int, default=2, help='Login sessions per student (default: 2)')
+    parser.add_argument('--audit-per-exam', type=int, default=2, help='Audit log rows per exam (default: 2)')
+    parser.add_argument('--days', type=int, default=365, help='Spread activity over this many days (default: 365)')
+    parser.add_argument('--batch', type=int, default=2000, help='Rows per multi-row INSERT (default: 2000)')
+    parser.add_argument('--mode', choices=['insert', 'infile'], default='insert',
+                        help='Multi-row INSERTs, or LOAD DATA LOCAL INFILE (server needs local_infile=ON)')
+    parser.add_argument('--seed', type=int, default=1, help='Random seed')
+    parser.add_argument('--clear', action='store_true', help='Remove previously generated data and exit')
+
+    args = parser.parse_args()
+
+    success = clear() if args.clear else generate(args)
+    sys.exit(0 if success else 1)
@@ -0,0 +1,301 @@
+"""
+Y6 Practice Exam - Static Assets
+Fingerprinted, minified and precompressed builds of static/css and static/js
+
+tools/build_assets.py writes every source file to static/dist as
+<name>.<hash>.<ext>, where the hash covers the minified content, plus .gz and
+.br copies (.br needs the Brotli package). It also writes a manifest.json
+that maps source paths to built ones. asset_url() resolves names through the
+manifest, so a changed file gets a new URL and /assets can tell browsers to
+keep every file for a year. Without a manifest, asset_url() points at the
+source file under /static. The previous build is kept for pages still cached
+in browsers.
+"""
+
+import os
+import re
+import gzip
+import json
+import hashlib
+from typing import Dict, List, Optional
+import sys
+from pathlib import Path
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from config import DEBUG
+
+STATIC_DIR = PROJECT_ROOT / 'static'
+DIST_DIR = STATIC_DIR / 'dist'
+MANIFEST_PATH = DIST_DIR / 'manifest.json'
+SOURCE_DIRS = ('css', 'js')
+HASH_LENGTH = 10
+
+
+# ---------------------------------------------------------------------------
+# Minifiers: conservative, no dependencies. They only remove comments and
+# whitespace. Strings, template literals and regexes are copied unchanged.
+# JS line breaks are kept so automatic semicolon insertion works as before.
+# ---------------------------------------------------------------------------
+
+_CSS_LITERALS = re.compile(r'''("(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*')|/\*[\s\S]*?\*/''')
+
+
+def _squeeze_css(chunk: str) -> str:
+    chunk = re.sub(r'\s+', ' ', chunk)
+    chunk = re.sub(r' ?([{};,>]) ?', r'\1', chunk)
+    return chunk.replace(': ', ':').replace(';}', '}')
+
+
+def minify_css(text: str) -> str:
+    """Drop comments and redundant whitespace from a stylesheet"""
+    # Comments become a space; strings are set aside so squeezing cannot touch them
+    literals = []
+
+    def stash(match):
+        if not match.group(1):
+            return ' '
+        literals.append(match.group(1))
+        return f'\0{len(literals) - 1}\0'
+
+    code = _squeeze_css(_CSS_LITERALS.sub(stash, text)).strip()
+    return re.sub(r'\0(\d+)\0', lambda m: literals[int(m.group(1))], code) + '\n'
+
+
+# A '/' after one of these starts a regex literal rather than a division
+_JS_REGEX_AFTER = set('(,=:[!&|?{};+-*%<>~^}')
+_JS_REGEX_KEYWORDS = {'return', 'typeof', 'case', 'do', 'else', 'in', 'of', 'void', 'delete',
+                      'throw', 'new', 'instanceof', 'yield', 'await'}
+
+
+def _is_word(ch: str) -> bool:
+    return ch.isalnum() or ch in '_$'
+
+
+def _skip_string(text: str, i: int) -> int:
+    """End of the string or template literal starting at i"""
+    quote, n = text[i], len(text)
+    i += 1
+    while i < n:
+        ch = text[i]
+        if ch == '\\':
+            i += 2
+            continue
+        if ch == quote:
+            return i + 1
+        if quote != '`' and ch == '\n':
+            return i
+        if quote == '`' and text.startswith('${', i):
+            depth, i = 1, i + 2
+            while i < n and depth:
+                if text[i] in '"\'`':
+                    i = _skip_string(text, i)
+                    continue
+                depth += {'{': 1, '}': -1}.get(text[i], 0)
+                i += 1
+            continue
+        i += 1
+    return n
+
+
+def _skip_regex(text: str, i: int) -> Optional[int]:
+    """End of the regex literal starting at i (None if it isn't one)"""
+    in_class, n = False, len(text)
+    i += 1
+    while i < n:
+        ch = text[i]
+        if ch == '\n':
+            return None
+        if ch == '\\':
+            i += 2
+            continue
+        if ch == '[':
+            in_class = True
+        elif ch == ']':
+            in_class = False
+        elif ch == '/' and not in_class:
+            i += 1
+            while i < n and _is_word(text[i]):
+                i += 1
+            return i
+        i += 1
+    return None
+
+
+def _js_tokens(text: str) -> List[str]:
+    """Code split into literals, words, punctuation and whitespace ('\\n' or ' '); comments removed"""
+    tokens, prev = [], ''
+    i, n = 0, len(text)
+
+    while i < n:
+        ch = text[i]
+        if ch in '"\'`':
+            end = _skip_string(text, i)
+        elif text.startswith('//', i):
+            end = text.find('\n', i)
+            i = n if end < 0 else end
+            continue
+        elif text.startswith('/*', i):
+            end = text.find('*/', i + 2)
+            end = n if end < 0 else end + 2
+            tokens.append('\n' if '\n' in text[i:end] else ' ')
+            i = end
+            continue
+        elif ch == '/' and (not prev or prev in _JS_REGEX_AFTER or prev in _JS_REGEX_KEYWORDS):
+            end = _skip_regex(text, i) or i + 1
+        elif ch.isspace():
+            end = i
+            while end < n and text[end].isspace():
+                end += 1
+            tokens.append('\n' if '\n' in text[i:end] else ' ')
+            i = end
+            continue
+        elif _is_word(ch):
+            end = i
+            while end < n and _is_word(text[end]):
+                end += 1
+        else:
+            end = i + 1
+
+        tokens.append(text[i:end])
+        prev = tokens[-1] if _is_word(ch) or len(tokens[-1]) == 1 else 'x'
+        i = end
+
+    return tokens
+
+
+def _space_needed(left: str, right: str) -> bool:
+    """Whether removing the whitespace between two tokens would change the code"""
+    a, b = left[-1], right[0]
+    return ((_is_word(a) and _is_word(b)) or (a in '+-/' and b in '+-/')
+            or (a.isdigit() and b == '.'))
+
+
+def minify_js(text: str) -> str:
+    """Drop comments, indentation and blank lines from a script"""
+    tokens = _js_tokens(text)
+    out = []
+    for index, token in enumerate(tokens):
+        if token not in (' ', '\n'):
+            out.append(token)
+            continue
+        if not out or out[-1] in (' ', '\n'):
+            if out and token == '\n':
+                out[-1] = '\n'
+            continue
+        following = index + 1
+        while following < len(tokens) and tokens[following] in (' ', '\n'):
+            following += 1
+        if following == len(tokens):
+            continue
+        if token == '\n' and out[-1][-1] not in '{;,':
+            out.append('\n')
+        elif _space_needed(out[-1], tokens[following]):
+            out.append(' ')
+    return ''.join(out).strip() + '\n'
+
+
+MINIFIERS = {'.css': minify_css, '.js': minify_js}
+
+# Precompressed variants written beside each built file (suffix, compress)
+COMPRESSORS = [('gz', lambda data: gzip.compress(data, 9, mtime=0))]
+if brotli is not None:
+    COMPRESSORS.append(('br', lambda data: brotli.compress(data, quality=11)))
+
+
+# ---------------------------------------------------------------------------
+# Build
+# ---------------------------------------------------------------------------
+
+def _write(path: Path, data: bytes):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + '.tmp')
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+def load_manifest() -> Dict[str, str]:
+    """Source path -> built path, as last written by build()"""
+    try:
+        return json.loads(MANIFEST_PATH.read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def build(minify: bool = True) -> Dict[str, Dict[str, int]]:
+    """Build every source asset; returns {source path: {variant: bytes}}"""
+    previous = load_manifest()
+    manifest, sizes = {}, {}
+
+    for folder in SOURCE_DIRS:
+        for source in sorted((STATIC_DIR / folder).rglob('*')):
+            if source.suffix not in MINIFIERS or not source.is_file():
+                continue
+            name = source.relative_to(STATIC_DIR).as_posix()
+            text = source.read_text(encoding='utf-8')
+            data = (MINIFIERS[source.suffix](text) if minify else text).encode('utf-8')
+
+            digest = hashlib.sha256(data).hexdigest()[:HASH_LENGTH]
+            built = f"{Path(name).with_suffix('').as_posix()}.{digest}{source.suffix}"
+            manifest[name] = built
+            sizes[name] = {'source': source.stat().st_size, 'minified': len(data)}
+
+            _write(DIST_DIR / built, data)
+            for suffix, compress in COMPRESSORS:
+                packed = compress(data)
+                if len(packed) < len(data):
+                    _write(DIST_DIR / f"{built}.{suffix}", packed)
+                    sizes[name][suffix] = len(packed)
+
+    _write(MANIFEST_PATH, json.dumps(manifest, indent=2, sort_keys=True).encode('utf-8'))
+
+    # Keep this build and the previous one; anything older is unreferenced
+    keep = set(manifest.values()) | set(previous.values())
+    for path in DIST_DIR.rglob('*'):
+        built = re.sub(r'\.(gz|br)$', '', path.relative_to(DIST_DIR).as_posix())
+        if path.is_file() and path != MANIFEST_PATH and built not in keep:
+            path.unlink()
+
+    return sizes
+
+
+# ---------------------------------------------------------------------------
+# Lookup
+# ---------------------------------------------------------------------------
+
+class AssetManifest:
+    """The build manifest, loaded once per process"""
+
+    _entries: Optional[Dict[str, str]] = None
+    _loaded_at = 0.0
+
+    @classmethod
+    def built_path(cls, name: str) -> Optional[str]:
+        """Fingerprinted path for a source file, or None to serve the source"""
+        if cls._entries is None:
+            cls._entries = load_manifest()
+            cls._loaded_at = MANIFEST_PATH.stat().st_mtime if cls._entries else 0.0
+            if not cls._entries:
+                print("[Assets] No build manifest; serving sources (run tools/build_assets.py)")
+
+        built = cls._entries.get(name)
+        # While developing, a source edited since the last build wins
+        if built and DEBUG and (STATIC_DIR / name).stat().st_mtime > cls._loaded_at:
+            return None
+        return built
+
+
+def asset_url(name: str) -> str:
+    """URL of a file under static/ (e.g. 'js/take-exam.js'), fingerprinted when built"""
+    from flask import url_for
+
+    built = AssetManifest.built_path(name)
+    if built:
+        return url_for('assets.serve', filename=built)
+    return url_for('static', filename=name)
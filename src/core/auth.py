@@ -5,8 +5,10 @@ RBAC with password + OTP, session management (adapted from ssh-guardian v3)
 
 import os
 import sys
+import queue
 import secrets
 import json
+import threading
 from pathlib import Path
 from datetime import datetime, timedelta
 from functools import wraps
@@ -19,6 +21,7 @@ sys.path.insert(0, str(PROJECT_ROOT))
 sys.path.insert(0, str(PROJECT_ROOT / "dbs"))
 
 from dbs.connection import get_connection
+from src.core.token_store import TokenStore
 from config import SESSION_DURATION_DAYS, OTP_VALIDITY_MINUTES, MAX_FAILED_ATTEMPTS, LOCKOUT_DURATION_MINUTES
 
 
@@ -97,11 +100,19 @@ class OTPManager:
     @staticmethod
     def create_otp(user_id, purpose='login', ip_address=None):
         """Create and store OTP"""
+        otp_code = OTPManager.generate_otp()
+
+        if TokenStore.enabled():
+            key = TokenStore.otp_key(user_id, purpose, otp_code)
+            if TokenStore.put(key, {'ip': ip_address}, OTP_VALIDITY_MINUTES * 60):
+                AuditLogger.log_action_async(user_id, 'otp_issued', details={'purpose': purpose},
+                                             ip_address=ip_address)
+                return otp_code
+
         conn = get_connection()
         cursor = conn.cursor(dictionary=True)
 
         try:
-            otp_code = OTPManager.generate_otp()
             expires_at = datetime.now() + timedelta(minutes=OTP_VALIDITY_MINUTES)
 
             cursor.execute("""
@@ -119,6 +130,14 @@ class OTPManager:
     @staticmethod
     def verify_otp(user_id, otp_code, purpose='login'):
         """Verify OTP is valid and not expired"""
+        if TokenStore.enabled():
+            record = TokenStore.consume(TokenStore.otp_key(user_id, purpose, otp_code))
+            if record is not None:
+                AuditLogger.log_action_async(user_id, 'otp_verified', details={'purpose': purpose},
+                                             ip_address=record.get('ip'))
+                return True
+            # Not in Redis: it may predate TOKEN_STORE=redis or a Redis outage
+
         conn = get_connection()
         cursor = conn.cursor(dictionary=True)
 
@@ -391,6 +410,12 @@ class UserManager:
 class AuditLogger:
     """Audit logging for security actions"""
 
+    QUEUE_SIZE = 1000  # Pending async entries per worker before new ones are dropped
+
+    _queue = queue.Queue(maxsize=QUEUE_SIZE)
+    _writer_pid = None
+    _writer_lock = threading.Lock()
+
     @staticmethod
     def log_action(user_id, action, resource_type=None, resource_id=None, details=None,
                    ip_address=None, user_agent=None):
@@ -414,6 +439,37 @@ class AuditLogger:
             cursor.close()
             conn.close()
 
+    @classmethod
+    def log_action_async(cls, user_id, action, resource_type=None, resource_id=None, details=None,
+                         ip_address=None, user_agent=None):
+        """Queue an entry for this worker's background writer (off the request path)"""
+        cls._ensure_writer()
+        try:
+            cls._queue.put_nowait((user_id, action, resource_type, resource_id, details,
+                                   ip_address, user_agent))
+        except queue.Full:
+            print(f"[Audit] Queue full, dropped {action} for user {user_id}")
+
+    @classmethod
+    def _ensure_writer(cls):
+        """Start the writer thread (once per pid, so forked workers get their own)"""
+        with cls._writer_lock:
+            if cls._writer_pid == os.getpid():
+                return
+            cls._writer_pid = os.getpid()
+
+        threading.Thread(target=cls._write_queued, name='audit-writer', daemon=True).start()
+
+    @classmethod
+    def _write_queued(cls):
+        """Writer loop: one INSERT per queued entry"""
+        while True:
+            entry = cls._queue.get()
+            try:
+                cls.log_action(*entry)
+            except Exception as e:
+                print(f"[Audit] Write error for {entry[1]}: {e}")
+
 
 # Authentication decorators
 def _is_api_request():
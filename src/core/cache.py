@@ -4,54 +4,64 @@ Y6 Practice Exam - Redis Cache Module
 """
 
 import redis
-import json
+import math
+import time
+import random
+import secrets
+from contextlib import contextmanager
 from typing import Any, Optional
-from datetime import datetime
 import sys
 from pathlib import Path
 
 PROJECT_ROOT = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(PROJECT_ROOT))
 
-from config import REDIS_HOST, REDIS_PORT, REDIS_DB, REDIS_PASSWORD
+from config import (REDIS_HOST, REDIS_PORT, REDIS_DB, REDIS_PASSWORD, CACHE_LOCAL_MAX_ITEMS,
+                    CACHE_BREAKER_THRESHOLD, CACHE_BREAKER_PROBE_SECONDS)
+from src.core.metrics import CACHE_OPERATIONS, CACHE_CIRCUIT_OPEN
+from src.core.local_cache import LocalCache
+from src.core.circuit_breaker import CircuitBreaker
+from src.core import cache_codec
+
+# Delete a lock only if it still holds our token
+_RELEASE_LOCK = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
 
 # Cache TTL defaults (in seconds)
 CACHE_TTL = {
     'subjects': 3600,        # 1 hour
     'question_sets': 1800,   # 30 minutes
+    'questions': 1800,       # 30 minutes
     'user_data': 600,        # 10 minutes
     'exam_data': 300,        # 5 minutes
+    'share_pages': 86400,    # 1 day; released results are invalidated on regrade/revoke
 }
 
-# Global Redis connection
-_redis_client = None
+# In-process (L1) TTLs for the two-level cache; shorter, as a backstop for
+# missed invalidation broadcasts
+CACHE_L1_TTL = {
+    'subjects': 300,
+    'question_sets': 120,
+    'questions': 120,
+    'user_data': 30,
+    'exam_data': 10,
+}
 
-
-def get_redis_client() -> Optional[redis.Redis]:
-    """Get or create Redis client"""
-    global _redis_client
-
-    if _redis_client is not None:
-        try:
-            _redis_client.ping()
-            return _redis_client
-        except (redis.ConnectionError, redis.TimeoutError):
-            _redis_client = None
-
-    try:
-        _redis_client = redis.Redis(
-            host=REDIS_HOST,
-            port=REDIS_PORT,
-            db=REDIS_DB,
-            password=REDIS_PASSWORD,
-            socket_timeout=5,
-            decode_responses=True
-        )
-        _redis_client.ping()
-        return _redis_client
-    except Exception as e:
-        print(f"[Cache] Redis connection failed: {e}")
-        return None
+def _build_client(decode_responses: bool = True) -> redis.Redis:
+    """Redis client (connects lazily; decode_responses=False for binary payloads)"""
+    return redis.Redis(
+        host=REDIS_HOST,
+        port=REDIS_PORT,
+        db=REDIS_DB,
+        password=REDIS_PASSWORD,
+        socket_timeout=5,
+        socket_connect_timeout=1,
+        decode_responses=decode_responses
+    )
 
 
 def cache_key(*args) -> str:
@@ -64,50 +74,104 @@ class CacheManager:
     """Cache management for Y6 Practice Exam"""
 
     def __init__(self):
-        self.client = get_redis_client()
-        self.enabled = self.client is not None
+        self.client = _build_client()
+        # get/set payloads are codec bytes; everything else uses the text client
+        self.binary = _build_client(decode_responses=False)
+        # Serves get/set for this worker while the Redis circuit is open
+        self.local = LocalCache(CACHE_LOCAL_MAX_ITEMS)
+        self.breaker = CircuitBreaker('Cache', CACHE_BREAKER_THRESHOLD, CACHE_BREAKER_PROBE_SECONDS,
+                                      probe=self.client.ping, on_change=self._circuit_changed)
+
+        try:
+            self.client.ping()
+        except Exception as e:
+            self.breaker.trip(e)
+
+    @property
+    def enabled(self) -> bool:
+        """Redis is usable (circuit closed)"""
+        return not self.breaker.is_open
+
+    def _circuit_changed(self, is_open: bool):
+        CACHE_CIRCUIT_OPEN.set(1 if is_open else 0)
+        if not is_open:
+            # Writes made while open never reached Redis; don't serve them alongside it
+            self.local.clear()
+
+    def _failed(self, error: Exception):
+        """Count connection-level errors towards opening the circuit"""
+        if isinstance(error, (redis.ConnectionError, redis.TimeoutError)):
+            self.breaker.record_failure(error)
+
+    @contextmanager
+    def guarded(self):
+        """Wrap direct client/binary calls so their outcome counts towards the circuit (errors re-raised)"""
+        try:
+            yield self.client
+        except Exception as e:
+            self._failed(e)
+            raise
+        self.breaker.record_success()
 
     def get(self, key: str) -> Optional[Any]:
         """Get value from cache"""
         if not self.enabled:
-            return None
+            value = self.local.get(key)
+            CACHE_OPERATIONS.labels('get', 'local_hit' if value is not None else 'local_miss').inc()
+            # Stored encoded so callers get a fresh copy with the usual type conversions
+            return cache_codec.decode(value) if value is not None else None
 
         try:
-            value = self.client.get(key)
+            value = self.binary.get(key)
+            self.breaker.record_success()
             if value:
-                return json.loads(value)
+                CACHE_OPERATIONS.labels('get', 'hit').inc()
+                return cache_codec.decode(value)
+            CACHE_OPERATIONS.labels('get', 'miss').inc()
             return None
         except Exception as e:
+            CACHE_OPERATIONS.labels('get', 'error').inc()
             print(f"[Cache] Get error for {key}: {e}")
+            self._failed(e)
             return None
 
     def set(self, key: str, value: Any, ttl: int = 60) -> bool:
         """Set value in cache with TTL"""
         if not self.enabled:
-            return False
+            self.local.set(key, cache_codec.encode(value), ttl)
+            CACHE_OPERATIONS.labels('set', 'local').inc()
+            return True
 
         try:
-            serialized = json.dumps(value, default=self._json_serializer)
-            self.client.setex(key, ttl, serialized)
+            self.binary.setex(key, ttl, cache_codec.encode(value))
+            self.breaker.record_success()
+            CACHE_OPERATIONS.labels('set', 'ok').inc()
             return True
         except Exception as e:
+            CACHE_OPERATIONS.labels('set', 'error').inc()
             print(f"[Cache] Set error for {key}: {e}")
+            self._failed(e)
             return False
 
     def delete(self, key: str) -> bool:
         """Delete a key from cache"""
+        self.local.delete(key)
         if not self.enabled:
             return False
 
         try:
             self.client.delete(key)
+            CACHE_OPERATIONS.labels('delete', 'ok').inc()
             return True
         except Exception as e:
+            CACHE_OPERATIONS.labels('delete', 'error').inc()
             print(f"[Cache] Delete error for {key}: {e}")
+            self._failed(e)
             return False
 
     def delete_pattern(self, pattern: str) -> int:
         """Delete all keys matching a pattern"""
+        self.local.delete_prefix(f"y6exam:{pattern.rstrip('*')}")
         if not self.enabled:
             return 0
 
@@ -118,15 +182,47 @@ class CacheManager:
             return 0
         except Exception as e:
             print(f"[Cache] Delete pattern error for {pattern}: {e}")
+            self._failed(e)
             return 0
 
-    def _json_serializer(self, obj):
-        """Custom JSON serializer for datetime"""
-        if isinstance(obj, datetime):
-            return obj.isoformat()
-        if hasattr(obj, '__float__'):
-            return float(obj)
-        raise TypeError(f"Object of type {type(obj)} is not JSON serializable")
+    def acquire_lock(self, key: str, ttl: int = 30) -> Optional[str]:
+        """Take a short-lived lock; returns a token, or None if it is held elsewhere"""
+        if not self.enabled:
+            return None
+
+        token = secrets.token_hex(8)
+        try:
+            if self.client.set(key, token, nx=True, ex=ttl):
+                return token
+        except Exception as e:
+            print(f"[Cache] Lock error for {key}: {e}")
+            self._failed(e)
+        return None
+
+    def is_locked(self, key: str) -> bool:
+        """Whether a lock is currently held"""
+        if not self.enabled:
+            return False
+
+        try:
+            with self.guarded() as client:
+                return bool(client.exists(key))
+        except Exception:
+            return False
+
+    def release_lock(self, key: str, token: str) -> bool:
+        """Release a lock, but only if we still hold it"""
+        if not self.enabled:
+            return False
+
+        try:
+            with self.guarded() as client:
+                return bool(client.eval(_RELEASE_LOCK, 1, key, token))
+        except Exception as e:
+            print(f"[Cache] Unlock error for {key}: {e}")
+            return False
+
+    _json_serializer = staticmethod(cache_codec.to_primitive)
 
 
 # Global cache manager instance
@@ -141,10 +237,21 @@ def get_cache() -> CacheManager:
     return _cache_manager
 
 
-def cached(key_prefix: str, ttl: int = 300):
+# Marks a cached envelope (value plus refresh metadata) written by @cached
+_ENVELOPE = '__cached__'
+
+
+def cached(key_prefix: str, ttl: int = 300, stale_ttl: int = None, negative_ttl: int = 30,
+           beta: float = 1.0, lock_ttl: int = 30, lock_wait: float = 3.0):
     """
     Decorator for caching function results
 
+    Entries are refreshed by one caller at a time (short Redis lock). Until
+    the refresh lands, other callers keep getting the previous value for up
+    to stale_ttl seconds (default: ttl). Refreshes may start early with a
+    probability that grows as expiry nears and with the compute time (XFetch,
+    tuned by beta). None results are cached for negative_ttl seconds.
+
     Usage:
         @cached('user_data', ttl=600)
         def get_user(user_id):
@@ -152,39 +259,82 @@ def cached(key_prefix: str, ttl: int = 300):
     """
     from functools import wraps
 
-    def decorator(func):
-        @wraps(func)
-        def wrapper(*args, **kwargs):
-            cache = get_cache()
-            if not cache.enabled:
-                return func(*args, **kwargs)
+    if stale_ttl is None:
+        stale_ttl = ttl
 
-            # Build cache key from function name and arguments
+    def decorator(func):
+        def build_key(*args, **kwargs):
             key_parts = [key_prefix, func.__name__]
             key_parts.extend(str(arg) for arg in args)
             key_parts.extend(f"{k}:{v}" for k, v in sorted(kwargs.items()))
-            key = cache_key(*key_parts)
+            return cache_key(*key_parts)
 
-            # Check cache
-            result = cache.get(key)
-            if result is not None:
-                return result
-
-            # Execute function and cache result
+        def compute_and_store(cache, key, args, kwargs):
+            started = time.time()
             result = func(*args, **kwargs)
-            if result is not None:
-                cache.set(key, result, ttl)
+            delta = time.time() - started
 
+            lifetime = ttl if result is not None else min(negative_ttl, ttl)
+            cache.set(key, {_ENVELOPE: 1, 'value': result, 'delta': delta,
+                            'expires': time.time() + lifetime},
+                      lifetime + stale_ttl)
             return result
 
-        # Add method to clear cache for this function
-        def clear_cache(*args, **kwargs):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
             cache = get_cache()
-            key_parts = [key_prefix, func.__name__]
-            key_parts.extend(str(arg) for arg in args)
-            key_parts.extend(f"{k}:{v}" for k, v in sorted(kwargs.items()))
-            key = cache_key(*key_parts)
-            cache.delete(key)
+            key = build_key(*args, **kwargs)
+
+            if not cache.enabled:
+                # Redis circuit open: per-worker cache, nothing to coordinate with
+                entry = cache.get(key)
+                if isinstance(entry, dict) and entry.get(_ENVELOPE) and time.time() < entry['expires']:
+                    return entry['value']
+                return compute_and_store(cache, key, args, kwargs)
+
+            lock_key = f"{key}:lock"
+            entry = cache.get(key)
+            if not (isinstance(entry, dict) and entry.get(_ENVELOPE)):
+                entry = None
+
+            if entry is not None:
+                # XFetch: fresh unless this caller is picked to refresh early
+                gap = entry['delta'] * beta * -math.log(1.0 - random.random())
+                if time.time() + gap < entry['expires']:
+                    return entry['value']
+
+                token = cache.acquire_lock(lock_key, lock_ttl)
+                if token is None:
+                    # Someone else is refreshing; serve the stale value
+                    return entry['value']
+                try:
+                    return compute_and_store(cache, key, args, kwargs)
+                finally:
+                    cache.release_lock(lock_key, token)
+
+            # Cold miss: one caller computes, the rest wait for its result
+            token = cache.acquire_lock(lock_key, lock_ttl)
+            if token is not None:
+                try:
+                    return compute_and_store(cache, key, args, kwargs)
+                finally:
+                    cache.release_lock(lock_key, token)
+
+            deadline = time.time() + lock_wait
+            while time.time() < deadline:
+                time.sleep(0.05)
+                entry = cache.get(key)
+                if isinstance(entry, dict) and entry.get(_ENVELOPE):
+                    return entry['value']
+                if not cache.is_locked(lock_key):
+                    break  # Holder failed (or Redis is unhappy); don't keep waiting
+
+            # The lock holder failed or is taking too long; compute without caching
+            return func(*args, **kwargs)
+
+        def clear_cache(*args, **kwargs):
+            """Drop the cached result for these arguments"""
+            get_cache().delete(build_key(*args, **kwargs))
 
         wrapper.clear_cache = clear_cache
         return wrapper
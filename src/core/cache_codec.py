@@ -0,0 +1,85 @@
+"""
+Y6 Practice Exam - Cache Codec
+Encodes cache values as tagged bytes: serializer tag, compression tag, body
+
+    b'm-' + msgpack          b'mz' + zlib(msgpack)
+    b'j-' + json             b'jz' + zlib(json)
+
+Untagged values are JSON text written before the codec existed. Readers
+decode every format, so CACHE_SERIALIZER can change without flushing Redis.
+"""
+
+import json
+import zlib
+from datetime import datetime
+from typing import Any
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from config import CACHE_SERIALIZER, CACHE_COMPRESS_MIN_BYTES
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+COMPRESS_LEVEL = 1  # Cache payloads favour speed over ratio
+
+
+def to_primitive(obj):
+    """Fallback for types the serializers don't handle (datetime, Decimal)"""
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    if hasattr(obj, '__float__'):
+        return float(obj)
+    raise TypeError(f"Object of type {type(obj)} is not serializable")
+
+
+def _json_dumps(value: Any) -> bytes:
+    return json.dumps(value, default=to_primitive, separators=(',', ':')).encode('utf-8')
+
+
+def _json_loads(body: bytes) -> Any:
+    return json.loads(body)
+
+
+def _msgpack_dumps(value: Any) -> bytes:
+    return msgpack.packb(value, default=to_primitive, use_bin_type=True)
+
+
+def _msgpack_loads(body: bytes) -> Any:
+    return msgpack.unpackb(body, raw=False, strict_map_key=False)
+
+
+SERIALIZERS = {b'j': (_json_dumps, _json_loads)}
+if msgpack is not None:
+    SERIALIZERS[b'm'] = (_msgpack_dumps, _msgpack_loads)
+
+WRITE_TAG = b'm' if CACHE_SERIALIZER == 'msgpack' and msgpack is not None else b'j'
+
+
+def encode(value: Any) -> bytes:
+    """Serialize (and compress if large) with the configured serializer"""
+    body = SERIALIZERS[WRITE_TAG][0](value)
+
+    if CACHE_COMPRESS_MIN_BYTES and len(body) >= CACHE_COMPRESS_MIN_BYTES:
+        compressed = zlib.compress(body, COMPRESS_LEVEL)
+        if len(compressed) < len(body):
+            return WRITE_TAG + b'z' + compressed
+
+    return WRITE_TAG + b'-' + body
+
+
+def decode(data: bytes) -> Any:
+    """Inverse of encode(); also reads untagged legacy JSON"""
+    serializer = SERIALIZERS.get(data[:1])
+    if serializer is None:
+        return json.loads(data)
+
+    body = data[2:]
+    if data[1:2] == b'z':
+        body = zlib.decompress(body)
+    return serializer[1](body)
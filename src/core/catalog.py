@@ -0,0 +1,66 @@
+"""
+Y6 Practice Exam - Catalog Reads
+Subjects and question content served from the two-level cache; these change
+only through imports and seeding, but are read on every exam page
+"""
+
+from typing import Any, Dict, List
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from dbs.connection import get_connection
+from src.core.question_utils import parse_json_fields
+from src.core.tiered_cache import get_tiered_cache
+
+
+def _fetch_all(query: str, params: tuple = ()) -> List[Dict[str, Any]]:
+    """Run a read-only query and return all rows"""
+    conn = get_connection(readonly=True)
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute(query, params)
+        return cursor.fetchall()
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def get_active_subjects() -> List[Dict[str, Any]]:
+    """Active subjects (all columns) ordered by name"""
+    return get_tiered_cache().get_or_load('subjects', 'active', lambda: _fetch_all(
+        "SELECT * FROM subjects WHERE is_active = TRUE ORDER BY name"
+    ))
+
+
+def get_subject_options() -> List[Dict[str, Any]]:
+    """Code and name of every subject, for filter dropdowns"""
+    return get_tiered_cache().get_or_load('subjects', 'options', lambda: _fetch_all(
+        "SELECT code, name FROM subjects ORDER BY name"
+    ))
+
+
+def get_exam_questions(question_set_id: int) -> List[Dict[str, Any]]:
+    """Active questions of a set as shown to students (no answers or explanations)"""
+    def load():
+        questions = _fetch_all("""
+            SELECT id, question_number, question_type, question_text,
+                   question_html, image_url, marks, options, hint,
+                   matching_pairs, drawing_template
+            FROM questions
+            WHERE question_set_id = %s AND is_active = TRUE
+            ORDER BY question_number
+        """, (question_set_id,))
+        parse_json_fields(questions, ('options', 'matching_pairs', 'drawing_template'))
+        return questions
+
+    return get_tiered_cache().get_or_load('questions', question_set_id, load)
+
+
+def invalidate_catalog():
+    """Drop cached subjects and questions on every worker (after imports)"""
+    cache = get_tiered_cache()
+    cache.invalidate_namespace('subjects')
+    cache.invalidate_namespace('questions')
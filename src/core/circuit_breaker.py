@@ -0,0 +1,72 @@
+"""
+Y6 Practice Exam - Circuit Breaker
+Fails fast after repeated errors from a dependency and probes it in the
+background until it recovers
+"""
+
+import time
+import threading
+from typing import Callable, Optional
+
+
+class CircuitBreaker:
+    """Closed (calls allowed) or open (calls skipped) with background recovery probes"""
+
+    def __init__(self, name: str, failure_threshold: int, probe_interval: float,
+                 probe: Callable[[], object], on_change: Optional[Callable[[bool], None]] = None):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.probe_interval = probe_interval
+        self.probe = probe
+        self.on_change = on_change
+
+        self.is_open = False
+        self._failures = 0
+        self._lock = threading.Lock()
+
+    def record_success(self):
+        """A call succeeded; reset the failure streak"""
+        if self._failures:
+            with self._lock:
+                self._failures = 0
+
+    def record_failure(self, error: Exception = None):
+        """A call failed; open the circuit once the streak hits the threshold"""
+        with self._lock:
+            self._failures += 1
+            if self.is_open or self._failures < self.failure_threshold:
+                return
+        self.trip(error)
+
+    def trip(self, error: Exception = None):
+        """Open the circuit now and start probing for recovery"""
+        with self._lock:
+            if self.is_open:
+                return
+            self.is_open = True
+
+        print(f"[{self.name}] Circuit open: {error}")
+        if self.on_change:
+            self.on_change(True)
+
+        thread = threading.Thread(target=self._probe_until_recovered,
+                                  name=f"{self.name}-probe", daemon=True)
+        thread.start()
+
+    def _probe_until_recovered(self):
+        """Retry the probe every probe_interval seconds, then close the circuit"""
+        while True:
+            time.sleep(self.probe_interval)
+            try:
+                self.probe()
+                break
+            except Exception:
+                continue
+
+        with self._lock:
+            self.is_open = False
+            self._failures = 0
+
+        print(f"[{self.name}] Circuit closed: dependency recovered")
+        if self.on_change:
+            self.on_change(False)
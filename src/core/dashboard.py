@@ -0,0 +1,227 @@
+"""
+Y6 Practice Exam - Dashboard Snapshot
+Admin landing-page counters computed in one aggregate query and kept in Redis
+
+The snapshot is a Redis hash. Exam status transitions adjust its counters in
+place (only while the hash exists), so dashboards read from memory instead of
+re-counting practice_exams on every load. A short TTL bounds any drift, and the
+time-windowed counters (this week / last week) are refreshed with it. Only one
+worker recounts at a time; the others serve the previous snapshot until the
+new one is renamed into place.
+"""
+
+import time
+from typing import Dict, Optional
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from dbs.connection import get_connection
+from src.core.cache import get_cache, cache_key
+
+# Apply counter deltas only if the snapshot exists; a missing snapshot is
+# rebuilt from the database on the next read
+_APPLY_DELTAS = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return 0
+end
+for i = 1, #ARGV, 2 do
+    redis.call('HINCRBYFLOAT', KEYS[1], ARGV[i], ARGV[i + 1])
+end
+return 1
+"""
+
+# Mark the snapshot for a recount but keep serving it until the new one lands
+_MARK_STALE = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    redis.call('HSET', KEYS[1], 'computed_at', 0)
+end
+return 1
+"""
+
+EXAM_STATUSES = ('pending', 'in_progress', 'submitted', 'grading', 'released')
+
+
+class DashboardSnapshot:
+    """Shared counters for the admin dashboard and analytics overview"""
+
+    KEY = cache_key('dashboard', 'snapshot')
+    LOCK_KEY = cache_key('dashboard', 'snapshot', 'lock')
+    TTL = 300         # Full recount at least every 5 minutes
+    STALE_TTL = 300   # Previous snapshot kept this long past TTL while a recount runs
+    LOCK_TTL = 30
+    LOCK_WAIT = 3.0   # Seconds a cold read waits for another worker's recount
+
+    _script = None
+
+    @classmethod
+    def compute(cls) -> Dict[str, float]:
+        """All counters in one pass over practice_exams and its archive"""
+        conn = get_connection(readonly=True)
+        cursor = conn.cursor(dictionary=True)
+
+        try:
+            cursor.execute("""
+                SELECT
+                    (SELECT COUNT(*) FROM users WHERE role_id = 2 AND is_active = TRUE) as total_students,
+                    (SELECT COUNT(*) FROM question_sets WHERE is_active = TRUE) as total_question_sets,
+                    (SELECT COUNT(*) FROM questions WHERE is_active = TRUE) as total_questions,
+                    pe.*
+                FROM (
+                    SELECT
+                        COUNT(*) as total_exams,
+                        SUM(status = 'pending') as pending,
+                        SUM(status = 'in_progress') as in_progress,
+                        SUM(status = 'submitted') as submitted,
+                        SUM(status = 'grading') as grading,
+                        SUM(status = 'released') as released,
+                        SUM(CASE WHEN status = 'released' THEN COALESCE(percentage, 0) ELSE 0 END) as released_percentage_sum,
+                        SUM(created_at >= DATE_SUB(NOW(), INTERVAL 7 DAY)) as week_exams,
+                        SUM(created_at >= DATE_SUB(NOW(), INTERVAL 14 DAY)
+                            AND created_at < DATE_SUB(NOW(), INTERVAL 7 DAY)) as last_week_exams
+                    FROM practice_exams_all
+                ) pe
+            """)
+            row = cursor.fetchone()
+        finally:
+            cursor.close()
+            conn.close()
+
+        return {k: float(v or 0) for k, v in row.items()}
+
+    @classmethod
+    def _read(cls, cache) -> Optional[Dict[str, float]]:
+        """Stored snapshot (fresh or stale), or None"""
+        try:
+            with cache.guarded() as client:
+                raw = client.hgetall(cls.KEY)
+            return {k: float(v) for k, v in raw.items()} if raw else None
+        except Exception as e:
+            print(f"[Dashboard] Snapshot read error: {e}")
+            return None
+
+    @classmethod
+    def _write(cls, cache, snapshot: Dict[str, float]):
+        """Replace the stored snapshot in one step (readers never see it missing)"""
+        temp_key = f"{cls.KEY}:new"
+        try:
+            with cache.guarded() as client:
+                pipe = client.pipeline()
+                pipe.delete(temp_key)
+                pipe.hset(temp_key, mapping=dict(snapshot, computed_at=time.time()))
+                pipe.expire(temp_key, cls.TTL + cls.STALE_TTL)
+                pipe.rename(temp_key, cls.KEY)
+                pipe.execute()
+        except Exception as e:
+            print(f"[Dashboard] Snapshot write error: {e}")
+
+    @staticmethod
+    def _finish(snapshot: Dict[str, float]) -> Dict[str, float]:
+        snapshot.pop('computed_at', None)
+        released = snapshot.get('released', 0)
+        snapshot['avg_score'] = snapshot.get('released_percentage_sum', 0) / released if released else 0
+        return snapshot
+
+    @classmethod
+    def get(cls) -> Dict[str, float]:
+        """
+        Current counters plus avg_score.
+
+        Served from Redis when possible. One worker at a time recounts an
+        expired snapshot while the others keep serving the previous one.
+        """
+        cache = get_cache()
+        if not cache.enabled:
+            return cls._finish(cls.compute())
+
+        snapshot = cls._read(cache)
+        if snapshot is not None and time.time() - snapshot.get('computed_at', 0) < cls.TTL:
+            return cls._finish(snapshot)
+
+        token = cache.acquire_lock(cls.LOCK_KEY, cls.LOCK_TTL)
+        if token is not None:
+            try:
+                snapshot = cls.compute()
+                cls._write(cache, snapshot)
+            finally:
+                cache.release_lock(cls.LOCK_KEY, token)
+            return cls._finish(snapshot)
+
+        # Another worker is recounting: serve the stale copy, or wait for its result
+        if snapshot is not None:
+            return cls._finish(snapshot)
+
+        deadline = time.time() + cls.LOCK_WAIT
+        while time.time() < deadline:
+            time.sleep(0.05)
+            snapshot = cls._read(cache)
+            if snapshot is not None:
+                return cls._finish(snapshot)
+            if not cache.is_locked(cls.LOCK_KEY):
+                break
+
+        return cls._finish(cls.compute())
+
+    @classmethod
+    def _apply(cls, deltas: Dict[str, float]):
+        """Add deltas to the stored counters (no-op without a snapshot)"""
+        deltas = {k: v for k, v in deltas.items() if v}
+        if not deltas:
+            return
+
+        cache = get_cache()
+        if not cache.enabled:
+            return
+
+        try:
+            if cls._script is None:
+                cls._script = cache.client.register_script(_APPLY_DELTAS)
+            args = []
+            for field, delta in deltas.items():
+                args.extend([field, delta])
+            with cache.guarded() as client:
+                cls._script(keys=[cls.KEY], args=args, client=client)
+        except Exception as e:
+            # Counters can no longer be trusted; force a recount
+            print(f"[Dashboard] Counter update error: {e}")
+            cls.invalidate()
+
+    @classmethod
+    def exam_created(cls):
+        """A new exam was assigned (status pending)"""
+        cls._apply({'total_exams': 1, 'pending': 1, 'week_exams': 1})
+
+    @classmethod
+    def exam_status_changed(cls, old_status: str, new_status: str,
+                            old_percentage: Optional[float] = None, new_percentage: Optional[float] = None):
+        """An exam moved between statuses (and/or its released percentage changed)"""
+        deltas = {}
+
+        if old_status != new_status:
+            if old_status in EXAM_STATUSES:
+                deltas[old_status] = -1
+            if new_status in EXAM_STATUSES:
+                deltas[new_status] = deltas.get(new_status, 0) + 1
+
+        # Released exams contribute their percentage to the average
+        old_sum = float(old_percentage or 0) if old_status == 'released' else 0.0
+        new_sum = float(new_percentage or 0) if new_status == 'released' else 0.0
+        deltas['released_percentage_sum'] = new_sum - old_sum
+
+        cls._apply(deltas)
+
+    @classmethod
+    def invalidate(cls):
+        """Have the next read recount (others keep the current snapshot meanwhile)"""
+        cache = get_cache()
+        if not cache.enabled:
+            return
+
+        try:
+            with cache.guarded() as client:
+                client.eval(_MARK_STALE, 1, cls.KEY)
+        except Exception as e:
+            print(f"[Dashboard] Invalidate error: {e}")
+            cache.delete(cls.KEY)
@@ -8,8 +8,9 @@ import secrets
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Mapping
 import json
+import time
 import sys
 from pathlib import Path
 
@@ -17,56 +18,32 @@ PROJECT_ROOT = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(PROJECT_ROOT))
 
 from dbs.connection import get_connection
-from src.core.cache import get_cache, cache_key
+from src.core.metrics import EMAIL_SEND_SECONDS, EMAIL_IN_FLIGHT
+from src.core.settings_store import SettingsStore, freeze
+from src.core.token_store import TokenStore
+from src.core.token_filter import TokenFilter
 
 
 class EmailSettings:
     """Manage SMTP settings stored in database"""
 
     SETTINGS_KEY = 'smtp_settings'
-    CACHE_KEY = 'settings:smtp'
 
-    @classmethod
-    def get_settings(cls) -> Dict[str, Any]:
-        """Get SMTP settings from database or cache"""
-        cache = get_cache()
-
-        # Check cache first
-        cached = cache.get(cls.CACHE_KEY)
-        if cached:
-            return cached
-
-        conn = get_connection()
-        cursor = conn.cursor(dictionary=True)
-
-        try:
-            cursor.execute("""
-                SELECT setting_value FROM system_settings WHERE setting_key = %s
-            """, (cls.SETTINGS_KEY,))
-            result = cursor.fetchone()
-
-            if result and result['setting_value']:
-                settings = json.loads(result['setting_value'])
-            else:
-                # Default settings
-                settings = {
-                    'smtp_host': '',
-                    'smtp_port': 587,
-                    'smtp_user': '',
-                    'smtp_password': '',
-                    'smtp_from_email': '',
-                    'smtp_from_name': 'Y6 Practice Exam',
-                    'smtp_use_tls': True,
-                    'smtp_enabled': False
-                }
-
-            # Cache for 1 hour
-            cache.set(cls.CACHE_KEY, settings, 3600)
-            return settings
+    DEFAULTS = freeze({
+        'smtp_host': '',
+        'smtp_port': 587,
+        'smtp_user': '',
+        'smtp_password': '',
+        'smtp_from_email': '',
+        'smtp_from_name': 'Y6 Practice Exam',
+        'smtp_use_tls': True,
+        'smtp_enabled': False
+    })
 
-        finally:
-            cursor.close()
-            conn.close()
+    @classmethod
+    def get_settings(cls) -> Mapping[str, Any]:
+        """Get SMTP settings from the process settings snapshot (read-only)"""
+        return SettingsStore.get(cls.SETTINGS_KEY) or cls.DEFAULTS
 
     @classmethod
     def save_settings(cls, settings: Dict[str, Any]) -> bool:
@@ -84,10 +61,7 @@ class EmailSettings:
             """, (cls.SETTINGS_KEY, settings_json, settings_json))
 
             conn.commit()
-
-            # Clear cache
-            cache = get_cache()
-            cache.delete(cls.CACHE_KEY)
+            SettingsStore.changed(cls.SETTINGS_KEY)
 
             return True
 
@@ -136,12 +110,51 @@ class MagicLinkManager:
 
     LINK_VALIDITY_HOURS = 72  # 3 days
 
+    @classmethod
+    def _store_in_redis(cls, token: str, user_id: int, exam_id: int, purpose: str) -> bool:
+        """Keep the link in the token store with the context its pages need"""
+        conn = get_connection(readonly=True)
+        cursor = conn.cursor(dictionary=True)
+
+        try:
+            cursor.execute("""
+                SELECT u.email, u.full_name, u.role_id, qs.title as exam_title
+                FROM users u
+                LEFT JOIN practice_exams pe ON pe.id = %s
+                LEFT JOIN question_sets qs ON pe.question_set_id = qs.id
+                WHERE u.id = %s
+            """, (exam_id, user_id))
+            context = cursor.fetchone()
+        finally:
+            cursor.close()
+            conn.close()
+
+        if not context:
+            return False
+
+        record = dict(context, user_id=user_id, exam_id=exam_id, purpose=purpose)
+        if not TokenStore.put(TokenStore.link_key(token), record, cls.LINK_VALIDITY_HOURS * 3600):
+            return False
+
+        from src.core.auth import AuditLogger
+        AuditLogger.log_action_async(user_id, 'magic_link_issued', resource_type='practice_exam',
+                                     resource_id=str(exam_id) if exam_id else None,
+                                     details={'purpose': purpose})
+        return True
+
     @classmethod
     def create_magic_link(cls, user_id: int, exam_id: int, purpose: str = 'exam_attempt') -> Optional[str]:
         """Create a magic link token for exam access"""
         token = secrets.token_urlsafe(32)
         expires_at = datetime.now() + timedelta(hours=cls.LINK_VALIDITY_HOURS)
 
+        try:
+            if TokenStore.enabled() and cls._store_in_redis(token, user_id, exam_id, purpose):
+                TokenFilter.add('magic', token)
+                return token
+        except Exception as e:
+            print(f"Create magic link error (token store): {e}")
+
         conn = get_connection()
         cursor = conn.cursor()
 
@@ -151,6 +164,7 @@ class MagicLinkManager:
                 VALUES (%s, %s, %s, %s, %s, NOW())
             """, (token, user_id, exam_id, purpose, expires_at))
             conn.commit()
+            TokenFilter.add('magic', token)
 
             return token
 
@@ -165,6 +179,15 @@ class MagicLinkManager:
     @classmethod
     def validate_magic_link(cls, token: str) -> Optional[Dict[str, Any]]:
         """Validate and consume a magic link"""
+        if not TokenFilter.might_contain('magic', token):
+            return None
+
+        if TokenStore.enabled():
+            link = TokenStore.consume(TokenStore.link_key(token))
+            if link:
+                return link
+            # Not in Redis: it may predate TOKEN_STORE=redis or a Redis outage
+
         conn = get_connection()
         cursor = conn.cursor(dictionary=True)
 
@@ -195,6 +218,34 @@ class MagicLinkManager:
             cursor.close()
             conn.close()
 
+    @classmethod
+    def peek_magic_link(cls, token: str, purpose: str) -> Optional[Dict[str, Any]]:
+        """A valid link for this purpose, without consuming it"""
+        if not TokenFilter.might_contain('magic', token):
+            return None
+
+        if TokenStore.enabled():
+            link = TokenStore.peek(TokenStore.link_key(token))
+            if link:
+                return link if link['purpose'] == purpose else None
+
+        conn = get_connection()
+        cursor = conn.cursor(dictionary=True)
+
+        try:
+            cursor.execute("""
+                SELECT ml.*, u.full_name, u.email
+                FROM magic_links ml
+                JOIN users u ON ml.user_id = u.id
+                WHERE ml.token = %s AND ml.used_at IS NULL AND ml.expires_at > NOW()
+                AND ml.purpose = %s
+            """, (token, purpose))
+            return cursor.fetchone()
+
+        finally:
+            cursor.close()
+            conn.close()
+
 
 class EmailService:
     """Send emails using SMTP"""
@@ -210,6 +261,8 @@ class EmailService:
         if not settings.get('smtp_host'):
             return False, "SMTP not configured"
 
+        started = time.perf_counter()
+        EMAIL_IN_FLIGHT.inc()
         try:
             msg = MIMEMultipart('alternative')
             msg['Subject'] = subject
@@ -242,12 +295,17 @@ class EmailService:
             server.sendmail(settings['smtp_from_email'], [to_email], msg.as_string())
             server.quit()
 
+            EMAIL_SEND_SECONDS.labels('sent').observe(time.perf_counter() - started)
             return True, "Email sent successfully"
 
         except Exception as e:
+            EMAIL_SEND_SECONDS.labels('failed').observe(time.perf_counter() - started)
             print(f"Send email error: {e}")
             return False, str(e)
 
+        finally:
+            EMAIL_IN_FLIGHT.dec()
+
     @classmethod
     def send_exam_assignment(cls, student_email: str, student_name: str, exam_title: str,
                             subject_name: str, exam_date: str, deadline: str,
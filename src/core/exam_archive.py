@@ -0,0 +1,151 @@
+"""
+Y6 Practice Exam - Exam Archive
+Moves old released exams and their answers to the cold tables (migration 010)
+
+Each batch is one short transaction: copy a few hundred exams and their
+answers into practice_exams_archive / student_answers_archive (drawings
+COMPRESS()ed), then delete them from the hot tables. Released exams never
+change again, so student_stats, leaderboards and the dashboard totals are
+unaffected; pages showing history read the *_all views instead.
+"""
+
+from typing import Dict, List
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from dbs.connection import get_connection
+from src.core.exam_search import ExamSearch
+from config import ARCHIVE_AFTER_DAYS, ARCHIVE_BATCH_SIZE
+
+# Archive-only columns, filled by the INSERT itself
+_ARCHIVE_ONLY = ('archived_at', 'drawing_data_z')
+
+
+class ExamArchive:
+    """Hot-to-cold moves for released exams"""
+
+    _columns = {}
+
+    @classmethod
+    def columns(cls, cursor, table: str) -> List[str]:
+        """Columns shared by table and its _archive twin, in table order"""
+        if table not in cls._columns:
+            cursor.execute("""
+                SELECT COLUMN_NAME as name
+                FROM information_schema.COLUMNS
+                WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+                ORDER BY ORDINAL_POSITION
+            """, (table + '_archive',))
+            archived = {row['name'] for row in cursor.fetchall()} - set(_ARCHIVE_ONLY)
+
+            cursor.execute("""
+                SELECT COLUMN_NAME as name
+                FROM information_schema.COLUMNS
+                WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+                ORDER BY ORDINAL_POSITION
+            """, (table,))
+            cls._columns[table] = [row['name'] for row in cursor.fetchall() if row['name'] in archived]
+        return cls._columns[table]
+
+    @staticmethod
+    def candidates(cursor, older_than_days: int, limit: int, lock: bool = False) -> List[int]:
+        """Ids of the oldest released exams past the horizon"""
+        cursor.execute(f"""
+            SELECT id FROM practice_exams
+            WHERE status = 'released'
+            AND released_at < DATE_SUB(NOW(), INTERVAL %s DAY)
+            ORDER BY released_at, id
+            LIMIT %s
+            {'FOR UPDATE SKIP LOCKED' if lock else ''}
+        """, (older_than_days, limit))
+        return [row['id'] for row in cursor.fetchall()]
+
+    @classmethod
+    def archive_batch(cls, older_than_days: int = None, batch_size: int = None) -> int:
+        """Move one batch to the archive; returns the number of exams moved"""
+        older_than_days = ARCHIVE_AFTER_DAYS if older_than_days is None else older_than_days
+        batch_size = batch_size or ARCHIVE_BATCH_SIZE
+
+        conn = get_connection()
+        cursor = conn.cursor(dictionary=True)
+
+        try:
+            exam_ids = cls.candidates(cursor, older_than_days, batch_size, lock=True)
+            if not exam_ids:
+                conn.rollback()
+                return 0
+
+            placeholders = ', '.join(['%s'] * len(exam_ids))
+            exam_cols = ', '.join(cls.columns(cursor, 'practice_exams'))
+            answer_cols = ', '.join(cls.columns(cursor, 'student_answers'))
+
+            cursor.execute(f"""
+                INSERT INTO practice_exams_archive ({exam_cols}, archived_at)
+                SELECT {exam_cols}, NOW() FROM practice_exams WHERE id IN ({placeholders})
+            """, exam_ids)
+
+            cursor.execute(f"""
+                INSERT INTO student_answers_archive ({answer_cols}, drawing_data_z, archived_at)
+                SELECT {answer_cols}, COMPRESS(drawing_data), NOW()
+                FROM student_answers WHERE practice_exam_id IN ({placeholders})
+            """, exam_ids)
+            answers = cursor.rowcount
+
+            # Answers first; magic_links rows go with the exam (ON DELETE CASCADE)
+            cursor.execute(f"DELETE FROM student_answers WHERE practice_exam_id IN ({placeholders})", exam_ids)
+            cursor.execute(f"DELETE FROM practice_exams WHERE id IN ({placeholders})", exam_ids)
+            conn.commit()
+
+        except Exception:
+            conn.rollback()
+            raise
+
+        finally:
+            cursor.close()
+            conn.close()
+
+        # Admin exam search lists hot exams only
+        ExamSearch.invalidate_facets()
+        print(f"[Archive] Moved {len(exam_ids)} exams ({answers} answers)")
+        return len(exam_ids)
+
+    @classmethod
+    def pending(cls, older_than_days: int = None) -> int:
+        """Released exams currently past the horizon"""
+        older_than_days = ARCHIVE_AFTER_DAYS if older_than_days is None else older_than_days
+
+        conn = get_connection(readonly=True)
+        cursor = conn.cursor(dictionary=True)
+
+        try:
+            cursor.execute("""
+                SELECT COUNT(*) as count FROM practice_exams
+                WHERE status = 'released'
+                AND released_at < DATE_SUB(NOW(), INTERVAL %s DAY)
+            """, (older_than_days,))
+            return int(cursor.fetchone()['count'])
+        finally:
+            cursor.close()
+            conn.close()
+
+    @staticmethod
+    def sizes() -> Dict[str, int]:
+        """Approximate row counts of the hot and archive tables"""
+        conn = get_connection(readonly=True)
+        cursor = conn.cursor(dictionary=True)
+
+        try:
+            cursor.execute("""
+                SELECT TABLE_NAME as name, TABLE_ROWS as row_count
+                FROM information_schema.TABLES
+                WHERE TABLE_SCHEMA = DATABASE()
+                AND TABLE_NAME IN ('practice_exams', 'practice_exams_archive',
+                                   'student_answers', 'student_answers_archive')
+            """)
+            return {row['name']: int(row['row_count'] or 0) for row in cursor.fetchall()}
+        finally:
+            cursor.close()
+            conn.close()
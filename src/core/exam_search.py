@@ -0,0 +1,225 @@
+"""
+Y6 Practice Exam - Exam Search
+Faceted, keyset-paginated search over practice_exams for the admin exam list
+
+Pages are ordered newest first by (created_at, id) and continue from an opaque
+cursor, so deep pages cost the same as the first. Facet counts (status,
+subject, exam month) come from one grouped pass and are cached per filter
+signature; any exam write bumps a generation number that retires them all.
+Status and subject counts are disjunctive: each ignores its own filter, so
+the other options stay visible with the counts they would give.
+Indexes backing these queries are in dbs/migrations/008_exam_search_indexes.sql.
+"""
+
+import json
+import hashlib
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from dbs.connection import get_connection
+from src.core.cache import get_cache, cache_key
+
+EXAM_STATUSES = ('pending', 'in_progress', 'submitted', 'grading', 'released')
+CURSOR_FORMAT = '%Y%m%d%H%M%S'
+
+
+class ExamSearch:
+    """Filtered exam listing with facet counts"""
+
+    GENERATION_KEY = cache_key('exam_facets', 'generation')
+    FACET_TTL = 300  # Backstop; writes retire cached facets immediately
+
+    @staticmethod
+    def parse_filters(args) -> Dict[str, Any]:
+        """Validated filters from request args (raises ValueError)"""
+        filters = {}
+
+        for name in ('subject', 'student'):
+            value = (args.get(name) or '').strip()
+            if value:
+                filters[name] = int(value)
+
+        status = (args.get('status') or '').strip()
+        if status and status != 'all':
+            if status not in EXAM_STATUSES:
+                raise ValueError(f"Unknown status: {status}")
+            filters['status'] = status
+
+        for name in ('date_from', 'date_to'):
+            value = (args.get(name) or '').strip()
+            if value:
+                filters[name] = datetime.strptime(value, '%Y-%m-%d').strftime('%Y-%m-%d')
+
+        search = (args.get('search') or '').strip()
+        if search:
+            filters['search'] = search
+
+        return filters
+
+    @staticmethod
+    def _where(filters: Dict[str, Any]) -> Tuple[str, List[Any]]:
+        """WHERE clause over pe/qs/u for the given filters"""
+        where_clauses = ["1=1"]
+        params = []
+
+        if 'subject' in filters:
+            where_clauses.append("qs.subject_id = %s")
+            params.append(filters['subject'])
+
+        if 'student' in filters:
+            where_clauses.append("pe.student_id = %s")
+            params.append(filters['student'])
+
+        if 'status' in filters:
+            where_clauses.append("pe.status = %s")
+            params.append(filters['status'])
+
+        if 'date_from' in filters:
+            where_clauses.append("pe.exam_date >= %s")
+            params.append(filters['date_from'])
+
+        if 'date_to' in filters:
+            where_clauses.append("pe.exam_date <= %s")
+            params.append(filters['date_to'])
+
+        if 'search' in filters:
+            where_clauses.append("(qs.title LIKE %s OR u.full_name LIKE %s)")
+            params.extend([f"%{filters['search']}%", f"%{filters['search']}%"])
+
+        return " AND ".join(where_clauses), params
+
+    @staticmethod
+    def encode_cursor(exam: Dict[str, Any]) -> str:
+        """Cursor pointing just past this exam"""
+        return f"{exam['created_at'].strftime(CURSOR_FORMAT)}-{exam['id']}"
+
+    @staticmethod
+    def decode_cursor(cursor_token: str) -> Tuple[datetime, int]:
+        """(created_at, id) from a cursor (raises ValueError)"""
+        created, exam_id = cursor_token.split('-', 1)
+        return datetime.strptime(created, CURSOR_FORMAT), int(exam_id)
+
+    @classmethod
+    def page(cls, filters: Dict[str, Any], after: Optional[str] = None,
+             limit: int = 20) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """One page of exams (newest first) and the cursor for the next page"""
+        limit = min(max(limit, 5), 100)
+        where_sql, params = cls._where(filters)
+
+        if after:
+            created_at, exam_id = cls.decode_cursor(after)
+            where_sql += " AND (pe.created_at < %s OR (pe.created_at = %s AND pe.id < %s))"
+            params.extend([created_at, created_at, exam_id])
+
+        conn = get_connection(readonly=True)
+        cursor = conn.cursor(dictionary=True)
+
+        try:
+            cursor.execute(f"""
+                SELECT pe.*, u.full_name as student_name, u.email as student_email,
+                       qs.title as exam_title, qs.id as question_set_id,
+                       s.name as subject_name, s.code as subject_code, s.id as subject_id
+                FROM practice_exams pe
+                JOIN users u ON pe.student_id = u.id
+                JOIN question_sets qs ON pe.question_set_id = qs.id
+                JOIN subjects s ON qs.subject_id = s.id
+                WHERE {where_sql}
+                ORDER BY pe.created_at DESC, pe.id DESC
+                LIMIT %s
+            """, params + [limit + 1])
+            exams = cursor.fetchall()
+        finally:
+            cursor.close()
+            conn.close()
+
+        next_cursor = None
+        if len(exams) > limit:
+            exams = exams[:limit]
+            next_cursor = cls.encode_cursor(exams[-1])
+
+        return exams, next_cursor
+
+    @classmethod
+    def _compute_facets(cls, filters: Dict[str, Any]) -> Dict[str, Any]:
+        """Counts by status, subject and exam month in one grouped pass"""
+        # Status and subject filters are applied per facet below, not in SQL
+        where_sql, params = cls._where({k: v for k, v in filters.items() if k not in ('status', 'subject')})
+        join_users = "JOIN users u ON pe.student_id = u.id" if 'search' in filters else ""
+
+        conn = get_connection(readonly=True)
+        cursor = conn.cursor(dictionary=True)
+
+        try:
+            cursor.execute(f"""
+                SELECT pe.status, qs.subject_id,
+                       YEAR(pe.exam_date) * 100 + MONTH(pe.exam_date) as month,
+                       COUNT(*) as count
+                FROM practice_exams pe
+                JOIN question_sets qs ON pe.question_set_id = qs.id
+                {join_users}
+                WHERE {where_sql}
+                GROUP BY pe.status, qs.subject_id, month
+            """, params)
+            rows = cursor.fetchall()
+        finally:
+            cursor.close()
+            conn.close()
+
+        facets = {'total': 0, 'status': {}, 'subject': {}, 'month': {}}
+        for row in rows:
+            count = int(row['count'])
+            month = f"{int(row['month']) // 100:04d}-{int(row['month']) % 100:02d}"
+            status_ok = filters.get('status') in (None, row['status'])
+            subject_ok = filters.get('subject') in (None, row['subject_id'])
+
+            counted = []
+            if subject_ok:
+                counted.append(('status', row['status']))
+            if status_ok:
+                counted.append(('subject', str(row['subject_id'])))
+            if status_ok and subject_ok:
+                facets['total'] += count
+                counted.append(('month', month))
+            for facet, value in counted:
+                facets[facet][value] = facets[facet].get(value, 0) + count
+
+        return facets
+
+    @classmethod
+    def facets(cls, filters: Dict[str, Any]) -> Dict[str, Any]:
+        """Facet counts for these filters, cached until the next exam write"""
+        cache = get_cache()
+        generation = 0
+        if cache.enabled:
+            try:
+                with cache.guarded() as client:
+                    generation = int(client.get(cls.GENERATION_KEY) or 0)
+            except Exception as e:
+                print(f"[ExamSearch] Generation read error: {e}")
+
+        signature = hashlib.sha1(json.dumps(filters, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+        key = cache_key('exam_facets', generation, signature)
+
+        facets = cache.get(key)
+        if facets is None:
+            facets = cls._compute_facets(filters)
+            cache.set(key, facets, cls.FACET_TTL)
+        return facets
+
+    @classmethod
+    def invalidate_facets(cls):
+        """Retire every cached facet count (call after an exam is created or changes status)"""
+        cache = get_cache()
+        if not cache.enabled:
+            return
+
+        try:
+            with cache.guarded() as client:
+                client.incr(cls.GENERATION_KEY)
+        except Exception as e:
+            print(f"[ExamSearch] Invalidate error: {e}")
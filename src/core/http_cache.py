@@ -0,0 +1,85 @@
+"""
+Y6 Practice Exam - HTTP Caching
+Weak ETags and conditional GETs for pages that rarely change
+
+Routes build an ETag from the row versions a page depends on (updated_at,
+graded_at, released_at, ...) with one cheap query, and answer a matching
+If-None-Match with 304 before loading answers or rendering a template.
+ETags also cover the deploy (template and static file times), so a page
+rendered by an old release is never confirmed by a new one. Bodies that are already cached
+server-side (share pages, analytics JSON) are tagged by content instead.
+"""
+
+import os
+import hashlib
+from typing import Any, Optional
+import sys
+from pathlib import Path
+
+from flask import request, make_response, Response
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+
+def _deploy_version() -> str:
+    """Newest template or static file time; identical on every worker of a deploy"""
+    newest = 0.0
+    for folder in ('templates', 'static'):
+        for root, _, files in os.walk(PROJECT_ROOT / folder):
+            for name in files:
+                newest = max(newest, os.path.getmtime(os.path.join(root, name)))
+    return str(int(newest))
+
+
+DEPLOY_VERSION = _deploy_version()
+
+
+def weak_etag(*parts: Any) -> str:
+    """ETag value (without W/ or quotes) for a page built from these row versions"""
+    raw = '|'.join(str(part) for part in (DEPLOY_VERSION,) + parts)
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()[:24]
+
+
+def content_etag(body: str) -> str:
+    """ETag value for an already-rendered body"""
+    return hashlib.sha1(body.encode('utf-8')).hexdigest()[:24]
+
+
+def cache_control(response: Response, max_age: int = 0, private: bool = True,
+                  immutable: bool = False) -> Response:
+    """Set Cache-Control; max_age=0 means the browser must revalidate every time"""
+    response.cache_control.public = not private
+    response.cache_control.private = private
+    if max_age:
+        response.cache_control.max_age = max_age
+        if immutable:
+            response.cache_control.immutable = True
+    else:
+        response.cache_control.no_cache = True
+    return response
+
+
+def not_modified(etag: str, max_age: int = 0, private: bool = True) -> Optional[Response]:
+    """304 response if the browser already holds this ETag, else None"""
+    if not request.if_none_match.contains_weak(etag):
+        return None
+    response = Response(status=304)
+    response.set_etag(etag, weak=True)
+    return cache_control(response, max_age, private)
+
+
+def with_etag(body: Any, etag: str, max_age: int = 0, private: bool = True) -> Response:
+    """Full response (anything a view may return) tagged with etag"""
+    response = make_response(body)
+    response.set_etag(etag, weak=True)
+    return cache_control(response, max_age, private)
+
+
+def tag_json(response: Response, max_age: int = 0) -> Response:
+    """Content ETag on a successful JSON GET, turned into a 304 if it matches (after_request hook)"""
+    if request.method != 'GET' or response.status_code != 200 or not response.is_json:
+        return response
+    response.add_etag(weak=True)
+    cache_control(response, max_age)
+    return response.make_conditional(request)
@@ -0,0 +1,462 @@
+"""
+Y6 Practice Exam - Leaderboards
+Student rankings kept in Redis sorted sets, ranked by average released percentage
+
+Boards:
+    overall          every released exam
+    subject:<id>     exams for one subject
+    set:<id>         exams for one question set
+    7d / 30d         exams released in the last 7 / 30 days
+
+Each board is five sorted sets keyed by student id: the average (the rank
+order), plus the percentage sum, exam count and points it is derived from,
+and the best percentage.
+release_results and reset_exam apply deltas; rolling windows are unions of
+daily buckets, materialised on read for a minute at a time. Reads never
+touch the database; the boards are rebuilt from it when missing and at
+least every READY_TTL seconds. Rebuilds run in the background into temp
+keys that are renamed into place; until one lands, reads return None and
+callers use their database fallback.
+"""
+
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from dbs.connection import get_connection
+from src.core.cache import get_cache, cache_key
+
+# KEYS: groups of (avg, sum, count, points, best)
+# ARGV: member, d_sum, d_count, d_points, percentage (raises best when adding)
+_APPLY_RESULT = """
+for i = 1, #KEYS, 5 do
+    local total = tonumber(redis.call('ZINCRBY', KEYS[i + 1], ARGV[2], ARGV[1]))
+    local count = tonumber(redis.call('ZINCRBY', KEYS[i + 2], ARGV[3], ARGV[1]))
+    redis.call('ZINCRBY', KEYS[i + 3], ARGV[4], ARGV[1])
+    if count < 0.5 then
+        for j = 0, 4 do
+            redis.call('ZREM', KEYS[i + j], ARGV[1])
+        end
+    else
+        redis.call('ZADD', KEYS[i], total / count, ARGV[1])
+        if tonumber(ARGV[3]) > 0 then
+            redis.call('ZADD', KEYS[i + 4], 'GT', ARGV[5], ARGV[1])
+        end
+    end
+end
+return 1
+"""
+
+# KEYS: window (avg, sum, count, points, best), then (sum, count, points, best) per day
+# ARGV: ttl
+_MATERIALISE_WINDOW = """
+local days = (#KEYS - 5) / 4
+local sums, counts, points, bests = {}, {}, {}, {}
+for d = 0, days - 1 do
+    table.insert(sums, KEYS[6 + d * 4])
+    table.insert(counts, KEYS[7 + d * 4])
+    table.insert(points, KEYS[8 + d * 4])
+    table.insert(bests, KEYS[9 + d * 4])
+end
+redis.call('ZUNIONSTORE', KEYS[2], days, unpack(sums))
+redis.call('ZUNIONSTORE', KEYS[3], days, unpack(counts))
+redis.call('ZUNIONSTORE', KEYS[4], days, unpack(points))
+table.insert(bests, 'AGGREGATE')
+table.insert(bests, 'MAX')
+redis.call('ZUNIONSTORE', KEYS[5], days, unpack(bests))
+redis.call('DEL', KEYS[1])
+local members = redis.call('ZRANGE', KEYS[2], 0, -1, 'WITHSCORES')
+for i = 1, #members, 2 do
+    local count = tonumber(redis.call('ZSCORE', KEYS[3], members[i]))
+    if count and count >= 0.5 then
+        redis.call('ZADD', KEYS[1], tonumber(members[i + 1]) / count, members[i])
+    end
+end
+for i = 1, 5 do
+    redis.call('EXPIRE', KEYS[i], ARGV[1])
+end
+return 1
+"""
+
+
+class Leaderboard:
+    """Redis-backed student rankings"""
+
+    WINDOWS = {'7d': 7, '30d': 30}
+    WINDOW_TTL = 60          # Seconds a materialised window is reused
+    DAY_TTL = 35 * 86400     # Daily buckets outlive the longest window
+
+    READY_TTL = 3600         # Boards are rebuilt at least this often, so a lost delta heals
+    RETRY_TTL = 60           # ...or this soon when deltas were skipped during a rebuild
+
+    NAMES_KEY = cache_key('leaderboard', 'names')
+    READY_KEY = cache_key('leaderboard', 'ready')
+    LOCK_KEY = cache_key('leaderboard_rebuild_lock')    # Outside the prefix the rebuild clears
+    SKIPPED_KEY = cache_key('leaderboard_skipped')      # Set by deltas that arrive mid-rebuild
+
+    _scripts = {}
+    _rebuilding = False
+    _rebuild_lock = threading.Lock()
+
+    # -------------------------------------------------------------------------
+    # Keys
+    # -------------------------------------------------------------------------
+
+    @staticmethod
+    def board_keys(board: str, prefix: str = 'leaderboard') -> List[str]:
+        """(avg, sum, count, points, best) keys for a board (prefix 'leaderboard_build' while rebuilding)"""
+        base = cache_key(prefix, board)
+        return [base, f"{base}:sum", f"{base}:count", f"{base}:points", f"{base}:best"]
+
+    @staticmethod
+    def day_board(day) -> str:
+        """Board name of a daily bucket"""
+        return f"day:{day.strftime('%Y%m%d')}"
+
+    @classmethod
+    def _script(cls, name: str, source: str):
+        """Registered Lua script (loaded once per process)"""
+        if name not in cls._scripts:
+            cls._scripts[name] = get_cache().client.register_script(source)
+        return cls._scripts[name]
+
+    # -------------------------------------------------------------------------
+    # Writes
+    # -------------------------------------------------------------------------
+
+    @classmethod
+    def _apply(cls, exam: dict, percentage: float, points: int, day, sign: int):
+        """Add (sign=1) or remove (sign=-1) one released result on every board it counts towards"""
+        cache = get_cache()
+        if not cache.enabled:
+            return
+
+        try:
+            with cache.guarded() as client:
+                # Boards are rebuilt from the database when missing, which picks this result up.
+                # A rebuild already running may have read past it: have it expire early instead
+                if not client.exists(cls.READY_KEY):
+                    if client.exists(cls.LOCK_KEY):
+                        client.set(cls.SKIPPED_KEY, '1', ex=300)
+                    return
+
+                day_board = cls.day_board(day)
+                boards = ('overall', f"subject:{exam['subject_id']}",
+                          f"set:{exam['question_set_id']}", day_board)
+                keys = []
+                for board in boards:
+                    keys.extend(cls.board_keys(board))
+
+                member = str(exam['student_id'])
+                cls._script('apply', _APPLY_RESULT)(
+                    keys=keys,
+                    args=[member, sign * float(percentage or 0), sign, sign * int(points or 0),
+                          float(percentage or 0)],
+                    client=client)
+
+                pipe = client.pipeline()
+                if sign < 0:
+                    # A best score can't be decremented: take what is left from the database
+                    for board, best in zip(boards, cls._best_scores(exam, day)):
+                        best_key = cls.board_keys(board)[4]
+                        if best is None:
+                            pipe.zrem(best_key, member)
+                        else:
+                            pipe.zadd(best_key, {member: float(best)})
+                for key in cls.board_keys(day_board):
+                    pipe.expire(key, cls.DAY_TTL)
+                if sign > 0 and exam.get('student_name'):
+                    pipe.hset(cls.NAMES_KEY, member, exam['student_name'])
+                pipe.execute()
+
+        except Exception as e:
+            # Deltas may be half-applied; rebuild from the database on next read
+            print(f"[Leaderboard] Update error: {e}")
+            cls.invalidate()
+
+    @staticmethod
+    def _best_scores(exam: dict, day) -> tuple:
+        """Student's best released percentage on the overall, subject, set and day boards"""
+        conn = get_connection()
+        cursor = conn.cursor()
+
+        try:
+            cursor.execute("""
+                SELECT MAX(pe.percentage),
+                       MAX(CASE WHEN qs.subject_id = %s THEN pe.percentage END),
+                       MAX(CASE WHEN pe.question_set_id = %s THEN pe.percentage END),
+                       MAX(CASE WHEN DATE(pe.released_at) = %s THEN pe.percentage END)
+                FROM practice_exams_all pe
+                JOIN question_sets qs ON pe.question_set_id = qs.id
+                WHERE pe.student_id = %s AND pe.status = 'released'
+            """, (exam['subject_id'], exam['question_set_id'], day.date(), exam['student_id']))
+            return cursor.fetchone()
+        finally:
+            cursor.close()
+            conn.close()
+
+    @classmethod
+    def add_result(cls, exam: dict, percentage: float, points: int):
+        """A result was released now"""
+        cls._apply(exam, percentage, points, datetime.now(), 1)
+
+    @classmethod
+    def remove_result(cls, exam: dict):
+        """Withdraw a previously released result (reset or re-release)"""
+        cls._apply(exam, exam.get('percentage'), exam.get('total_score'),
+                   exam.get('released_at') or datetime.now(), -1)
+
+    @classmethod
+    def invalidate(cls):
+        """Force a rebuild on next read (e.g. a student was deactivated)"""
+        get_cache().delete(cls.READY_KEY)
+
+    # -------------------------------------------------------------------------
+    # Rebuild
+    # -------------------------------------------------------------------------
+
+    @classmethod
+    def rebuild(cls) -> bool:
+        """Recreate every board from the database"""
+        cache = get_cache()
+        if not cache.enabled:
+            return False
+
+        # One rebuild at a time; other callers read whatever is there
+        token = cache.acquire_lock(cls.LOCK_KEY, 300)
+        if token is None:
+            return False
+
+        # Primary: a lagging replica would miss recent releases whose deltas are skipped now
+        conn = get_connection()
+        cursor = conn.cursor(dictionary=True)
+
+        try:
+            with cache.guarded() as client:
+                cache.delete(cls.SKIPPED_KEY)
+                cache.delete_pattern('leaderboard_build:')
+                since = (datetime.now() - timedelta(days=max(cls.WINDOWS.values()))).date()
+
+                queries = [
+                    # (board for a row, SQL, params)
+                    (lambda r: 'overall', """
+                        SELECT ss.student_id, u.full_name, ss.percentage_sum as total,
+                               ss.released_count as count, ss.total_points as points,
+                               ss.best_percentage as best
+                        FROM student_stats ss
+                        JOIN users u ON u.id = ss.student_id
+                        WHERE u.role_id = 2 AND u.is_active = TRUE AND ss.released_count > 0
+                    """, ()),
+                    (lambda r: f"subject:{r['board_id']}", """
+                        SELECT pe.student_id, qs.subject_id as board_id, SUM(pe.percentage) as total,
+                               COUNT(*) as count, COALESCE(SUM(pe.total_score), 0) as points,
+                               MAX(pe.percentage) as best
+                        FROM practice_exams_all pe
+                        JOIN question_sets qs ON pe.question_set_id = qs.id
+                        JOIN users u ON u.id = pe.student_id
+                        WHERE pe.status = 'released' AND u.role_id = 2 AND u.is_active = TRUE
+                        GROUP BY pe.student_id, qs.subject_id
+                    """, ()),
+                    (lambda r: f"set:{r['board_id']}", """
+                        SELECT pe.student_id, pe.question_set_id as board_id, SUM(pe.percentage) as total,
+                               COUNT(*) as count, COALESCE(SUM(pe.total_score), 0) as points,
+                               MAX(pe.percentage) as best
+                        FROM practice_exams_all pe
+                        JOIN users u ON u.id = pe.student_id
+                        WHERE pe.status = 'released' AND u.role_id = 2 AND u.is_active = TRUE
+                        GROUP BY pe.student_id, pe.question_set_id
+                    """, ()),
+                    (lambda r: cls.day_board(r['board_id']), """
+                        SELECT pe.student_id, DATE(pe.released_at) as board_id, SUM(pe.percentage) as total,
+                               COUNT(*) as count, COALESCE(SUM(pe.total_score), 0) as points,
+                               MAX(pe.percentage) as best
+                        FROM practice_exams_all pe
+                        JOIN users u ON u.id = pe.student_id
+                        WHERE pe.status = 'released' AND u.role_id = 2 AND u.is_active = TRUE AND pe.released_at >= %s
+                        GROUP BY pe.student_id, DATE(pe.released_at)
+                    """, (since,)),
+                ]
+
+                rows_written = 0
+                built = {}  # Live key -> temp key it is built in
+                pipe = client.pipeline(transaction=False)
+
+                for board_of, sql, params in queries:
+                    cursor.execute(sql, params)
+                    for row in cursor.fetchall():
+                        board = board_of(row)
+                        temp_keys = cls.board_keys(board, 'leaderboard_build')
+                        built.update(zip(cls.board_keys(board), temp_keys))
+                        avg_key, sum_key, count_key, points_key, best_key = temp_keys
+                        member = str(row['student_id'])
+                        total = float(row['total'] or 0)
+                        count = int(row['count'])
+
+                        pipe.zadd(avg_key, {member: total / count})
+                        pipe.zadd(sum_key, {member: total})
+                        pipe.zadd(count_key, {member: count})
+                        pipe.zadd(points_key, {member: int(row['points'] or 0)})
+                        pipe.zadd(best_key, {member: float(row['best'] or 0)})
+                        if board.startswith('day:'):
+                            for key in temp_keys:
+                                pipe.expire(key, cls.DAY_TTL)
+                        if row.get('full_name'):
+                            pipe.hset(cls.NAMES_KEY, member, row['full_name'])
+
+                        rows_written += 1
+                        if rows_written % 1000 == 0:
+                            pipe.execute()
+                pipe.execute()
+
+                # Swap every board in at once; boards (and windows) with no rows left are dropped
+                outdated = [key for key in client.scan_iter(match=cache_key('leaderboard', '*'), count=1000)
+                            if key not in built and key not in (cls.NAMES_KEY, cls.READY_KEY)]
+                pipe = client.pipeline()
+                for live_key, temp_key in built.items():
+                    pipe.rename(temp_key, live_key)
+                if outdated:
+                    pipe.delete(*outdated)
+                pipe.set(cls.READY_KEY, '1', ex=cls.READY_TTL)
+                pipe.execute()
+
+                # Checked after READY is set: later deltas are applied normally
+                if client.delete(cls.SKIPPED_KEY):
+                    client.expire(cls.READY_KEY, cls.RETRY_TTL)
+                print(f"[Leaderboard] Rebuilt from {rows_written} aggregates")
+                return True
+
+        except Exception as e:
+            print(f"[Leaderboard] Rebuild error: {e}")
+            return False
+
+        finally:
+            cursor.close()
+            conn.close()
+            cache.release_lock(cls.LOCK_KEY, token)
+
+    @classmethod
+    def rebuild_in_background(cls):
+        """Start rebuild() on a thread unless one is already running here or elsewhere"""
+        if cls._rebuilding or get_cache().is_locked(cls.LOCK_KEY):
+            return
+
+        with cls._rebuild_lock:
+            if cls._rebuilding:
+                return
+            cls._rebuilding = True
+
+        def run():
+            try:
+                cls.rebuild()
+            finally:
+                cls._rebuilding = False
+
+        thread = threading.Thread(target=run, name='leaderboard-rebuild', daemon=True)
+        thread.start()
+
+    # -------------------------------------------------------------------------
+    # Reads
+    # -------------------------------------------------------------------------
+
+    @classmethod
+    def _ready_keys(cls, board: str) -> Optional[List[str]]:
+        """Keys for a board, building boards/windows first if needed (callers guard Redis errors)"""
+        cache = get_cache()
+        if not cache.enabled:
+            return None
+
+        # Stale or missing boards: callers fall back to the database until the rebuild lands
+        if not cache.client.exists(cls.READY_KEY):
+            cls.rebuild_in_background()
+            return None
+
+        keys = cls.board_keys(board)
+
+        if board in cls.WINDOWS and not cache.client.exists(keys[0]):
+            today = datetime.now().date()
+            for offset in range(cls.WINDOWS[board]):
+                keys_for_day = cls.board_keys(cls.day_board(today - timedelta(days=offset)))
+                keys.extend(keys_for_day[1:])
+            cls._script('window', _MATERIALISE_WINDOW)(keys=keys, args=[cls.WINDOW_TTL], client=cache.client)
+            keys = keys[:5]
+
+        return keys
+
+    @classmethod
+    def _describe(cls, keys: List[str], members: List[tuple], start_rank: int) -> List[Dict]:
+        """Attach names, exam counts, best scores and points to (member, avg) pairs"""
+        if not members:
+            return []
+
+        client = get_cache().client
+        ids = [m for m, _ in members]
+
+        pipe = client.pipeline(transaction=False)
+        pipe.hmget(cls.NAMES_KEY, ids)
+        for member in ids:
+            pipe.zscore(keys[2], member)
+            pipe.zscore(keys[3], member)
+            pipe.zscore(keys[4], member)
+        results = pipe.execute()
+
+        names = results[0]
+        entries = []
+        for i, (member, avg) in enumerate(members):
+            entries.append({
+                'rank': start_rank + i,
+                'id': int(member),
+                'name': names[i] or f'Student {member}',
+                'exams': int(results[1 + i * 3] or 0),
+                'avg_score': round(avg, 1),
+                'best_score': round(results[3 + i * 3] or 0, 1),
+                'total_points': int(results[2 + i * 3] or 0)
+            })
+        return entries
+
+    @classmethod
+    def top(cls, board: str = 'overall', limit: int = 10) -> Optional[List[Dict]]:
+        """Highest averages on a board, or None when Redis is unavailable"""
+        try:
+            with get_cache().guarded() as client:
+                keys = cls._ready_keys(board)
+                if keys is None:
+                    return None
+                members = client.zrevrange(keys[0], 0, limit - 1, withscores=True)
+                return cls._describe(keys, members, 1)
+        except Exception as e:
+            print(f"[Leaderboard] Read error: {e}")
+            return None
+
+    @classmethod
+    def position(cls, student_id: int, board: str = 'overall', neighbours: int = 2) -> Optional[Dict]:
+        """A student's rank on a board with the students either side of them"""
+        try:
+            with get_cache().guarded() as client:
+                keys = cls._ready_keys(board)
+                if keys is None:
+                    return None
+
+                member = str(student_id)
+                pipe = client.pipeline(transaction=False)
+                pipe.zrevrank(keys[0], member)
+                pipe.zcard(keys[0])
+                rank, total = pipe.execute()
+                if rank is None:
+                    return None
+
+                start = max(rank - neighbours, 0)
+                members = client.zrevrange(keys[0], start, rank + neighbours, withscores=True)
+                return {
+                    'rank': rank + 1,
+                    'total': total,
+                    'board': board,
+                    'entries': cls._describe(keys, members, start + 1)
+                }
+        except Exception as e:
+            print(f"[Leaderboard] Read error: {e}")
+            return None
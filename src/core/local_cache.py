@@ -0,0 +1,61 @@
+"""
+Y6 Practice Exam - In-Process Cache
+Bounded LRU with per-entry TTL, private to one worker process
+"""
+
+import time
+import threading
+from collections import OrderedDict
+from typing import Any
+
+_MISSING = object()
+
+
+class LocalCache:
+    """Thread-safe LRU cache with expiring entries"""
+
+    def __init__(self, max_items: int = 1024):
+        self.max_items = max_items
+        self._data = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Value for key, or default if missing/expired"""
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                return default
+            if entry[0] <= time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: str, value: Any, ttl: float = 60):
+        """Store value, evicting the least recently used entry when full"""
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_items:
+                self._data.popitem(last=False)
+
+    def delete(self, key: str):
+        """Remove one key"""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def delete_prefix(self, prefix: str) -> int:
+        """Remove every key starting with prefix"""
+        with self._lock:
+            keys = [k for k in self._data if k.startswith(prefix)]
+            for k in keys:
+                del self._data[k]
+            return len(keys)
+
+    def clear(self):
+        """Remove everything"""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
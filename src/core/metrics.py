@@ -0,0 +1,148 @@
+"""
+Y6 Practice Exam - Prometheus Metrics
+Request latency, DB pool, cache, email and exam-day domain metrics
+
+Works across gunicorn workers when PROMETHEUS_MULTIPROC_DIR is set
+(see docker/gunicorn.conf.py).
+"""
+
+import os
+
+try:
+    from prometheus_client import (Counter, Gauge, Histogram, CollectorRegistry, REGISTRY,
+                                   generate_latest, CONTENT_TYPE_LATEST, multiprocess)
+    from prometheus_client.core import GaugeMetricFamily
+    PROMETHEUS_AVAILABLE = True
+except ImportError:
+    PROMETHEUS_AVAILABLE = False
+    CONTENT_TYPE_LATEST = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+class _NoopMetric:
+    """Stand-in when prometheus_client is not installed"""
+
+    def labels(self, *args, **kwargs):
+        return self
+
+    def inc(self, *args, **kwargs):
+        pass
+
+    def dec(self, *args, **kwargs):
+        pass
+
+    def set(self, *args, **kwargs):
+        pass
+
+    def observe(self, *args, **kwargs):
+        pass
+
+
+def _metric(kind: str, *args, **kwargs):
+    """Create a metric, or a no-op stand-in without prometheus_client"""
+    if not PROMETHEUS_AVAILABLE:
+        return _NoopMetric()
+    if kind == 'gauge':
+        # Sum live workers' values in multiprocess mode
+        return Gauge(*args, multiprocess_mode='livesum', **kwargs)
+    return {'counter': Counter, 'histogram': Histogram}[kind](*args, **kwargs)
+
+
+# HTTP
+REQUEST_LATENCY = _metric('histogram', 'y6_http_request_duration_seconds', 'Request latency',
+                          ['blueprint', 'endpoint', 'method'],
+                          buckets=(.005, .01, .025, .05, .1, .25, .5, 1, 2.5, 5, 10))
+REQUESTS_TOTAL = _metric('counter', 'y6_http_requests_total', 'Requests by status',
+                         ['blueprint', 'endpoint', 'method', 'status'])
+
+# Database pool
+DB_POOL_SIZE = _metric('gauge', 'y6_db_pool_size', 'Configured pool connections', ['pool'])
+DB_CONNECTIONS_IN_USE = _metric('gauge', 'y6_db_connections_in_use', 'Connections checked out', ['pool'])
+DB_CHECKOUT_ERRORS = _metric('counter', 'y6_db_checkout_errors_total', 'Failed connection checkouts', ['pool'])
+
+# Redis cache
+CACHE_OPERATIONS = _metric('counter', 'y6_cache_operations_total', 'Cache operations by result',
+                           ['operation', 'result'])
+CACHE_CIRCUIT_OPEN = _metric('gauge', 'y6_cache_circuit_open', 'Workers with the Redis circuit open')
+CACHE_TIER_LOOKUPS = _metric('counter', 'y6_cache_tier_lookups_total', 'Two-level cache lookups by level',
+                             ['namespace', 'level', 'result'])
+
+# Auth tables
+TOKENS_REAPED = _metric('counter', 'y6_tokens_reaped_total', 'Expired or used auth rows deleted', ['kind'])
+TOKEN_FILTER_CHECKS = _metric('counter', 'y6_token_filter_checks_total', 'Token pre-checks by result',
+                              ['kind', 'result'])
+
+# Email
+EMAIL_SEND_SECONDS = _metric('histogram', 'y6_email_send_duration_seconds', 'SMTP send latency', ['result'],
+                             buckets=(.1, .25, .5, 1, 2.5, 5, 10, 30))
+EMAIL_IN_FLIGHT = _metric('gauge', 'y6_email_sends_in_progress', 'Emails currently being sent')
+
+# Exams
+EXAM_SUBMISSIONS = _metric('counter', 'y6_exam_submissions_total', 'Submitted exams', ['delayed'])
+
+
+def observe_request(blueprint, endpoint, method, status, seconds):
+    """Record one finished HTTP request"""
+    blueprint = blueprint or 'app'
+    endpoint = endpoint or 'unmatched'
+    REQUEST_LATENCY.labels(blueprint, endpoint, method).observe(seconds)
+    REQUESTS_TOTAL.labels(blueprint, endpoint, method, str(status)).inc()
+
+
+class _DomainCollector:
+    """Exam-day gauges read from the database at scrape time"""
+
+    def collect(self):
+        from dbs.connection import get_connection
+
+        try:
+            conn = get_connection(readonly=True)
+            cursor = conn.cursor(dictionary=True)
+
+            try:
+                cursor.execute("""
+                    SELECT
+                        SUM(status = 'in_progress') as in_progress,
+                        SUM(status IN ('submitted', 'grading')) as grading_backlog,
+                        SUM(status = 'submitted' AND submitted_at >= NOW() - INTERVAL 1 MINUTE) as last_minute
+                    FROM practice_exams
+                    WHERE status IN ('in_progress', 'submitted', 'grading')
+                """)
+                row = cursor.fetchone() or {}
+            finally:
+                cursor.close()
+                conn.close()
+        except Exception as e:
+            # Never fail the whole scrape because the database is unavailable
+            print(f"[Metrics] Domain gauges unavailable: {e}")
+            return
+
+        yield GaugeMetricFamily('y6_exams_in_progress', 'Exams currently being taken',
+                                value=float(row.get('in_progress') or 0))
+        yield GaugeMetricFamily('y6_grading_backlog', 'Submitted exams waiting for grading/release',
+                                value=float(row.get('grading_backlog') or 0))
+        yield GaugeMetricFamily('y6_submissions_last_minute', 'Exams submitted in the last minute',
+                                value=float(row.get('last_minute') or 0))
+
+
+_domain_registered = False
+
+
+def render_metrics() -> bytes:
+    """Render all metrics in Prometheus text format"""
+    global _domain_registered
+
+    if not PROMETHEUS_AVAILABLE:
+        return b'# prometheus_client is not installed\n'
+
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        # Aggregate the per-worker files; domain gauges come from this worker only
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        registry.register(_DomainCollector())
+        return generate_latest(registry)
+
+    if not _domain_registered:
+        REGISTRY.register(_DomainCollector())
+        _domain_registered = True
+    return generate_latest(REGISTRY)
+
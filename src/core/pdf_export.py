@@ -0,0 +1,61 @@
+"""
+Y6 Practice Exam - PDF Export Helpers
+ReportLab styles and question flowables for exam papers and answer keys
+"""
+
+import json
+from typing import Any, Dict, List
+
+
+def exam_styles(answer_key: bool = False):
+    """Stylesheet used by exported exam papers"""
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.lib import colors
+    from reportlab.lib.enums import TA_CENTER
+
+    styles = getSampleStyleSheet()
+    styles.add(ParagraphStyle(name='Title2', fontSize=18, spaceAfter=12, alignment=TA_CENTER, fontName='Helvetica-Bold'))
+    styles.add(ParagraphStyle(name='Subtitle', fontSize=12, spaceAfter=20, alignment=TA_CENTER, textColor=colors.grey))
+    styles.add(ParagraphStyle(name='QuestionNum', fontSize=11, fontName='Helvetica-Bold', textColor=colors.HexColor('#0078D4')))
+    styles.add(ParagraphStyle(name='QuestionText', fontSize=11, spaceAfter=6, leading=14))
+    styles.add(ParagraphStyle(name='Option', fontSize=10, leftIndent=20, spaceAfter=3))
+    if answer_key:
+        styles.add(ParagraphStyle(name='Answer', fontSize=10, leftIndent=20, spaceAfter=3, textColor=colors.HexColor('#107C10'), fontName='Helvetica-Bold'))
+    return styles
+
+
+def question_flowables(questions: List[Dict[str, Any]], styles, answer_key: bool = False) -> list:
+    """Paragraphs for each question; with answer_key the correct answer is highlighted"""
+    from reportlab.lib.units import inch
+    from reportlab.platypus import Paragraph, Spacer
+
+    elements = []
+
+    for q in questions:
+        # Question number and type
+        q_type = q['question_type'].upper().replace('_', ' ')
+        elements.append(Paragraph(f"Question {q['question_number']} ({q_type}) - {q['marks']} mark(s)", styles['QuestionNum']))
+
+        # Question text
+        elements.append(Paragraph(q['question_text'], styles['QuestionText']))
+
+        # Options for MCQ
+        if q['question_type'] == 'mcq' and q['options']:
+            try:
+                options = json.loads(q['options']) if isinstance(q['options'], str) else q['options']
+                if isinstance(options, list):
+                    for i, opt in enumerate(options):
+                        letter = chr(65 + i)  # A, B, C, D
+                        if answer_key and opt.lower() == q['correct_answer'].lower():
+                            elements.append(Paragraph(f"* ({letter}) {opt}", styles['Answer']))
+                        else:
+                            elements.append(Paragraph(f"({letter}) {opt}", styles['Option']))
+            except:
+                pass
+        elif answer_key:
+            elements.append(Paragraph(f"Answer: {q['correct_answer']}", styles['Answer']))
+
+        # Space between questions
+        elements.append(Spacer(1, 0.3*inch))
+
+    return elements
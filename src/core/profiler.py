@@ -0,0 +1,211 @@
+"""
+Y6 Practice Exam - On-Demand Request Profiler
+Samples the request thread's stack and saves a speedscope profile per request
+
+Only active when PROFILER_ENABLED is set; otherwise no hooks are installed.
+A request is profiled when it carries a valid X-Profile-Token header
+(generated by an admin on /admin/profiles) or is picked by PROFILE_SAMPLE_RATE.
+"""
+
+import os
+import re
+import json
+import time
+import random
+import secrets
+import threading
+from datetime import datetime
+from typing import List, Dict, Optional
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from config import (SECRET_KEY, PROFILE_DIR, PROFILE_SAMPLE_RATE, PROFILE_INTERVAL_MS,
+                    PROFILE_TOKEN_MAX_AGE, PROFILE_KEEP)
+
+PROFILE_HEADER = 'X-Profile-Token'
+_TOKEN_SALT = 'y6-request-profiler'
+_PROFILE_NAME = re.compile(r'^(\d{8}-\d{6})_([\w.]+)_(\d+)ms_([0-9a-f]{6})\.speedscope\.json$')
+
+
+class SamplingProfiler:
+    """Background thread that periodically records another thread's call stack"""
+
+    def __init__(self, thread_id: int, interval_ms: float = PROFILE_INTERVAL_MS):
+        self.thread_id = thread_id
+        self.interval = interval_ms / 1000.0
+        self.frames = []          # speedscope shared frames
+        self._frame_index = {}    # (name, file, line) -> index
+        self.samples = []         # [stack as list of frame indexes, weight in ms]
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='y6-profiler', daemon=True)
+        self.started_at = None
+        self.duration_ms = 0.0
+
+    def start(self):
+        self.started_at = time.perf_counter()
+        self._thread.start()
+
+    def stop(self):
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        self._thread.join()
+        self.duration_ms = (time.perf_counter() - self.started_at) * 1000
+
+    def _run(self):
+        last = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            now = time.perf_counter()
+            if frame is not None:
+                self._record(frame, (now - last) * 1000)
+            last = now
+
+    def _record(self, frame, weight_ms: float):
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            key = (code.co_name, code.co_filename, code.co_firstlineno)
+            index = self._frame_index.get(key)
+            if index is None:
+                index = self._frame_index[key] = len(self.frames)
+                self.frames.append({'name': key[0], 'file': key[1], 'line': key[2]})
+            stack.append(index)
+            frame = frame.f_back
+        stack.reverse()
+
+        # Merge consecutive identical stacks to keep files small
+        if self.samples and self.samples[-1][0] == stack:
+            self.samples[-1][1] += weight_ms
+        else:
+            self.samples.append([stack, weight_ms])
+
+    def to_speedscope(self, name: str) -> dict:
+        """Profile in speedscope's file format (https://www.speedscope.app)"""
+        total = sum(weight for _, weight in self.samples)
+        return {
+            '$schema': 'https://www.speedscope.app/file-format-schema.json',
+            'name': name,
+            'exporter': 'y6-practice-exam',
+            'shared': {'frames': self.frames},
+            'profiles': [{
+                'type': 'sampled',
+                'name': name,
+                'unit': 'milliseconds',
+                'startValue': 0,
+                'endValue': round(total, 3),
+                'samples': [stack for stack, _ in self.samples],
+                'weights': [round(weight, 3) for _, weight in self.samples],
+            }],
+        }
+
+
+def _serializer():
+    from itsdangerous import URLSafeTimedSerializer
+    return URLSafeTimedSerializer(SECRET_KEY, salt=_TOKEN_SALT)
+
+
+def create_profile_token(admin_id: int) -> str:
+    """Signed token that enables profiling for requests carrying it"""
+    return _serializer().dumps({'admin_id': admin_id})
+
+
+def verify_profile_token(token: str) -> bool:
+    """Check a token's signature and age"""
+    from itsdangerous import BadSignature
+    try:
+        _serializer().loads(token, max_age=PROFILE_TOKEN_MAX_AGE)
+        return True
+    except BadSignature:
+        return False
+
+
+def should_profile(request) -> bool:
+    """Decide whether to profile this request"""
+    token = request.headers.get(PROFILE_HEADER)
+    if token:
+        return verify_profile_token(token)
+    return PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE
+
+
+def save_profile(profiler: SamplingProfiler, endpoint: Optional[str], label: str) -> str:
+    """Write a profile to PROFILE_DIR and return its file name"""
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+
+    safe_endpoint = re.sub(r'[^\w.]', '_', endpoint or 'unmatched')
+    filename = (f"{datetime.now().strftime('%Y%m%d-%H%M%S')}_{safe_endpoint}_"
+                f"{int(profiler.duration_ms)}ms_{secrets.token_hex(3)}.speedscope.json")
+
+    with open(os.path.join(PROFILE_DIR, filename), 'w') as f:
+        json.dump(profiler.to_speedscope(label), f)
+
+    _prune_profiles()
+    return filename
+
+
+def _prune_profiles():
+    """Keep only the newest PROFILE_KEEP profiles"""
+    names = sorted(n for n in os.listdir(PROFILE_DIR) if _PROFILE_NAME.match(n))
+    for name in names[:-PROFILE_KEEP]:
+        try:
+            os.remove(os.path.join(PROFILE_DIR, name))
+        except OSError:
+            pass
+
+
+def list_profiles() -> List[Dict]:
+    """Captured profiles, newest first"""
+    if not os.path.isdir(PROFILE_DIR):
+        return []
+
+    profiles = []
+    for name in os.listdir(PROFILE_DIR):
+        match = _PROFILE_NAME.match(name)
+        if not match:
+            continue
+        profiles.append({
+            'name': name,
+            'captured_at': datetime.strptime(match.group(1), '%Y%m%d-%H%M%S'),
+            'endpoint': match.group(2),
+            'duration_ms': int(match.group(3)),
+            'size_kb': round(os.path.getsize(os.path.join(PROFILE_DIR, name)) / 1024, 1),
+        })
+
+    profiles.sort(key=lambda p: p['name'], reverse=True)
+    return profiles
+
+
+def is_profile_name(name: str) -> bool:
+    """True for file names produced by save_profile (guards downloads)"""
+    return bool(_PROFILE_NAME.match(name))
+
+
+def init_profiler(app):
+    """Install the profiling hooks on the Flask app"""
+    from flask import g, request
+
+    @app.before_request
+    def start_profiler():
+        if should_profile(request):
+            g._profiler = SamplingProfiler(threading.get_ident())
+            g._profiler.start()
+
+    @app.after_request
+    def stop_profiler(response):
+        profiler = g.pop('_profiler', None)
+        if profiler is not None:
+            profiler.stop()
+            label = f"{request.method} {request.path} -> {response.status_code}"
+            response.headers['X-Profile-Id'] = save_profile(profiler, request.endpoint, label)
+        return response
+
+    @app.teardown_request
+    def save_profiler_on_error(exc):
+        # Unhandled exceptions skip after_request; still save what was sampled
+        profiler = g.pop('_profiler', None)
+        if profiler is not None:
+            profiler.stop()
+            save_profile(profiler, request.endpoint, f"{request.method} {request.path} -> 500")
@@ -0,0 +1,116 @@
+"""
+Y6 Practice Exam - Cross-Worker Broadcasts
+One Redis pub/sub listener thread per worker process, shared by every
+in-process cache that needs invalidating when another worker writes
+"""
+
+import os
+import time
+import threading
+from typing import Callable, Optional
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.core.cache import get_cache
+
+RETRY_SECONDS = 5
+
+_handlers = {}   # channel -> [(on_message, on_reconnect)]
+_lock = threading.Lock()
+_listener_pid = None
+
+
+def subscribe(channel: str, on_message: Callable[[str], None],
+              on_reconnect: Optional[Callable[[], None]] = None):
+    """
+    Call on_message(data) for every message on channel in this process.
+
+    on_reconnect runs after the listener re-subscribes following an error,
+    since messages published while disconnected were missed. Safe to call
+    at import time; consumers start the listener with ensure_listener().
+    """
+    with _lock:
+        _handlers.setdefault(channel, []).append((on_message, on_reconnect))
+
+
+def publish(channel: str, message: str) -> bool:
+    """Broadcast to every worker (including this one)"""
+    cache = get_cache()
+    if not cache.enabled:
+        return False
+
+    try:
+        with cache.guarded() as client:
+            client.publish(channel, message)
+        return True
+    except Exception as e:
+        print(f"[PubSub] Publish error on {channel}: {e}")
+        return False
+
+
+def ensure_listener():
+    """Start this process's listener thread (once per pid, so forked workers get their own)"""
+    global _listener_pid
+
+    if _listener_pid == os.getpid():
+        return
+
+    with _lock:
+        if _listener_pid == os.getpid():
+            return
+        _listener_pid = os.getpid()
+
+    thread = threading.Thread(target=_listen, name='pubsub-listener', daemon=True)
+    thread.start()
+
+
+def _dispatch(channel: str, index: int, data=None):
+    """Run handler slot index (0 message, 1 reconnect) for a channel"""
+    for handlers in list(_handlers.get(channel, [])):
+        handler = handlers[index]
+        if handler is None:
+            continue
+        try:
+            if index == 0:
+                handler(data)
+            else:
+                handler()
+        except Exception as e:
+            print(f"[PubSub] Handler error on {channel}: {e}")
+
+
+def _listen():
+    """Subscribe to every registered channel and dispatch messages"""
+    reconnecting = False
+    while True:
+        try:
+            cache = get_cache()
+            if not cache.enabled:
+                time.sleep(RETRY_SECONDS)
+                continue
+
+            pubsub = cache.client.pubsub(ignore_subscribe_messages=True)
+            subscribed = set()
+
+            while True:
+                # Pick up channels registered since the last pass
+                pending = set(_handlers) - subscribed
+                if pending:
+                    pubsub.subscribe(*pending)
+                    subscribed |= pending
+                    if reconnecting:
+                        for channel in pending:
+                            _dispatch(channel, 1)
+                reconnecting = False
+
+                message = pubsub.get_message(timeout=1.0)
+                if message and message.get('type') == 'message':
+                    _dispatch(message['channel'], 0, message['data'])
+
+        except Exception as e:
+            print(f"[PubSub] Listener error: {e}")
+            reconnecting = True
+            time.sleep(RETRY_SECONDS)
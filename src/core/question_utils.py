@@ -0,0 +1,36 @@
+"""
+Y6 Practice Exam - Question Helpers
+JSON column parsing and auto-grading shared by the exam, results and grading views
+"""
+
+import json
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+# Question types graded automatically on submit
+AUTO_GRADED_TYPES = ('mcq', 'fill_blank')
+
+
+def parse_json_fields(rows: Iterable[Dict[str, Any]], fields: Tuple[str, ...]) -> None:
+    """Decode JSON text columns in place (MySQL returns JSON columns as str)"""
+    for row in rows:
+        for field in fields:
+            value = row.get(field)
+            if value and isinstance(value, str):
+                row[field] = json.loads(value)
+
+
+def grade_answer(question: Optional[Dict[str, Any]], student_answer) -> Tuple[Optional[bool], Optional[int], bool]:
+    """
+    Auto-grade one answer.
+
+    Returns:
+        (is_correct, marks_awarded, auto_graded); (None, None, False) for
+        question types that need manual grading
+    """
+    if not question or question['question_type'] not in AUTO_GRADED_TYPES:
+        return None, None, False
+
+    correct = question['correct_answer'].strip().lower()
+    given = str(student_answer).strip().lower()
+    is_correct = (correct == given)
+    return is_correct, question['marks'] if is_correct else 0, True
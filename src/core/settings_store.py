@@ -0,0 +1,123 @@
+"""
+Y6 Practice Exam - Settings Snapshot
+All system_settings rows loaded once per worker into a read-only snapshot
+
+Saving a setting publishes on a Redis channel; every worker's pub/sub listener
+marks its snapshot stale and the next read reloads it. Reads are otherwise a
+dict lookup. MAX_AGE bounds staleness if a message is missed or Redis is down.
+"""
+
+import os
+import json
+import time
+import threading
+from types import MappingProxyType
+from typing import Any, Mapping
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from dbs.connection import get_connection
+from src.core.cache import cache_key
+from src.core import pubsub
+
+
+def freeze(value: Any) -> Any:
+    """Read-only copy of a decoded JSON value"""
+    if isinstance(value, dict):
+        return MappingProxyType({k: freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze(v) for v in value)
+    return value
+
+
+class SettingsStore:
+    """Process-wide settings snapshot with cross-worker invalidation"""
+
+    CHANNEL = cache_key('settings', 'changed')
+    MAX_AGE = 300        # Reload at least this often (seconds)
+    RETRY_AFTER = 5      # Retry a failed load after this many seconds
+
+    _snapshot = None
+    _loaded_at = 0.0
+    _stale = False
+    _pid = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def snapshot(cls) -> Mapping[str, Any]:
+        """Current settings keyed by setting_key"""
+        snapshot = cls._snapshot
+        if (snapshot is None or cls._stale or cls._pid != os.getpid()
+                or time.monotonic() - cls._loaded_at > cls.MAX_AGE):
+            snapshot = cls._reload()
+        return snapshot
+
+    @classmethod
+    def get(cls, key: str, default: Any = None) -> Any:
+        """One setting from the snapshot"""
+        return cls.snapshot().get(key, default)
+
+    @classmethod
+    def _reload(cls) -> Mapping[str, Any]:
+        """Load all settings from the database"""
+        with cls._lock:
+            if cls._pid != os.getpid():
+                # Forked worker: drop the parent's copy
+                cls._pid = os.getpid()
+                cls._snapshot = None
+            pubsub.ensure_listener()
+
+            # Another thread may have reloaded while we waited
+            if (cls._snapshot is not None and not cls._stale
+                    and time.monotonic() - cls._loaded_at <= cls.MAX_AGE):
+                return cls._snapshot
+
+            cls._stale = False
+            try:
+                settings = cls._load()
+                cls._snapshot = freeze(settings)
+                cls._loaded_at = time.monotonic()
+            except Exception as e:
+                print(f"[Settings] Load error: {e}")
+                if cls._snapshot is None:
+                    cls._snapshot = MappingProxyType({})
+                cls._loaded_at = time.monotonic() - cls.MAX_AGE + cls.RETRY_AFTER
+
+            return cls._snapshot
+
+    @staticmethod
+    def _load() -> dict:
+        """Decoded system_settings rows"""
+        conn = get_connection()
+        cursor = conn.cursor(dictionary=True)
+
+        try:
+            cursor.execute("SELECT setting_key, setting_value FROM system_settings")
+            settings = {}
+            for row in cursor.fetchall():
+                try:
+                    settings[row['setting_key']] = json.loads(row['setting_value'])
+                except (TypeError, ValueError):
+                    settings[row['setting_key']] = row['setting_value']
+            return settings
+
+        finally:
+            cursor.close()
+            conn.close()
+
+    @classmethod
+    def changed(cls, key: str):
+        """Announce a saved setting to every worker (call after commit)"""
+        cls._stale = True
+        pubsub.publish(cls.CHANNEL, key)
+
+    @classmethod
+    def mark_stale(cls, *args):
+        """Reload on next read"""
+        cls._stale = True
+
+
+pubsub.subscribe(SettingsStore.CHANNEL, SettingsStore.mark_stale, on_reconnect=SettingsStore.mark_stale)
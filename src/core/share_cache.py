@@ -0,0 +1,209 @@
+"""
+Y6 Practice Exam - Public Share Caching
+Rendered public share pages in Redis, and share-view counts buffered in Redis
+
+A shared result is read-only once released, so its page is rendered once
+and served from Redis until it is regraded, reset or unshared. Views are
+counted with HINCRBY and written to MySQL every SHARE_VIEWS_FLUSH_SECONDS by
+one worker at a time, so a popular link never locks the exam row. A flush
+claims the counts atomically before writing them, so they are never applied
+twice. Without Redis both fall back to the old behaviour (render and UPDATE
+per view).
+"""
+
+import os
+import time
+import random
+import threading
+from typing import Any, Dict, Optional
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from dbs.connection import get_connection
+from src.core.cache import get_cache, cache_key, CACHE_TTL
+from src.core.token_store import token_digest
+from src.core.http_cache import content_etag
+from config import SHARE_VIEWS_FLUSH_SECONDS
+
+# Tables holding share_views per kind, tried in order
+SHARE_TABLES = {
+    'exam': ('practice_exams', 'practice_exams_archive'),
+    'question_set': ('question_sets',),
+}
+
+# Question sets can be edited, so their pages follow the question cache TTL
+PAGE_TTL = {
+    'exam': CACHE_TTL['share_pages'],
+    'question_set': CACHE_TTL['question_sets'],
+}
+
+
+class SharePages:
+    """Rendered public share pages keyed by share token"""
+
+    @staticmethod
+    def key(kind: str, token: str) -> str:
+        return cache_key('share_page', kind, token_digest(token))
+
+    @classmethod
+    def get(cls, kind: str, token: str) -> Optional[Dict[str, Any]]:
+        """{'id': item id, 'html': page, 'etag': ETag of the page} or None"""
+        return get_cache().get(cls.key(kind, token))
+
+    @classmethod
+    def put(cls, kind: str, token: str, item_id: int, html: str) -> Dict[str, Any]:
+        """Cache a rendered page; returns the entry"""
+        page = {'id': item_id, 'html': html, 'etag': content_etag(html)}
+        get_cache().set(cls.key(kind, token), page, PAGE_TTL[kind])
+        return page
+
+    @classmethod
+    def invalidate(cls, kind: str, token: Optional[str]):
+        """Drop a cached page (call after revoking, regrading or resetting)"""
+        if token:
+            get_cache().delete(cls.key(kind, token))
+
+
+# Take a hash's counts and delete it in one step, so no two flushes see the same counts
+_CLAIM = """
+local counts = redis.call('HGETALL', KEYS[1])
+redis.call('DEL', KEYS[1])
+return counts
+"""
+
+
+class ShareViews:
+    """Share-view counters buffered in Redis"""
+
+    LEASE_KEY = cache_key('share_views', 'lease')
+
+    _claim_script = None
+    _flusher_pid = None
+    _flusher_lock = threading.Lock()
+
+    @staticmethod
+    def pending_key(kind: str) -> str:
+        return cache_key('share_views', kind)
+
+    @classmethod
+    def hit(cls, kind: str, item_id: int):
+        """Count one view"""
+        cache = get_cache()
+        if cache.enabled:
+            try:
+                with cache.guarded() as client:
+                    client.hincrby(cls.pending_key(kind), item_id, 1)
+                cls.ensure_flusher()
+                return
+            except Exception as e:
+                print(f"[ShareViews] Count error: {e}")
+
+        cls._apply(kind, {item_id: 1})
+
+    @classmethod
+    def pending(cls, kind: str, item_id: int) -> int:
+        """Views counted but not yet written to MySQL"""
+        cache = get_cache()
+        if not cache.enabled:
+            return 0
+
+        try:
+            with cache.guarded() as client:
+                return int(client.hget(cls.pending_key(kind), item_id) or 0)
+        except Exception as e:
+            print(f"[ShareViews] Read error: {e}")
+            return 0
+
+    @staticmethod
+    def _apply(kind: str, counts: Dict[int, int]):
+        """Add view counts to MySQL in one transaction"""
+        conn = get_connection()
+        cursor = conn.cursor()
+
+        try:
+            for item_id in sorted(counts):
+                for table in SHARE_TABLES[kind]:
+                    cursor.execute(f"""
+                        UPDATE {table} SET share_views = COALESCE(share_views, 0) + %s WHERE id = %s
+                    """, (counts[item_id], item_id))
+                    if cursor.rowcount:
+                        break
+            conn.commit()
+
+        finally:
+            cursor.close()
+            conn.close()
+
+    @classmethod
+    def _claim(cls, kind: str) -> Dict[int, int]:
+        """Atomically take every buffered count of one kind out of Redis"""
+        cache = get_cache()
+        if cls._claim_script is None:
+            cls._claim_script = cache.client.register_script(_CLAIM)
+        with cache.guarded() as client:
+            flat = cls._claim_script(keys=[cls.pending_key(kind)], client=client)
+        return {int(flat[i]): int(flat[i + 1]) for i in range(0, len(flat), 2)}
+
+    @classmethod
+    def flush(cls) -> int:
+        """Write buffered counts to MySQL; returns the number of views written"""
+        cache = get_cache()
+        if not cache.enabled:
+            return 0
+
+        written = 0
+        for kind in SHARE_TABLES:
+            # Claimed counts belong to this flush alone: a slow or overlapping
+            # flush can lose them on a crash, but never apply them twice
+            try:
+                counts = cls._claim(kind)
+            except Exception as e:
+                print(f"[ShareViews] Claim error for {kind}: {e}")
+                continue
+            if not counts:
+                continue
+
+            try:
+                cls._apply(kind, counts)
+                written += sum(counts.values())
+            except Exception as e:
+                print(f"[ShareViews] Flush error for {kind}: {e}")
+                # Nothing was committed: put the counts back for the next flush
+                try:
+                    with cache.guarded() as client:
+                        pipe = client.pipeline(transaction=False)
+                        for item_id, count in counts.items():
+                            pipe.hincrby(cls.pending_key(kind), item_id, count)
+                        pipe.execute()
+                except Exception as e:
+                    print(f"[ShareViews] Requeue error for {kind}: {e}")
+
+        return written
+
+    @classmethod
+    def _schedule(cls):
+        """Flusher loop; the Redis lease lets one worker flush per interval"""
+        cache = get_cache()
+        while True:
+            time.sleep(SHARE_VIEWS_FLUSH_SECONDS * random.uniform(0.5, 1.0))
+            try:
+                if cache.acquire_lock(cls.LEASE_KEY, SHARE_VIEWS_FLUSH_SECONDS) is not None:
+                    cls.flush()
+            except Exception as e:
+                print(f"[ShareViews] Flusher error: {e}")
+
+    @classmethod
+    def ensure_flusher(cls):
+        """Start this process's flusher thread (once per pid, so forked workers get their own)"""
+        if cls._flusher_pid == os.getpid():
+            return
+
+        with cls._flusher_lock:
+            if cls._flusher_pid == os.getpid():
+                return
+            cls._flusher_pid = os.getpid()
+
+        threading.Thread(target=cls._schedule, name='share-views-flusher', daemon=True).start()
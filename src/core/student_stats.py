@@ -0,0 +1,91 @@
+"""
+Y6 Practice Exam - Student Statistics
+Maintains the student_stats table (migration 007) alongside practice_exams
+
+Call StudentStats.refresh() with the route's own cursor before conn.commit()
+whenever an exam is created or changes status, so the aggregates commit (or
+roll back) together with the change.
+"""
+
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+# Recomputes rows for the students matched by {where}. Exams come from the hot
+# and archive tables (migration 010), each filtered by {exam_where} so both
+# halves are indexed range scans on student_id
+_UPSERT_SQL = """
+    INSERT INTO student_stats (
+        student_id, total_exams, pending_count, in_progress_count, submitted_count,
+        grading_count, released_count, percentage_sum, avg_percentage,
+        best_percentage, lowest_percentage, total_points, last_activity_at
+    )
+    SELECT
+        u.id,
+        COUNT(pe.id),
+        COALESCE(SUM(pe.status = 'pending'), 0),
+        COALESCE(SUM(pe.status = 'in_progress'), 0),
+        COALESCE(SUM(pe.status = 'submitted'), 0),
+        COALESCE(SUM(pe.status = 'grading'), 0),
+        COALESCE(SUM(pe.status = 'released'), 0),
+        COALESCE(SUM(CASE WHEN pe.status = 'released' THEN pe.percentage END), 0),
+        AVG(CASE WHEN pe.status = 'released' THEN pe.percentage END),
+        MAX(CASE WHEN pe.status = 'released' THEN pe.percentage END),
+        MIN(CASE WHEN pe.status = 'released' THEN pe.percentage END),
+        COALESCE(SUM(CASE WHEN pe.status = 'released' THEN pe.total_score END), 0),
+        MAX(COALESCE(pe.released_at, pe.graded_at, pe.submitted_at, pe.started_at, pe.created_at))
+    FROM users u
+    LEFT JOIN (
+        SELECT id, student_id, status, percentage, total_score,
+               released_at, graded_at, submitted_at, started_at, created_at
+        FROM practice_exams WHERE {exam_where}
+        UNION ALL
+        SELECT id, student_id, status, percentage, total_score,
+               released_at, graded_at, submitted_at, started_at, created_at
+        FROM practice_exams_archive WHERE {exam_where}
+    ) pe ON pe.student_id = u.id
+    WHERE {where}
+    GROUP BY u.id
+    ON DUPLICATE KEY UPDATE
+        total_exams = VALUES(total_exams),
+        pending_count = VALUES(pending_count),
+        in_progress_count = VALUES(in_progress_count),
+        submitted_count = VALUES(submitted_count),
+        grading_count = VALUES(grading_count),
+        released_count = VALUES(released_count),
+        percentage_sum = VALUES(percentage_sum),
+        avg_percentage = VALUES(avg_percentage),
+        best_percentage = VALUES(best_percentage),
+        lowest_percentage = VALUES(lowest_percentage),
+        total_points = VALUES(total_points),
+        last_activity_at = VALUES(last_activity_at)
+"""
+
+
+class StudentStats:
+    """Per-student exam aggregates"""
+
+    @staticmethod
+    def refresh(cursor, student_id: int):
+        """Recompute one student's row inside the caller's transaction"""
+        sql = _UPSERT_SQL.format(exam_where="student_id = %s", where="u.id = %s")
+        cursor.execute(sql, (student_id, student_id, student_id))
+
+    @staticmethod
+    def rebuild(cursor, min_id: int = None, max_id: int = None):
+        """Recompute all students (optionally an id range), e.g. after a bulk load"""
+        where, exam_where = "u.role_id = 2", "1=1"
+        params = []
+        if min_id is not None:
+            where += " AND u.id >= %s"
+            exam_where += " AND student_id >= %s"
+            params.append(min_id)
+        if max_id is not None:
+            where += " AND u.id <= %s"
+            exam_where += " AND student_id <= %s"
+            params.append(max_id)
+        sql = _UPSERT_SQL.format(exam_where=exam_where, where=where)
+        cursor.execute(sql, params * 3)
+        return cursor.rowcount
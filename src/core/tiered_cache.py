@@ -0,0 +1,144 @@
+"""
+Y6 Practice Exam - Two-Level Cache
+Per-worker LRU (L1) in front of Redis (L2) for rarely changing data
+
+Values live in L1 encoded, so every read returns a private copy. Writes and
+invalidations (but not get_or_load fills) are broadcast over Redis pub/sub so other workers drop their
+L1 copies; the short per-namespace L1 TTL (CACHE_L1_TTL) bounds staleness
+if a broadcast is missed.
+
+Usage:
+    subjects = get_tiered_cache().get_or_load('subjects', 'active', load_subjects)
+    get_tiered_cache().invalidate_namespace('subjects')
+"""
+
+import threading
+from typing import Any, Callable, Dict, Optional
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from config import CACHE_L1_MAX_ITEMS
+from src.core.cache import get_cache, cache_key, CACHE_TTL, CACHE_L1_TTL
+from src.core.cache_codec import encode, decode
+from src.core.local_cache import LocalCache
+from src.core.metrics import CACHE_TIER_LOOKUPS
+from src.core import pubsub
+
+INVALIDATE_CHANNEL = cache_key('l1', 'invalidate')
+
+DEFAULT_TTL = 300
+DEFAULT_L1_TTL = 30
+
+
+class TieredCache:
+    """L1 (in-process) + L2 (Redis) cache keyed by namespace and key"""
+
+    def __init__(self, max_items: int = CACHE_L1_MAX_ITEMS):
+        self.l1 = LocalCache(max_items)
+        self._counts = {}
+        self._lock = threading.Lock()
+
+    def _count(self, namespace: str, level: str, result: str):
+        CACHE_TIER_LOOKUPS.labels(namespace, level, result).inc()
+        with self._lock:
+            key = (level, result)
+            self._counts[key] = self._counts.get(key, 0) + 1
+
+    def get(self, namespace: str, key) -> Optional[Any]:
+        """Value from L1, else L2 (promoting it to L1), else None"""
+        pubsub.ensure_listener()
+        full_key = cache_key(namespace, key)
+
+        raw = self.l1.get(full_key)
+        if raw is not None:
+            self._count(namespace, 'l1', 'hit')
+            return decode(raw)
+        self._count(namespace, 'l1', 'miss')
+
+        value = get_cache().get(full_key)
+        if value is None:
+            self._count(namespace, 'l2', 'miss')
+            return None
+
+        self._count(namespace, 'l2', 'hit')
+        self.l1.set(full_key, encode(value), CACHE_L1_TTL.get(namespace, DEFAULT_L1_TTL))
+        return value
+
+    def _store(self, namespace: str, full_key: str, value: Any):
+        get_cache().set(full_key, value, CACHE_TTL.get(namespace, DEFAULT_TTL))
+        self.l1.set(full_key, encode(value), CACHE_L1_TTL.get(namespace, DEFAULT_L1_TTL))
+
+    def set(self, namespace: str, key, value: Any):
+        """Store in both levels and drop other workers' L1 copies"""
+        full_key = cache_key(namespace, key)
+        self._store(namespace, full_key, value)
+        pubsub.publish(INVALIDATE_CHANNEL, full_key)
+
+    def get_or_load(self, namespace: str, key, loader: Callable[[], Any]) -> Any:
+        """Cached value, or loader() stored in both levels (None is not cached)"""
+        value = self.get(namespace, key)
+        if value is None:
+            value = loader()
+            if value is not None:
+                # A fill of a missing key: other workers have no L1 copy to drop
+                self._store(namespace, cache_key(namespace, key), value)
+                # Callers get the same types on a miss as on a hit
+                value = decode(encode(value))
+        return value
+
+    def invalidate(self, namespace: str, key):
+        """Remove one key from every worker's L1 and from Redis"""
+        full_key = cache_key(namespace, key)
+        self.l1.delete(full_key)
+        get_cache().delete(full_key)
+        pubsub.publish(INVALIDATE_CHANNEL, full_key)
+
+    def invalidate_namespace(self, namespace: str):
+        """Remove a whole namespace from every worker's L1 and from Redis"""
+        prefix = cache_key(namespace, '')
+        self.l1.delete_prefix(prefix)
+        get_cache().delete_pattern(f"{namespace}:")
+        pubsub.publish(INVALIDATE_CHANNEL, prefix + '*')
+
+    def on_invalidate(self, message: str):
+        """Broadcast handler: drop a key (or 'prefix*') from this worker's L1"""
+        if message.endswith('*'):
+            self.l1.delete_prefix(message[:-1])
+        else:
+            self.l1.delete(message)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit counts and ratios per level for this worker"""
+        with self._lock:
+            counts = dict(self._counts)
+
+        stats = {'l1_items': len(self.l1)}
+        for level in ('l1', 'l2'):
+            hits = counts.get((level, 'hit'), 0)
+            misses = counts.get((level, 'miss'), 0)
+            stats[level] = {
+                'hits': hits,
+                'misses': misses,
+                'hit_ratio': round(hits / (hits + misses), 3) if hits + misses else None
+            }
+        return stats
+
+
+# Global two-level cache instance
+_tiered_cache = None
+
+
+def get_tiered_cache() -> TieredCache:
+    """Get or create this worker's two-level cache"""
+    global _tiered_cache
+    if _tiered_cache is None:
+        _tiered_cache = TieredCache()
+    return _tiered_cache
+
+
+pubsub.subscribe(INVALIDATE_CHANNEL,
+                 lambda message: get_tiered_cache().on_invalidate(message),
+                 on_reconnect=lambda: get_tiered_cache().l1.clear())
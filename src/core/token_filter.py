@@ -0,0 +1,208 @@
+"""
+Y6 Practice Exam - Token Filter
+Per-worker Bloom filters of live share tokens and magic links
+
+The public share pages and magic-link logins are unauthenticated, so a
+scanner guessing tokens would otherwise cost a JOIN per guess. A token the
+filter has never seen is rejected without a query; anything it might have
+seen (including ~TOKEN_FILTER_ERROR_RATE of random guesses) goes on to the
+normal database check, which stays the authority.
+
+Filters are built from the database in a background thread when the worker
+starts, then kept current by add() broadcasts over Redis pub/sub. Bloom
+filters cannot forget, so revoked and used tokens linger (harmlessly) until
+the next rebuild every TOKEN_FILTER_REBUILD_SECONDS. Until a filter is built,
+and whenever Redis is unavailable (no broadcasts), every token is let through.
+"""
+
+import math
+import time
+import json
+import threading
+from typing import Dict, Iterator
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from dbs.connection import get_connection
+from src.core.cache import get_cache, cache_key
+from src.core.metrics import TOKEN_FILTER_CHECKS
+from src.core.token_store import token_digest
+from src.core import pubsub
+from config import (TOKEN_FILTER_ENABLED, TOKEN_FILTER_CAPACITY, TOKEN_FILTER_ERROR_RATE,
+                    TOKEN_FILTER_REBUILD_SECONDS)
+
+CHANNEL = cache_key('token_filter', 'add')
+RETRY_SECONDS = 30  # After a failed build
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over hex SHA-256 digests"""
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.size = max(64, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, digest: str) -> Iterator[int]:
+        # Double hashing; the digest is already uniformly distributed
+        h1, h2 = int(digest[:16], 16), int(digest[16:32], 16) | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, digest: str):
+        for pos in self._positions(digest):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, digest: str) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(digest))
+
+
+def _share_digests() -> Iterator[str]:
+    """Public exam results (hot and archived) and question sets"""
+    conn = get_connection()  # Primary: a replica may not have the newest tokens yet
+    cursor = conn.cursor()
+
+    try:
+        cursor.execute("""
+            SELECT share_token FROM practice_exams WHERE share_token IS NOT NULL AND is_public = TRUE
+            UNION ALL
+            SELECT share_token FROM practice_exams_archive WHERE share_token IS NOT NULL AND is_public = TRUE
+            UNION ALL
+            SELECT share_token FROM question_sets WHERE share_token IS NOT NULL AND is_public = TRUE
+        """)
+        for (token,) in cursor:
+            yield token_digest(token)
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def _magic_digests() -> Iterator[str]:
+    """Unused, unexpired magic links in MySQL and in the Redis token store"""
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    try:
+        cursor.execute("SELECT token FROM magic_links WHERE used_at IS NULL AND expires_at > NOW()")
+        for (token,) in cursor:
+            yield token_digest(token)
+    finally:
+        cursor.close()
+        conn.close()
+
+    # Redis keys already end in the digest (TokenStore.link_key)
+    cache = get_cache()
+    if cache.enabled:
+        with cache.guarded() as client:
+            for key in client.scan_iter(match=cache_key('magic', '*'), count=1000):
+                yield key.rsplit(':', 1)[1]
+
+
+class TokenFilter:
+    """Reject unknown share and magic-link tokens before any query"""
+
+    LOADERS = {'share': _share_digests, 'magic': _magic_digests}
+
+    _filters: Dict[str, BloomFilter] = {}
+    _attempted_at: Dict[str, float] = {}
+    _pending: Dict[str, list] = {}  # Broadcasts received while a rebuild runs
+    _generation = 0                 # Bumped on pub/sub reconnect; older builds are discarded
+    _lock = threading.Lock()
+
+    @classmethod
+    def might_contain(cls, kind: str, token: str) -> bool:
+        """False only if token is certainly not a live token of this kind"""
+        if not TOKEN_FILTER_ENABLED or not get_cache().enabled:
+            TOKEN_FILTER_CHECKS.labels(kind=kind, result='bypass').inc()
+            return True
+
+        pubsub.ensure_listener()
+        bloom = cls._filters.get(kind)
+        cls._rebuild_if_due(kind, bloom is None)
+
+        if bloom is None:
+            TOKEN_FILTER_CHECKS.labels(kind=kind, result='bypass').inc()
+            return True
+
+        found = token_digest(token) in bloom
+        TOKEN_FILTER_CHECKS.labels(kind=kind, result='pass' if found else 'reject').inc()
+        return found
+
+    @classmethod
+    def add(cls, kind: str, token: str):
+        """Register a new token in this worker and broadcast it to the others"""
+        digest = token_digest(token)
+        cls._add_local(kind, digest)
+        pubsub.publish(CHANNEL, json.dumps({'kind': kind, 'digest': digest}))
+
+    @classmethod
+    def warm(cls):
+        """Start building every filter (call at startup)"""
+        if TOKEN_FILTER_ENABLED:
+            pubsub.ensure_listener()
+            for kind in cls.LOADERS:
+                cls._rebuild_if_due(kind, True)
+
+    @classmethod
+    def _add_local(cls, kind: str, digest: str):
+        with cls._lock:
+            if kind in cls._filters:
+                cls._filters[kind].add(digest)
+            if kind in cls._pending:
+                cls._pending[kind].append(digest)
+
+    @classmethod
+    def _rebuild_if_due(cls, kind: str, missing: bool):
+        """Start a background rebuild when the filter is missing or old"""
+        wait = RETRY_SECONDS if missing else TOKEN_FILTER_REBUILD_SECONDS
+        with cls._lock:
+            if kind in cls._pending or time.time() - cls._attempted_at.get(kind, 0) < wait:
+                return
+            cls._attempted_at[kind] = time.time()
+            cls._pending[kind] = []
+            generation = cls._generation
+
+        threading.Thread(target=cls._rebuild, args=(kind, generation),
+                         name=f'token-filter-{kind}', daemon=True).start()
+
+    @classmethod
+    def _rebuild(cls, kind: str, generation: int):
+        try:
+            bloom = BloomFilter(TOKEN_FILTER_CAPACITY, TOKEN_FILTER_ERROR_RATE)
+            count = 0
+            for digest in cls.LOADERS[kind]():
+                bloom.add(digest)
+                count += 1
+
+            with cls._lock:
+                if generation != cls._generation:
+                    return
+                for digest in cls._pending.get(kind, []):
+                    bloom.add(digest)
+                cls._filters[kind] = bloom
+            print(f"[TokenFilter] Built {kind} filter ({count} tokens)")
+
+        except Exception as e:
+            print(f"[TokenFilter] Build error for {kind}: {e}")
+
+        finally:
+            with cls._lock:
+                cls._pending.pop(kind, None)
+
+    @classmethod
+    def _on_message(cls, data: str):
+        message = json.loads(data)
+        cls._add_local(message['kind'], message['digest'])
+
+    @classmethod
+    def _on_reconnect(cls):
+        """Broadcasts may have been missed: stop filtering until rebuilt"""
+        with cls._lock:
+            cls._generation += 1
+            cls._filters.clear()
+            cls._attempted_at.clear()
+
+
+pubsub.subscribe(CHANNEL, TokenFilter._on_message, TokenFilter._on_reconnect)
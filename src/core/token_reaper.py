@@ -0,0 +1,139 @@
+"""
+Y6 Practice Exam - Expired-Token Reaper
+Deletes expired and used rows from user_sessions, user_otps and magic_links
+
+Rows are deleted in small batches (one short transaction each, with a pause
+between) so the auth lookups never wait on a long purge. Every worker runs a
+scheduler thread, but a Redis lease lets only one of them reap per interval;
+without Redis the run is still serialised with a MySQL named lock. The same
+run is available as tools/reap_tokens.py for cron.
+"""
+
+import os
+import time
+import random
+import threading
+from typing import Dict
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from dbs.connection import get_connection
+from src.core.cache import get_cache, cache_key
+from src.core.metrics import TOKENS_REAPED
+from config import (TOKEN_REAPER_INTERVAL_SECONDS, TOKEN_REAPER_BATCH_SIZE, TOKEN_REAPER_MAX_BATCHES,
+                    TOKEN_REAPER_SLEEP, TOKEN_GRACE_HOURS)
+
+# (kind, table, condition); each condition is a range on an indexed column
+# (migration 011) and takes the grace period in hours as its only parameter
+TARGETS = (
+    ('sessions', 'user_sessions', "expires_at < NOW() - INTERVAL %s HOUR"),
+    ('otps', 'user_otps', "expires_at < NOW() - INTERVAL %s HOUR"),
+    ('magic_links_expired', 'magic_links', "expires_at < NOW() - INTERVAL %s HOUR"),
+    ('magic_links_used', 'magic_links', "used_at < NOW() - INTERVAL %s HOUR"),
+)
+
+LOCK_NAME = 'y6_token_reaper'
+
+
+class TokenReaper:
+    """Batched purge of dead auth rows"""
+
+    LEASE_KEY = cache_key('token_reaper', 'lease')
+
+    _scheduler_pid = None
+    _scheduler_lock = threading.Lock()
+
+    @staticmethod
+    def count(grace_hours: int = None) -> Dict[str, int]:
+        """Rows each target would delete right now"""
+        grace_hours = TOKEN_GRACE_HOURS if grace_hours is None else grace_hours
+        conn = get_connection(readonly=True)
+        cursor = conn.cursor()
+
+        try:
+            counts = {}
+            for kind, table, condition in TARGETS:
+                cursor.execute(f"SELECT COUNT(*) FROM {table} WHERE {condition}", (grace_hours,))
+                counts[kind] = cursor.fetchone()[0]
+            return counts
+        finally:
+            cursor.close()
+            conn.close()
+
+    @staticmethod
+    def run_once(batch_size: int = None, max_batches: int = None, pause: float = None,
+                 grace_hours: int = None) -> Dict[str, int]:
+        """Reap every target; returns rows deleted per kind ({} if another run holds the lock)"""
+        batch_size = batch_size or TOKEN_REAPER_BATCH_SIZE
+        max_batches = max_batches or TOKEN_REAPER_MAX_BATCHES
+        pause = TOKEN_REAPER_SLEEP if pause is None else pause
+        grace_hours = TOKEN_GRACE_HOURS if grace_hours is None else grace_hours
+
+        conn = get_connection()
+        cursor = conn.cursor()
+
+        try:
+            cursor.execute("SELECT GET_LOCK(%s, 0)", (LOCK_NAME,))
+            if cursor.fetchone()[0] != 1:
+                return {}
+
+            try:
+                deleted = {}
+                for kind, table, condition in TARGETS:
+                    deleted[kind] = 0
+                    for _ in range(max_batches):
+                        cursor.execute(f"DELETE FROM {table} WHERE {condition} LIMIT %s",
+                                       (grace_hours, batch_size))
+                        rows = cursor.rowcount
+                        conn.commit()
+                        deleted[kind] += rows
+                        if rows < batch_size:
+                            break
+                        time.sleep(pause)
+                    TOKENS_REAPED.labels(kind=kind).inc(deleted[kind])
+            finally:
+                cursor.execute("SELECT RELEASE_LOCK(%s)", (LOCK_NAME,))
+                cursor.fetchone()
+
+        finally:
+            cursor.close()
+            conn.close()
+
+        if any(deleted.values()):
+            print(f"[Reaper] Deleted {', '.join(f'{n} {k}' for k, n in deleted.items() if n)}")
+        return deleted
+
+    @classmethod
+    def run_if_leader(cls) -> Dict[str, int]:
+        """Reap unless another worker already did this interval"""
+        cache = get_cache()
+        if cache.enabled:
+            # The lease is never released: it expires after one interval,
+            # so whichever worker takes it next runs the next pass
+            if cache.acquire_lock(cls.LEASE_KEY, TOKEN_REAPER_INTERVAL_SECONDS) is None:
+                return {}
+        return cls.run_once()
+
+    @classmethod
+    def _schedule(cls):
+        """Scheduler loop: one attempt per interval (jittered so workers don't align)"""
+        while True:
+            time.sleep(TOKEN_REAPER_INTERVAL_SECONDS * random.uniform(0.5, 1.0))
+            try:
+                cls.run_if_leader()
+            except Exception as e:
+                print(f"[Reaper] Run failed: {e}")
+
+    @classmethod
+    def ensure_scheduler(cls):
+        """Start this process's scheduler thread (once per pid, so forked workers get their own)"""
+        with cls._scheduler_lock:
+            if cls._scheduler_pid == os.getpid():
+                return
+            cls._scheduler_pid = os.getpid()
+
+        thread = threading.Thread(target=cls._schedule, name='token-reaper', daemon=True)
+        thread.start()
@@ -0,0 +1,651 @@
+/**
+ * Take Exam Page
+ * Timer, server sync, autosave, drawing answers, navigation and submit
+ * Expects examId, drawingQuestions, totalQuestions, EXAM_DURATION_*,
+ * serverElapsedSeconds, examStartedAt and serverNow from the page
+ */
+
+console.log('Timer Debug:', {
+    duration_minutes: EXAM_DURATION_MINUTES,
+    duration_seconds: EXAM_DURATION_SECONDS,
+    elapsed_seconds: serverElapsedSeconds,
+    started_at: examStartedAt,
+    server_now: serverNow
+});
+
+let remainingSeconds = Math.max(0, EXAM_DURATION_SECONDS - serverElapsedSeconds);
+console.log('Remaining seconds:', remainingSeconds);
+let timerInterval;
+let syncInterval;
+let isSubmitting = false;
+let examEnded = false;
+
+// Initialize countdown timer
+function initTimer() {
+    updateTimerDisplay();
+    timerInterval = setInterval(updateTimer, 1000);
+    // Sync with server every 30 seconds
+    syncInterval = setInterval(syncWithServer, 30000);
+}
+
+function updateTimer() {
+    if (examEnded) return;
+
+    remainingSeconds--;
+    updateTimerDisplay();
+
+    // Auto-submit when time runs out
+    if (remainingSeconds <= 0 && !isSubmitting) {
+        autoSubmitExam();
+    }
+}
+
+async function syncWithServer() {
+    if (examEnded) return;
+    try {
+        const response = await fetch(`/student/exam/${examId}/time-check`);
+        const data = await response.json();
+        if (data.remaining_seconds !== undefined) {
+            remainingSeconds = Math.max(0, data.remaining_seconds);
+            if (remainingSeconds <= 0 && !isSubmitting) {
+                autoSubmitExam();
+            }
+        }
+    } catch (e) {
+        console.log('Time sync failed, using local timer');
+    }
+}
+
+function updateTimerDisplay() {
+    const display = document.getElementById('timerText');
+    const label = document.getElementById('timerLabel');
+    const timerDiv = document.getElementById('timerDisplay');
+    const progressBar = document.getElementById('timerProgressBar');
+
+    const absRemaining = Math.abs(remainingSeconds);
+    const minutes = Math.floor(absRemaining / 60);
+    const seconds = absRemaining % 60;
+
+    if (remainingSeconds <= 0) {
+        display.textContent = `00:00`;
+        label.textContent = 'TIME UP';
+    } else {
+        display.textContent = `${minutes.toString().padStart(2, '0')}:${seconds.toString().padStart(2, '0')}`;
+        label.textContent = 'remaining';
+    }
+
+    // Progress bar shows time remaining (fills as time runs out)
+    const usedPercent = Math.min(100, ((EXAM_DURATION_SECONDS - remainingSeconds) / EXAM_DURATION_SECONDS) * 100);
+    progressBar.style.width = usedPercent + '%';
+
+    // Status indicators
+    timerDiv.classList.remove('warning', 'danger', 'delayed');
+
+    if (remainingSeconds <= 0) {
+        timerDiv.classList.add('delayed');
+        progressBar.style.background = '#D13438';
+    } else if (remainingSeconds <= 300) {
+        // 5 minutes or less
+        timerDiv.classList.add('danger');
+        progressBar.style.background = '#D13438';
+    } else if (remainingSeconds <= 600) {
+        // 10 minutes or less
+        timerDiv.classList.add('warning');
+        progressBar.style.background = '#FFB900';
+    } else {
+        progressBar.style.background = 'var(--azure-blue)';
+    }
+}
+
+// Auto-submit when time expires
+async function autoSubmitExam() {
+    if (isSubmitting || examEnded) return;
+    isSubmitting = true;
+    examEnded = true;
+
+    clearInterval(timerInterval);
+    clearInterval(syncInterval);
+
+    // Block UI
+    document.getElementById('exam-form').style.pointerEvents = 'none';
+    document.getElementById('exam-form').style.opacity = '0.6';
+
+    showToast('Time is up! Auto-submitting your exam...', 'warning');
+
+    // Collect all answers
+    const answers = [];
+    document.querySelectorAll('.question-card').forEach(card => {
+        const qId = card.dataset.questionId;
+        let answer = '';
+
+        const radio = card.querySelector('input[type="radio"]:checked');
+        const drawingData = card.querySelector('input[id^="drawing-data-"]');
+
+        if (radio) {
+            answer = radio.value;
+        } else if (drawingData && drawingData.value && drawingData.value.startsWith('data:image')) {
+            answer = drawingData.value;
+        } else {
+            const text = card.querySelector('input[type="text"]:not([type="hidden"]), textarea');
+            if (text) answer = text.value.trim();
+        }
+
+        answers.push({ question_id: parseInt(qId), answer: answer });
+    });
+
+    try {
+        const response = await fetch(`/student/exam/${examId}/submit`, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ answers: answers, auto_submit: true })
+        });
+
+        const data = await response.json();
+
+        if (data.success) {
+            window.removeEventListener('beforeunload', beforeUnloadHandler);
+            showToast('Exam auto-submitted successfully!', 'success');
+            setTimeout(() => window.location.href = '/student', 2000);
+        } else {
+            showToast('Auto-submit failed: ' + (data.error || 'Unknown error'), 'error');
+        }
+    } catch (error) {
+        showToast('Auto-submit error. Please contact your teacher.', 'error');
+    }
+}
+
+// MCQ click handling
+document.querySelectorAll('.mcq-option').forEach(option => {
+    option.addEventListener('click', function() {
+        const parent = this.closest('.mcq-options');
+        parent.querySelectorAll('.mcq-option').forEach(o => o.classList.remove('selected'));
+        this.classList.add('selected');
+
+        const radio = this.querySelector('input[type="radio"]');
+        radio.checked = true;
+        saveAnswer(parseInt(this.closest('.question-card').dataset.questionId), radio.value);
+        updateProgress();
+    });
+});
+
+// Auto-save
+async function saveAnswer(questionId, answer) {
+    try {
+        await fetch(`/student/exam/${examId}/save`, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ question_id: questionId, answer: answer })
+        });
+
+        // Mark card as answered
+        const card = document.getElementById('question-' + questionId);
+        if (answer && answer.trim()) {
+            card.classList.add('answered');
+        } else {
+            card.classList.remove('answered');
+        }
+        updateProgress();
+    } catch (error) {
+        console.error('Auto-save failed:', error);
+    }
+}
+
+// Update progress
+function updateProgress() {
+    let answered = 0;
+    document.querySelectorAll('.question-card').forEach(card => {
+        const radio = card.querySelector('input[type="radio"]:checked');
+        const text = card.querySelector('input[type="text"]:not([type="hidden"]), textarea');
+        const drawingData = card.querySelector('input[id^="drawing-data-"]');
+
+        if (radio || (text && text.value.trim()) || (drawingData && drawingData.value && drawingData.value.startsWith('data:image'))) {
+            answered++;
+        }
+    });
+
+    document.getElementById('answeredCount').textContent = answered;
+    document.getElementById('progressBar').style.width = (answered / totalQuestions * 100) + '%';
+
+    return answered;
+}
+
+// Submit exam
+function submitExam() {
+    const answered = updateProgress();
+    const unanswered = totalQuestions - answered;
+    const percentage = Math.round((answered / totalQuestions) * 100);
+
+    // Determine card states based on values
+    const totalClass = '';
+    const answeredClass = answered === totalQuestions ? 'success' : (answered > 0 ? 'success' : '');
+    const unansweredClass = unanswered > 0 ? (unanswered > totalQuestions / 2 ? 'danger' : 'warning') : 'success';
+
+    let statsHtml = `
+        <div class="submit-stat-card">
+            <div class="submit-stat-value">${totalQuestions}</div>
+            <div class="submit-stat-label">Total</div>
+        </div>
+        <div class="submit-stat-card ${answeredClass}">
+            <div class="submit-stat-value">${answered}</div>
+            <div class="submit-stat-label">Answered</div>
+        </div>
+        <div class="submit-stat-card ${unansweredClass}">
+            <div class="submit-stat-value">${unanswered}</div>
+            <div class="submit-stat-label">Skipped</div>
+        </div>
+    `;
+
+    document.getElementById('submitStats').innerHTML = statsHtml;
+    document.getElementById('submit-modal').classList.add('active');
+}
+
+function closeModal() {
+    document.getElementById('submit-modal').classList.remove('active');
+    // Reset checkbox and button state
+    document.getElementById('confirmCheck').checked = false;
+    document.getElementById('confirmBtn').disabled = true;
+}
+
+// Enable submit button only when checkbox is checked
+document.getElementById('confirmCheck').addEventListener('change', function() {
+    document.getElementById('confirmBtn').disabled = !this.checked;
+});
+
+async function confirmSubmit() {
+    const btn = document.getElementById('confirmBtn');
+    btn.disabled = true;
+    btn.innerHTML = `
+        <svg viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2" style="width:18px;height:18px;animation:spin 1s linear infinite">
+            <path d="M12 2v4m0 12v4m-8-10H2m20 0h-4m-2.93-6.07L15.66 7.34M8.34 16.66l-1.41 1.41M16.66 16.66l1.41 1.41M7.34 7.34L5.93 5.93"/>
+        </svg>
+        Submitting...
+    `;
+
+    const answers = [];
+    document.querySelectorAll('.question-card').forEach(card => {
+        const qId = card.dataset.questionId;
+        let answer = '';
+
+        const radio = card.querySelector('input[type="radio"]:checked');
+        const drawingData = card.querySelector('input[id^="drawing-data-"]');
+
+        if (radio) {
+            answer = radio.value;
+        } else if (drawingData && drawingData.value && drawingData.value.startsWith('data:image')) {
+            answer = drawingData.value;
+        } else {
+            const text = card.querySelector('input[type="text"]:not([type="hidden"]), textarea');
+            if (text) answer = text.value.trim();
+        }
+
+        answers.push({ question_id: parseInt(qId), answer: answer });
+    });
+
+    try {
+        const response = await fetch(`/student/exam/${examId}/submit`, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ answers: answers })
+        });
+
+        const data = await response.json();
+
+        if (data.success) {
+            clearInterval(timerInterval);
+            window.removeEventListener('beforeunload', beforeUnloadHandler);
+            showToast('Exam submitted successfully!', 'success');
+            setTimeout(() => window.location.href = '/student', 1500);
+        } else {
+            showToast(data.error || 'Submission failed', 'error');
+            btn.disabled = false;
+            btn.textContent = 'Submit';
+        }
+    } catch (error) {
+        showToast('Error submitting exam', 'error');
+        btn.disabled = false;
+        btn.textContent = 'Submit';
+    }
+
+    closeModal();
+}
+
+// Warn before leaving
+function beforeUnloadHandler(e) {
+    e.preventDefault();
+    e.returnValue = '';
+}
+window.addEventListener('beforeunload', beforeUnloadHandler);
+
+// Initialize drawing canvases
+const drawingCanvases = {};
+
+function initDrawingCanvases() {
+    drawingQuestions.forEach(question => {
+        const containerId = `drawing-container-${question.id}`;
+        const container = document.getElementById(containerId);
+
+        if (container && typeof DrawingCanvas !== 'undefined') {
+            // Get available width
+            const availableWidth = container.offsetWidth || window.innerWidth - 60;
+
+            // Responsive canvas sizing based on screen orientation
+            let canvasWidth, canvasHeight;
+
+            if (window.innerWidth >= 768) {
+                // Desktop/Landscape - wide canvas
+                canvasWidth = Math.min(availableWidth, 800);
+                canvasHeight = Math.floor(canvasWidth * 0.75); // 4:3 aspect ratio
+            } else {
+                // Mobile/Portrait - tall canvas
+                canvasWidth = Math.min(availableWidth, 500);
+                canvasHeight = Math.floor(canvasWidth * 1.4); // Portrait aspect ratio
+            }
+
+            // Ensure minimum sizes
+            canvasWidth = Math.max(canvasWidth, 320);
+            canvasHeight = Math.max(canvasHeight, 450);
+
+            drawingCanvases[question.id] = new DrawingCanvas(containerId, {
+                width: canvasWidth,
+                height: canvasHeight,
+                questionId: question.id,
+                type: question.drawing_template?.type || 'freehand',
+                onSave: function(qId, imageData) {
+                    const hiddenInput = document.getElementById(`drawing-data-${qId}`);
+                    if (hiddenInput) {
+                        hiddenInput.value = imageData;
+                    }
+                    saveAnswer(qId, imageData);
+                }
+            });
+
+            // Load existing drawing if present
+            const existingData = document.getElementById(`drawing-data-${question.id}`)?.value;
+            if (existingData && existingData.startsWith('data:image')) {
+                const canvas = drawingCanvases[question.id];
+                if (canvas && canvas.setBackgroundImage) {
+                    // Small delay to ensure canvas is ready
+                    setTimeout(() => canvas.loadState(existingData), 100);
+                }
+            }
+        }
+    });
+}
+
+// ============================================
+// MATCHING GAME - Drag & Drop
+// ============================================
+function initMatchingGames() {
+    document.querySelectorAll('.matching-game').forEach(game => {
+        const questionId = game.dataset.questionId;
+        const slots = game.querySelectorAll('.match-slot');
+        const draggables = game.querySelectorAll('.match-right-item.draggable');
+        const hiddenInput = game.closest('.matching-wrapper').querySelector('.matching-answer');
+
+        // Load existing answer
+        if (hiddenInput.value) {
+            loadMatchingAnswer(game, hiddenInput.value);
+        }
+
+        // Desktop drag events
+        draggables.forEach(item => {
+            item.addEventListener('dragstart', handleDragStart);
+            item.addEventListener('dragend', handleDragEnd);
+        });
+
+        slots.forEach(slot => {
+            slot.addEventListener('dragover', handleDragOver);
+            slot.addEventListener('dragleave', handleDragLeave);
+            slot.addEventListener('drop', handleDrop);
+        });
+
+        // Touch events for mobile
+        draggables.forEach(item => {
+            item.addEventListener('touchstart', handleTouchStart, { passive: false });
+            item.addEventListener('touchmove', handleTouchMove, { passive: false });
+            item.addEventListener('touchend', handleTouchEnd);
+        });
+    });
+}
+
+let draggedItem = null;
+let touchClone = null;
+let touchStartX = 0;
+let touchStartY = 0;
+
+function handleDragStart(e) {
+    draggedItem = this;
+    this.classList.add('dragging');
+    e.dataTransfer.effectAllowed = 'move';
+    e.dataTransfer.setData('text/plain', this.dataset.answer);
+}
+
+function handleDragEnd(e) {
+    this.classList.remove('dragging');
+    document.querySelectorAll('.match-slot').forEach(s => s.classList.remove('drag-over'));
+    draggedItem = null;
+}
+
+function handleDragOver(e) {
+    e.preventDefault();
+    e.dataTransfer.dropEffect = 'move';
+    if (!this.classList.contains('filled')) {
+        this.classList.add('drag-over');
+    }
+}
+
+function handleDragLeave(e) {
+    this.classList.remove('drag-over');
+}
+
+function handleDrop(e) {
+    e.preventDefault();
+    this.classList.remove('drag-over');
+
+    if (!draggedItem || this.classList.contains('filled')) return;
+
+    const answer = draggedItem.dataset.answer;
+    const answerText = draggedItem.querySelector('.match-text').textContent;
+    const leftIndex = this.dataset.left;
+    const game = this.closest('.matching-game');
+
+    // Place the answer in the slot
+    placeAnswer(this, answer, answerText, game, draggedItem);
+}
+
+function placeAnswer(slot, answer, answerText, game, sourceItem) {
+    // Create dropped answer chip
+    const chip = document.createElement('div');
+    chip.className = 'dropped-answer';
+    chip.dataset.answer = answer;
+    chip.innerHTML = `<span class="chip-letter">${answer}</span>`;
+    chip.title = 'Click to remove';
+
+    // Click to remove
+    chip.addEventListener('click', () => {
+        removeAnswer(slot, answer, game, sourceItem);
+    });
+
+    // Clear slot and add chip
+    slot.innerHTML = '';
+    slot.appendChild(chip);
+    slot.classList.add('filled');
+
+    // Mark source as placed
+    if (sourceItem) {
+        sourceItem.classList.add('placed');
+        sourceItem.draggable = false;
+    }
+
+    // Update hidden input and save
+    updateMatchingAnswer(game);
+}
+
+function removeAnswer(slot, answer, game, sourceItem) {
+    // Restore slot
+    slot.innerHTML = '<span class="slot-placeholder">Drop here</span>';
+    slot.classList.remove('filled');
+
+    // Find and restore the draggable
+    const draggable = game.querySelector(`.match-right-item[data-answer="${answer}"]`);
+    if (draggable) {
+        draggable.classList.remove('placed');
+        draggable.draggable = true;
+    }
+
+    // Update hidden input
+    updateMatchingAnswer(game);
+}
+
+function updateMatchingAnswer(game) {
+    const slots = game.querySelectorAll('.match-slot');
+    const pairs = [];
+
+    slots.forEach(slot => {
+        const leftIndex = slot.dataset.left;
+        const chip = slot.querySelector('.dropped-answer');
+        if (chip) {
+            pairs.push(`${leftIndex}-${chip.dataset.answer}`);
+        }
+    });
+
+    const answer = pairs.join(',');
+    const wrapper = game.closest('.matching-wrapper');
+    const hiddenInput = wrapper.querySelector('.matching-answer');
+    const questionId = game.dataset.questionId;
+
+    hiddenInput.value = answer;
+    saveAnswer(parseInt(questionId), answer);
+
+    // Mark question as answered if all slots filled
+    const card = game.closest('.question-card');
+    if (pairs.length === slots.length) {
+        card.classList.add('answered');
+    } else {
+        card.classList.remove('answered');
+    }
+    updateProgress();
+}
+
+function loadMatchingAnswer(game, answerStr) {
+    if (!answerStr) return;
+
+    // Parse "1-A,2-B,3-C" format
+    const pairs = answerStr.split(',');
+
+    pairs.forEach(pair => {
+        const [leftIndex, answer] = pair.split('-');
+        if (!leftIndex || !answer) return;
+
+        const slot = game.querySelector(`.match-slot[data-left="${leftIndex}"]`);
+        const draggable = game.querySelector(`.match-right-item[data-answer="${answer}"]`);
+
+        if (slot && draggable) {
+            const answerText = draggable.querySelector('.match-text').textContent;
+            placeAnswer(slot, answer, answerText, game, draggable);
+        }
+    });
+}
+
+// ============================================
+// TOUCH SUPPORT FOR MATCHING
+// ============================================
+function handleTouchStart(e) {
+    if (this.classList.contains('placed')) return;
+
+    e.preventDefault();
+    draggedItem = this;
+
+    const touch = e.touches[0];
+    touchStartX = touch.clientX;
+    touchStartY = touch.clientY;
+
+    // Create visual clone for dragging
+    touchClone = this.cloneNode(true);
+    touchClone.classList.add('touch-clone');
+    touchClone.style.cssText = `
+        position: fixed;
+        z-index: 1000;
+        pointer-events: none;
+        opacity: 0.9;
+        transform: scale(1.05);
+        box-shadow: 0 8px 25px rgba(0,0,0,0.3);
+        left: ${touch.clientX - this.offsetWidth / 2}px;
+        top: ${touch.clientY - this.offsetHeight / 2}px;
+    `;
+    document.body.appendChild(touchClone);
+
+    this.classList.add('dragging');
+}
+
+function handleTouchMove(e) {
+    if (!draggedItem || !touchClone) return;
+    e.preventDefault();
+
+    const touch = e.touches[0];
+
+    // Move clone
+    touchClone.style.left = `${touch.clientX - draggedItem.offsetWidth / 2}px`;
+    touchClone.style.top = `${touch.clientY - draggedItem.offsetHeight / 2}px`;
+
+    // Find slot under touch
+    const elemBelow = document.elementFromPoint(touch.clientX, touch.clientY);
+    const slot = elemBelow?.closest('.match-slot');
+
+    // Clear all drag-over states
+    document.querySelectorAll('.match-slot').forEach(s => s.classList.remove('drag-over'));
+
+    // Highlight current slot
+    if (slot && !slot.classList.contains('filled')) {
+        slot.classList.add('drag-over');
+    }
+}
+
+function handleTouchEnd(e) {
+    if (!draggedItem) return;
+
+    // Find slot under last touch position
+    const touch = e.changedTouches[0];
+    const elemBelow = document.elementFromPoint(touch.clientX, touch.clientY);
+    const slot = elemBelow?.closest('.match-slot');
+
+    if (slot && !slot.classList.contains('filled')) {
+        const answer = draggedItem.dataset.answer;
+        const answerText = draggedItem.querySelector('.match-text').textContent;
+        const game = slot.closest('.matching-game');
+
+        placeAnswer(slot, answer, answerText, game, draggedItem);
+    }
+
+    // Clean up
+    draggedItem.classList.remove('dragging');
+    document.querySelectorAll('.match-slot').forEach(s => s.classList.remove('drag-over'));
+
+    if (touchClone) {
+        touchClone.remove();
+        touchClone = null;
+    }
+
+    draggedItem = null;
+}
+
+// Initialize
+document.addEventListener('DOMContentLoaded', function() {
+    initTimer();
+    updateProgress();
+
+    // Initialize drawing canvases
+    initDrawingCanvases();
+
+    // Initialize matching games
+    initMatchingGames();
+
+    // Add blur handlers for text inputs
+    document.querySelectorAll('.fill-blank-input, .written-textarea').forEach(input => {
+        input.addEventListener('blur', function() {
+            const card = this.closest('.question-card');
+            const qId = card.dataset.questionId;
+            saveAnswer(parseInt(qId), this.value);
+        });
+    });
+});
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Y6 Practice Exam - Exam Archiver
+Moves released exams older than ARCHIVE_AFTER_DAYS (and their answers) to the
+archive tables from migration 010, one small transaction per batch
+
+Usage:
+    python tools/archive_exams.py --dry-run               # how many exams would move
+    python tools/archive_exams.py                         # archive everything past the horizon
+    python tools/archive_exams.py --older-than-days 365 --batch-size 100 --sleep 0.5
+
+Safe to stop and re-run at any point; run it from cron during quiet hours.
+"""
+
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from config import ARCHIVE_AFTER_DAYS, ARCHIVE_BATCH_SIZE
+
+
+def main(args):
+    from src.core.exam_archive import ExamArchive
+
+    pending = ExamArchive.pending(args.older_than_days)
+    print(f"{pending} released exams older than {args.older_than_days} days")
+
+    if args.dry_run or not pending:
+        return True
+
+    moved = 0
+    while args.max_batches is None or args.max_batches > 0:
+        try:
+            count = ExamArchive.archive_batch(args.older_than_days, args.batch_size)
+        except Exception as e:
+            print(f"Batch failed after {moved} exams: {e}")
+            return False
+
+        if not count:
+            break
+        moved += count
+        if args.max_batches is not None:
+            args.max_batches -= 1
+        time.sleep(args.sleep)
+
+    print(f"\nArchived {moved} exams")
+    for table, rows in sorted(ExamArchive.sizes().items()):
+        print(f"  {table:<26}~{rows} rows")
+    return True
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Move old released exams to the archive tables')
+    parser.add_argument('--older-than-days', type=int, default=ARCHIVE_AFTER_DAYS,
+                        help=f'Archive exams released longer ago than this (default: {ARCHIVE_AFTER_DAYS})')
+    parser.add_argument('--batch-size', type=int, default=ARCHIVE_BATCH_SIZE,
+                        help=f'Exams per transaction (default: {ARCHIVE_BATCH_SIZE})')
+    parser.add_argument('--sleep', type=float, default=0.2, help='Pause between batches in seconds (default: 0.2)')
+    parser.add_argument('--max-batches', type=int, default=None, help='Stop after this many batches')
+    parser.add_argument('--dry-run', action='store_true', help='Only report how many exams would move')
+
+    args = parser.parse_args()
+    sys.exit(0 if main(args) else 1)
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+Y6 Practice Exam - Micro-Benchmarks
+Times the hot helper functions against in-memory fixtures built from
+data/questions/*.json and compares them with a stored baseline
+
+Usage:
+    python tools/benchmark.py --save          # record a baseline on this machine
+    python tools/benchmark.py                 # compare; exit 1 on regression
+    python tools/benchmark.py --only grading --threshold 0.1
+
+Baselines are machine specific; record one before a refactor and compare
+on the same machine afterwards.
+"""
+
+import sys
+import json
+import random
+import timeit
+from datetime import datetime, timedelta
+from decimal import Decimal
+from pathlib import Path
+
+# Add project root to path
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+sys.path.insert(0, str(PROJECT_ROOT / "tools"))
+
+DATA_DIR = PROJECT_ROOT / "data" / "questions"
+BASELINE_FILE = PROJECT_ROOT / "tools" / "benchmark_baseline.json"
+
+BENCHMARKS = {}
+
+
+def benchmark(name):
+    """Register a benchmark; the function builds and returns the callable to time"""
+    def decorator(func):
+        BENCHMARKS[name] = func
+        return func
+    return decorator
+
+
+# =============================================================================
+# Fixtures
+# =============================================================================
+
+def load_questions():
+    """All questions from the bundled JSON files"""
+    questions = []
+    for filepath in sorted(DATA_DIR.glob("*_questions.json")):
+        with open(filepath, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        for qs_data in data.get('question_sets', []):
+            questions.extend(qs_data.get('questions', []))
+    return questions
+
+
+def as_db_rows(questions):
+    """Questions shaped like cursor(dictionary=True) rows (JSON columns as text)"""
+    rows = []
+    for i, q in enumerate(questions, 1):
+        rows.append({
+            'id': i,
+            'question_number': q['question_number'],
+            'question_type': q['question_type'],
+            'question_text': q['question_text'],
+            'marks': q.get('marks', 1),
+            'correct_answer': q.get('correct_answer') or '',
+            'options': json.dumps(q['options']) if q.get('options') else None,
+            'matching_pairs': json.dumps(q['matching_pairs']) if q.get('matching_pairs') else None,
+            'drawing_template': json.dumps(q['drawing_template']) if q.get('drawing_template') else None,
+        })
+    return rows
+
+
+class Fixtures:
+    """Fixture data shared by all benchmarks (built once)"""
+
+    def __init__(self, seed=1):
+        rng = random.Random(seed)
+        self.questions = load_questions()
+        self.rows = as_db_rows(self.questions)
+
+        # One sitting's answers: right half the time
+        self.answers = [(row, row['correct_answer'] if rng.random() < 0.5 else 'wrong answer')
+                        for row in self.rows]
+
+        # Typical cached analytics payload
+        now = datetime(2024, 1, 1, 9, 0)
+        self.cache_payload = [{
+            'id': i,
+            'full_name': f'Student {i}',
+            'avg_score': Decimal(f'{rng.uniform(20, 100):.2f}'),
+            'total_exams': rng.randint(1, 40),
+            'submitted_at': now + timedelta(minutes=i),
+            'released_at': now + timedelta(days=1, minutes=i),
+        } for i in range(500)]
+
+
+# =============================================================================
+# Benchmarks
+# =============================================================================
+
+@benchmark('paginator')
+def bench_paginator(fx):
+    from src.core.pagination import Paginator
+
+    def run():
+        for page in range(1, 101):
+            Paginator(len(fx.rows), page, 20).to_dict()
+    return run
+
+
+@benchmark('cache_serialize')
+def bench_cache_serialize(fx):
+    from src.core.cache import CacheManager
+
+    def run():
+        json.dumps(fx.cache_payload, default=CacheManager._json_serializer)
+    return run
+
+
+@benchmark('cache_codec')
+def bench_cache_codec(fx):
+    from src.core.cache_codec import encode, decode
+
+    def run():
+        decode(encode(fx.cache_payload))
+    return run
+
+
+@benchmark('grading')
+def bench_grading(fx):
+    from src.core.question_utils import grade_answer
+
+    def run():
+        for row, answer in fx.answers:
+            grade_answer(row, answer)
+    return run
+
+
+@benchmark('parse_json_fields')
+def bench_parse_json_fields(fx):
+    from src.core.question_utils import parse_json_fields
+
+    def run():
+        rows = [dict(row) for row in fx.rows]
+        parse_json_fields(rows, ('options', 'matching_pairs', 'drawing_template'))
+    return run
+
+
+@benchmark('pdf_flowables')
+def bench_pdf_flowables(fx):
+    from src.core.pdf_export import exam_styles, question_flowables
+
+    styles = exam_styles(answer_key=True)
+    rows = fx.rows[:200]
+
+    def run():
+        question_flowables(rows, styles, answer_key=True)
+    return run
+
+
+@benchmark('import_rows')
+def bench_import_rows(fx):
+    from import_questions import prepare_question_values
+
+    def run():
+        for q in fx.questions:
+            prepare_question_values(q)
+    return run
+
+
+# =============================================================================
+# Runner
+# =============================================================================
+
+def time_call(func, rounds):
+    """Best per-call time in microseconds over several rounds"""
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=rounds, number=number)) / number * 1e6
+
+
+def load_baseline():
+    if BASELINE_FILE.exists():
+        with open(BASELINE_FILE, 'r') as f:
+            return json.load(f)
+    return {}
+
+
+def main(args):
+    fixtures = Fixtures(args.seed)
+    baseline = load_baseline()
+    results = {}
+    regressions = []
+
+    print(f"{'Benchmark':<20}{'Time (us)':>14}{'Baseline':>14}{'Change':>10}")
+    print('-' * 58)
+
+    for name, factory in BENCHMARKS.items():
+        if args.only and name not in args.only:
+            continue
+
+        try:
+            func = factory(fixtures)
+        except ImportError as e:
+            print(f"{name:<20}{'skipped':>14}  ({e})")
+            continue
+
+        micros = time_call(func, args.rounds)
+        results[name] = round(micros, 2)
+
+        base = baseline.get(name)
+        if base:
+            change = (micros - base) / base
+            flag = '  REGRESSION' if change > args.threshold else ''
+            print(f"{name:<20}{micros:>14.1f}{base:>14.1f}{change:>+10.1%}{flag}")
+            if flag:
+                regressions.append(name)
+        else:
+            print(f"{name:<20}{micros:>14.1f}{'-':>14}{'-':>10}")
+
+    if args.save:
+        baseline.update(results)
+        with open(BASELINE_FILE, 'w') as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        print(f"\nBaseline saved to {BASELINE_FILE}")
+        return True
+
+    if regressions:
+        print(f"\n{len(regressions)} benchmark(s) slower than baseline by more than {args.threshold:.0%}: "
+              f"{', '.join(regressions)}")
+        return False
+
+    return True
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Run micro-benchmarks against a stored baseline')
+    parser.add_argument('--save', action='store_true', help='Store results as the new baseline')
+    parser.add_argument('--only', nargs='+', choices=list(BENCHMARKS), help='Run only these benchmarks')
+    parser.add_argument('--threshold', type=float, default=0.2, help='Allowed slowdown before failing (default: 0.2)')
+    parser.add_argument('--rounds', type=int, default=5, help='Timing rounds; the best is kept (default: 5)')
+    parser.add_argument('--seed', type=int, default=1, help='Fixture random seed')
+
+    args = parser.parse_args()
+    sys.exit(0 if main(args) else 1)
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Y6 Practice Exam - Static Asset Build
+Minifies static/css and static/js into content-hashed files under static/dist,
+with gzip and brotli copies and a manifest for asset_url()
+
+Usage:
+    python tools/build_assets.py                 # build and print sizes
+    python tools/build_assets.py --no-minify     # fingerprint and compress only
+
+The Docker image runs this at build time and again before serving (after
+any update pull); run it by hand after editing CSS or JS outside Docker.
+"""
+
+import sys
+from pathlib import Path
+
+# Add project root to path
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+
+def main(args):
+    from src.core.assets import build, load_manifest, brotli
+
+    try:
+        sizes = build(minify=not args.no_minify)
+    except (OSError, UnicodeDecodeError) as e:
+        print(f"Build failed: {e}")
+        return False
+
+    manifest = load_manifest()
+    print(f"  {'asset':<28}{'source':>9}{'min':>9}{'gzip':>9}{'brotli':>9}")
+    for name, size in sizes.items():
+        print(f"  {name:<28}{size['source']:>9}{size['minified']:>9}"
+              f"{size.get('gz', '-'):>9}{size.get('br', '-'):>9}  -> {manifest[name]}")
+
+    if brotli is None:
+        print("\nBrotli not installed: only gzip variants were written")
+    print(f"\nBuilt {len(sizes)} assets")
+    return True
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Build fingerprinted, precompressed static assets')
+    parser.add_argument('--no-minify', action='store_true', help='Copy sources unminified (for debugging a build)')
+
+    args = parser.parse_args()
+    sys.exit(0 if main(args) else 1)
@@ -141,11 +141,7 @@ def import_questions(data_dir=None, subject_filter=None, clear_existing=False):
                 # Import questions
                 questions_imported = 0
                 for q in qs_data.get('questions', []):
-                    # Prepare JSON fields
-                    options = json.dumps(q['options']) if q.get('options') else None
-                    matching_pairs = json.dumps(q['matching_pairs']) if q.get('matching_pairs') else None
-                    labels = json.dumps(q['labels']) if q.get('labels') else None
-                    drawing_template = json.dumps(q['drawing_template']) if q.get('drawing_template') else None
+                    values = prepare_question_values(q)
 
                     # Check if question exists
                     cursor.execute("""
@@ -172,21 +168,7 @@ def import_questions(data_dir=None, subject_filter=None, clear_existing=False):
                                 drawing_template = %s,
                                 is_active = TRUE
                             WHERE id = %s
-                        """, (
-                            q['question_type'],
-                            q['question_text'],
-                            q.get('question_html'),
-                            q.get('image_url'),
-                            options,
-                            q.get('correct_answer'),
-                            matching_pairs,
-                            labels,
-                            q.get('explanation'),
-                            q.get('hint'),
-                            q.get('marks', 1),
-                            drawing_template,
-                            existing_q['id']
-                        ))
+                        """, values + (existing_q['id'],))
                     else:
                         # Insert new
                         cursor.execute("""
@@ -195,22 +177,7 @@ def import_questions(data_dir=None, subject_filter=None, clear_existing=False):
                                 question_html, image_url, options, correct_answer, matching_pairs,
                                 labels, explanation, hint, marks, drawing_template, is_active
                             ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, TRUE)
-                        """, (
-                            question_set_id,
-                            q['question_number'],
-                            q['question_type'],
-                            q['question_text'],
-                            q.get('question_html'),
-                            q.get('image_url'),
-                            options,
-                            q.get('correct_answer'),
-                            matching_pairs,
-                            labels,
-                            q.get('explanation'),
-                            q.get('hint'),
-                            q.get('marks', 1),
-                            drawing_template
-                        ))
+                        """, (question_set_id, q['question_number']) + values)
 
                     questions_imported += 1
 
@@ -222,6 +189,7 @@ def import_questions(data_dir=None, subject_filter=None, clear_existing=False):
         print(f"Import Complete!")
         print(f"{'=' * 60}")
         print(f"\nTotal questions imported: {total_imported}")
+        refresh_caches()
         return True
 
     except Exception as e:
@@ -236,6 +204,44 @@ def import_questions(data_dir=None, subject_filter=None, clear_existing=False):
         conn.close()
 
 
+def prepare_question_values(q):
+    """
+    Column values for one question from the JSON files, in the order
+    question_type, question_text, question_html, image_url, options,
+    correct_answer, matching_pairs, labels, explanation, hint, marks,
+    drawing_template (JSON fields serialized)
+    """
+    # Prepare JSON fields
+    options = json.dumps(q['options']) if q.get('options') else None
+    matching_pairs = json.dumps(q['matching_pairs']) if q.get('matching_pairs') else None
+    labels = json.dumps(q['labels']) if q.get('labels') else None
+    drawing_template = json.dumps(q['drawing_template']) if q.get('drawing_template') else None
+
+    return (
+        q['question_type'],
+        q['question_text'],
+        q.get('question_html'),
+        q.get('image_url'),
+        options,
+        q.get('correct_answer'),
+        matching_pairs,
+        labels,
+        q.get('explanation'),
+        q.get('hint'),
+        q.get('marks', 1),
+        drawing_template
+    )
+
+
+def refresh_caches():
+    """Drop cached subjects/questions so running workers see the import"""
+    try:
+        from src.core.catalog import invalidate_catalog
+        invalidate_catalog()
+    except Exception as e:
+        print(f"Warning: could not invalidate caches: {e}")
+
+
 def ensure_subjects(cursor, conn):
     """Ensure default subjects exist"""
     subjects = [
@@ -328,6 +334,7 @@ def import_from_csv(csv_file, subject_code):
 
             conn.commit()
             print(f"Imported {imported} questions")
+            refresh_caches()
             return True
 
     except Exception as e:
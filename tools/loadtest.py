@@ -0,0 +1,380 @@
+#!/usr/bin/env python3
+"""
+Y6 Practice Exam - Exam Sitting Load Test
+Simulates a class sitting an exam against a local app, MySQL and Redis
+
+Each simulated student logs in, opens the exam, autosaves answers as they
+work through the paper (drawings included), polls the server timer and
+submits at the deadline. Reports p50/p95/p99 latency, throughput and DB
+query counts (from the Server-Timing header, needs SQL_INSTRUMENTATION) per
+endpoint. Raise --students between runs to find how many one node handles.
+
+Usage:
+    python tools/loadtest.py setup --students 60      # also resets exams between runs
+    python tools/loadtest.py run --students 60 --duration 300 -o results.json
+    python tools/loadtest.py cleanup
+"""
+
+import sys
+import os
+import re
+import json
+import time
+import base64
+import random
+import threading
+import urllib.request
+import urllib.error
+from http.cookiejar import CookieJar
+from collections import defaultdict
+from pathlib import Path
+
+# Add project root to path
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from dbs.connection import get_connection
+
+EMAIL_PATTERN = 'loadtest{}@loadtest.invalid'
+EMAIL_LIKE = 'loadtest%@loadtest.invalid'
+PASSWORD = 'LoadTest#2024'
+DB_QUERIES = re.compile(r'\bdb;[^,]*desc="(\d+) queries"')
+
+
+# =============================================================================
+# Setup / cleanup (direct database access)
+# =============================================================================
+
+def setup(students, question_set_id=None):
+    """Create load-test students and assign them one exam each"""
+    from src.core.auth import PasswordManager
+
+    conn = get_connection()
+    cursor = conn.cursor(dictionary=True)
+
+    try:
+        if not question_set_id:
+            # Prefer a paper with drawing questions so uploads are exercised
+            cursor.execute("""
+                SELECT qs.id FROM question_sets qs
+                JOIN questions q ON q.question_set_id = qs.id AND q.is_active = TRUE
+                WHERE qs.is_active = TRUE
+                GROUP BY qs.id
+                ORDER BY SUM(q.question_type = 'drawing') DESC, COUNT(*) DESC
+                LIMIT 1
+            """)
+            row = cursor.fetchone()
+            if not row:
+                print("Error: no active question sets - import questions first")
+                return False
+            question_set_id = row['id']
+
+        cursor.execute("SELECT COALESCE(SUM(marks), 0) as max_score FROM questions WHERE question_set_id = %s AND is_active = TRUE",
+                       (question_set_id,))
+        max_score = cursor.fetchone()['max_score']
+
+        # One bcrypt hash shared by all load-test accounts
+        password_hash = PasswordManager.hash_password(PASSWORD)
+
+        created = 0
+        for i in range(students):
+            email = EMAIL_PATTERN.format(i)
+            cursor.execute("SELECT id FROM users WHERE email = %s", (email,))
+            user = cursor.fetchone()
+
+            if user:
+                student_id = user['id']
+            else:
+                cursor.execute("""
+                    INSERT INTO users (email, password_hash, full_name, role_id, is_active)
+                    VALUES (%s, %s, %s, 2, TRUE)
+                """, (email, password_hash, f'Load Test {i}'))
+                student_id = cursor.lastrowid
+                created += 1
+
+            # Fresh exam for every run
+            cursor.execute("DELETE FROM practice_exams WHERE student_id = %s", (student_id,))
+            cursor.execute("""
+                INSERT INTO practice_exams (student_id, question_set_id, exam_date, max_score, status)
+                VALUES (%s, %s, CURDATE(), %s, 'pending')
+            """, (student_id, question_set_id, max_score))
+
+        conn.commit()
+        print(f"Question set {question_set_id}: {students} students ready ({created} new)")
+        return True
+
+    except Exception as e:
+        conn.rollback()
+        print(f"Setup error: {e}")
+        return False
+
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def cleanup():
+    """Delete load-test students (exams, answers and sessions cascade)"""
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    try:
+        cursor.execute("DELETE FROM users WHERE email LIKE %s", (EMAIL_LIKE,))
+        conn.commit()
+        print(f"Removed {cursor.rowcount} load-test students")
+        return True
+
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def load_sittings(students):
+    """Exam id and questions for each load-test student"""
+    conn = get_connection()
+    cursor = conn.cursor(dictionary=True)
+
+    try:
+        cursor.execute("""
+            SELECT u.email, pe.id as exam_id, pe.question_set_id
+            FROM users u
+            JOIN practice_exams pe ON pe.student_id = u.id AND pe.status = 'pending'
+            WHERE u.email LIKE %s
+        """, (EMAIL_LIKE,))
+        exams = {row['email']: row for row in cursor.fetchall()}
+
+        questions = {}
+        for set_id in {e['question_set_id'] for e in exams.values()}:
+            cursor.execute("""
+                SELECT id, question_type, correct_answer FROM questions
+                WHERE question_set_id = %s AND is_active = TRUE
+                ORDER BY question_number
+            """, (set_id,))
+            questions[set_id] = cursor.fetchall()
+
+    finally:
+        cursor.close()
+        conn.close()
+
+    sittings = []
+    for i in range(students):
+        email = EMAIL_PATTERN.format(i)
+        if email not in exams:
+            print(f"Error: no pending exam for {email} - run setup first")
+            return None
+        exam = exams[email]
+        sittings.append({'email': email, 'exam_id': exam['exam_id'],
+                         'questions': questions[exam['question_set_id']]})
+    return sittings
+
+
+# =============================================================================
+# Simulation
+# =============================================================================
+
+class Results:
+    """Thread-safe latency and query-count collector"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.queries = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    def record(self, endpoint, seconds, ok, server_timing):
+        with self.lock:
+            self.latencies[endpoint].append(seconds)
+            if not ok:
+                self.errors[endpoint] += 1
+            match = DB_QUERIES.search(server_timing or '')
+            if match:
+                self.queries[endpoint].append(int(match.group(1)))
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile"""
+    ordered = sorted(values)
+    index = max(0, int(round(pct / 100 * len(ordered))) - 1)
+    return ordered[index]
+
+
+class Student:
+    """One simulated browser sitting the exam"""
+
+    def __init__(self, base_url, sitting, results, rng, args):
+        self.base_url = base_url.rstrip('/')
+        self.sitting = sitting
+        self.results = results
+        self.rng = rng
+        self.args = args
+        self.opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(CookieJar()))
+
+    def request(self, endpoint, path, payload=None):
+        data, headers = None, {}
+        if payload is not None:
+            data = json.dumps(payload).encode('utf-8')
+            headers['Content-Type'] = 'application/json'
+
+        req = urllib.request.Request(self.base_url + path, data=data, headers=headers)
+        started = time.perf_counter()
+        try:
+            with self.opener.open(req, timeout=self.args.timeout) as response:
+                response.read()
+                ok, timing = True, response.headers.get('Server-Timing')
+        except urllib.error.HTTPError as e:
+            e.read()
+            ok, timing = False, e.headers.get('Server-Timing')
+        except Exception:
+            ok, timing = False, None
+        self.results.record(endpoint, time.perf_counter() - started, ok, timing)
+        return ok
+
+    def answer_for(self, question):
+        """Plausible answer; drawings are random PNG-sized payloads"""
+        qtype = question['question_type']
+        if qtype == 'drawing':
+            blob = self.rng.randbytes(self.args.drawing_kb * 1024)
+            return 'data:image/png;base64,' + base64.b64encode(blob).decode('ascii')
+        if qtype == 'mcq':
+            return self.rng.choice('ABCD')
+        if self.rng.random() < 0.5 and question.get('correct_answer'):
+            return question['correct_answer']
+        return ' '.join(self.rng.choice(['the', 'cat', 'seven', 'plant', 'light', 'data']) for _ in range(6))
+
+    def run(self, start_at, deadline):
+        exam_id = self.sitting['exam_id']
+        questions = self.sitting['questions']
+
+        time.sleep(max(0, start_at - time.time()))
+        if not self.request('login', '/auth/login', {'email': self.sitting['email'], 'password': PASSWORD}):
+            return
+        self.request('take_exam', f'/student/exam/{exam_id}')
+
+        # Spread saves over the sitting; some answers get revised
+        answers = {}
+        events = []
+        now = time.time()
+        for q in questions:
+            events.append((self.rng.uniform(now, deadline - 1), 'save', q))
+            if self.rng.random() < self.args.revise_rate:
+                events.append((self.rng.uniform(now, deadline - 1), 'save', q))
+        poll_at = now + self.rng.uniform(0, self.args.poll)
+        while poll_at < deadline:
+            events.append((poll_at, 'poll', None))
+            poll_at += self.args.poll
+        events.sort(key=lambda e: e[0])
+
+        for at, kind, question in events:
+            time.sleep(max(0, at - time.time()))
+            if kind == 'poll':
+                self.request('time_check', f'/student/exam/{exam_id}/time-check')
+            else:
+                answer = self.answer_for(question)
+                answers[question['id']] = answer
+                endpoint = 'save_drawing' if question['question_type'] == 'drawing' else 'save_answer'
+                self.request(endpoint, f'/student/exam/{exam_id}/save',
+                             {'question_id': question['id'], 'answer': answer})
+
+        # Everyone submits at the deadline, within the client's jitter
+        time.sleep(max(0, deadline + self.rng.uniform(0, self.args.submit_spread) - time.time()))
+        self.request('submit_exam', f'/student/exam/{exam_id}/submit', {
+            'answers': [{'question_id': q['id'], 'answer': answers.get(q['id'], '')} for q in questions],
+            'auto_submit': True
+        })
+
+
+def run(args):
+    """Run the sitting and print the report"""
+    sittings = load_sittings(args.students)
+    if not sittings:
+        return False
+
+    results = Results()
+    begin = time.time()
+    deadline = begin + args.ramp + args.duration
+
+    threads = []
+    for i, sitting in enumerate(sittings):
+        rng = random.Random(args.seed * 100003 + i)
+        student = Student(args.url, sitting, results, rng, args)
+        start_at = begin + args.ramp * i / max(1, len(sittings))
+        thread = threading.Thread(target=student.run, args=(start_at, deadline), daemon=True)
+        thread.start()
+        threads.append(thread)
+
+    print(f"Sitting started: {len(sittings)} students, {args.ramp}s ramp, {args.duration}s exam, seed {args.seed}")
+    for thread in threads:
+        thread.join()
+
+    elapsed = time.time() - begin
+    report = build_report(results, elapsed)
+    print_report(report, elapsed)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'students': args.students, 'duration': args.duration, 'seed': args.seed,
+                       'elapsed_seconds': round(elapsed, 1), 'endpoints': report}, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+    return not any(r['errors'] for r in report.values())
+
+
+def build_report(results, elapsed):
+    """Per-endpoint latency percentiles, throughput and query counts"""
+    report = {}
+    for endpoint, values in sorted(results.latencies.items()):
+        queries = results.queries.get(endpoint, [])
+        report[endpoint] = {
+            'requests': len(values),
+            'errors': results.errors.get(endpoint, 0),
+            'rps': round(len(values) / elapsed, 2),
+            'p50_ms': round(percentile(values, 50) * 1000, 1),
+            'p95_ms': round(percentile(values, 95) * 1000, 1),
+            'p99_ms': round(percentile(values, 99) * 1000, 1),
+            'avg_queries': round(sum(queries) / len(queries), 1) if queries else None,
+            'max_queries': max(queries) if queries else None,
+        }
+    return report
+
+
+def print_report(report, elapsed):
+    print(f"\n{'=' * 92}")
+    print(f"  Load Test Results ({elapsed:.0f}s)")
+    print(f"{'=' * 92}")
+    print(f"{'Endpoint':<14}{'Requests':>10}{'Errors':>8}{'Req/s':>9}{'p50 ms':>10}{'p95 ms':>10}"
+          f"{'p99 ms':>10}{'Avg SQL':>10}{'Max SQL':>10}")
+    for endpoint, r in report.items():
+        avg_q = '-' if r['avg_queries'] is None else r['avg_queries']
+        max_q = '-' if r['max_queries'] is None else r['max_queries']
+        print(f"{endpoint:<14}{r['requests']:>10}{r['errors']:>8}{r['rps']:>9}{r['p50_ms']:>10}{r['p95_ms']:>10}"
+              f"{r['p99_ms']:>10}{avg_q:>10}{max_q:>10}")
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Simulate an exam sitting against a running server')
+    parser.add_argument('command', choices=['setup', 'run', 'cleanup'])
+    parser.add_argument('--students', '-n', type=int, default=30, help='Concurrent students (default: 30)')
+    parser.add_argument('--question-set', type=int, help='Question set to assign (setup; default: one with drawings)')
+    parser.add_argument('--url', default=os.getenv('LOADTEST_URL', 'http://127.0.0.1:5001'), help='Server base URL')
+    parser.add_argument('--duration', type=int, default=300, help='Sitting length in seconds (default: 300)')
+    parser.add_argument('--ramp', type=int, default=30, help='Seconds over which students log in (default: 30)')
+    parser.add_argument('--poll', type=float, default=30, help='time-check interval, as in the browser (default: 30)')
+    parser.add_argument('--revise-rate', type=float, default=0.3, help='Share of answers saved twice (default: 0.3)')
+    parser.add_argument('--drawing-kb', type=int, default=40, help='Drawing upload size in KB (default: 40)')
+    parser.add_argument('--submit-spread', type=float, default=3, help='Seconds over which submits land (default: 3)')
+    parser.add_argument('--timeout', type=float, default=30, help='Request timeout in seconds')
+    parser.add_argument('--seed', type=int, default=1, help='Random seed for reproducible runs')
+    parser.add_argument('--output', '-o', help='Write results as JSON')
+
+    args = parser.parse_args()
+
+    if args.command == 'setup':
+        success = setup(args.students, args.question_set)
+    elif args.command == 'cleanup':
+        success = cleanup()
+    else:
+        success = run(args)
+
+    sys.exit(0 if success else 1)
@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+Y6 Practice Exam - Query Plan Audit
+Runs EXPLAIN FORMAT=JSON for every statement the app issued and compares the
+plans with a stored baseline
+
+Statements are captured by the instrumented cursor: start the app with
+SQL_CAPTURE_FILE set, exercise it (click through, or tools/loadtest.py), then
+audit the capture against the same seeded database:
+
+Usage:
+    SQL_CAPTURE_FILE=tools/query_capture.jsonl python app.py
+    python tools/query_audit.py --save                 # record the baseline
+    python tools/query_audit.py                        # compare; exit 1 on regression
+    python tools/query_audit.py --write-migration      # draft indexes for flagged plans
+
+A plan regresses when a statement gains a flag (full_scan, full_index_scan,
+filesort, temporary) the baseline did not have, or a new statement arrives
+already flagged. Tables scanning fewer than --min-rows rows are not flagged,
+so small lookup tables (roles, subjects) don't count.
+"""
+
+import re
+import sys
+import json
+from pathlib import Path
+
+# Add project root to path
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from dbs.instrumentation import fingerprint
+
+CAPTURE_FILE = PROJECT_ROOT / "tools" / "query_capture.jsonl"
+BASELINE_FILE = PROJECT_ROOT / "tools" / "query_plan_baseline.json"
+MIGRATIONS_DIR = PROJECT_ROOT / "dbs" / "migrations"
+
+EXPLAINABLE = ('SELECT', 'WITH', 'UPDATE', 'DELETE', 'INSERT', 'REPLACE')
+
+_ALIAS = re.compile(r"\b(?:FROM|JOIN)\s+`?(\w+)`?(?:\s+(?:AS\s+)?`?(\w+)`?)?", re.IGNORECASE)
+_NOT_ALIAS = {'on', 'where', 'join', 'left', 'right', 'inner', 'outer', 'cross', 'group', 'order',
+              'limit', 'using', 'set', 'having', 'union', 'for', 'straight_join'}
+_CONDITION = re.compile(r"`(\w+)`\.`(\w+)`\s*(=|<>|>=|<=|>|<|in\b|between\b|like\b)", re.IGNORECASE)
+_ORDER_BY = re.compile(r"\bORDER\s+BY\s+(.+?)(?:\bLIMIT\b|\bFOR\b|$)", re.IGNORECASE | re.DOTALL)
+
+
+# =============================================================================
+# Capture and EXPLAIN
+# =============================================================================
+
+def load_capture(path):
+    """First sample per statement template: {fingerprint: {endpoint, sql, params}}"""
+    samples = {}
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            sample = json.loads(line)
+            sql = sample['sql'].strip()
+            if sql.split(None, 1)[0].upper() not in EXPLAINABLE:
+                continue
+            samples.setdefault(fingerprint(sql), sample)
+    return samples
+
+
+def explain(cursor, sample):
+    """EXPLAIN FORMAT=JSON plan for one captured statement"""
+    cursor.execute("EXPLAIN FORMAT=JSON " + sample['sql'], sample['params'] or None)
+    row = cursor.fetchone()
+    return json.loads(row[0])
+
+
+def walk(node):
+    """Every dict in a plan tree"""
+    if isinstance(node, dict):
+        yield node
+        for value in node.values():
+            yield from walk(value)
+    elif isinstance(node, list):
+        for item in node:
+            yield from walk(item)
+
+
+def analyse(plan, min_rows):
+    """(flags, table nodes) for one plan"""
+    flags = set()
+    tables = []
+
+    for node in walk(plan):
+        if node.get('using_filesort'):
+            flags.add('filesort')
+        if node.get('using_temporary_table'):
+            flags.add('temporary')
+
+        if 'table_name' in node and 'access_type' in node:
+            tables.append(node)
+            if node['table_name'].startswith('<'):
+                continue  # Derived/union result, not a base table
+            rows = node.get('rows_examined_per_scan') or 0
+            if rows < min_rows:
+                continue
+            if node['access_type'] == 'ALL':
+                flags.add('full_scan')
+            elif node['access_type'] == 'index':
+                flags.add('full_index_scan')
+
+    return sorted(flags), tables
+
+
+# =============================================================================
+# Index recommendations
+# =============================================================================
+
+def table_aliases(sql):
+    """{alias: table} for the FROM/JOIN clauses of a statement"""
+    aliases = {}
+    for table, alias in _ALIAS.findall(sql):
+        if not alias or alias.lower() in _NOT_ALIAS:
+            alias = table
+        aliases[alias] = table
+    return aliases
+
+
+def order_columns(sql, alias):
+    """ORDER BY columns belonging to alias, in order"""
+    match = _ORDER_BY.search(sql)
+    if not match:
+        return []
+
+    columns = []
+    for item in match.group(1).split(','):
+        expr = item.strip().split()[0] if item.strip() else ''
+        if '.' in expr:
+            owner, column = expr.split('.', 1)
+            if owner == alias:
+                columns.append(column.strip('`'))
+    return columns
+
+
+def recommend(sample, tables, flags):
+    """[(table, columns)] for the flagged table accesses of one statement"""
+    aliases = table_aliases(sample['sql'])
+    recommendations = []
+
+    for node in tables:
+        alias = node['table_name']
+        table = aliases.get(alias)
+        if not table or alias.startswith('<'):
+            continue
+        if node['access_type'] not in ('ALL', 'index') and 'filesort' not in flags:
+            continue
+
+        equality, ranges = [], []
+        for owner, column, op in _CONDITION.findall(node.get('attached_condition', '')):
+            if owner != alias:
+                continue
+            target = equality if op.lower() in ('=', 'in') else ranges
+            if column not in equality and column not in ranges:
+                target.append(column)
+
+        # Equality columns, then the sort, then at most one range column
+        columns = list(equality)
+        if 'filesort' in flags:
+            columns += [c for c in order_columns(sample['sql'], alias) if c not in columns]
+        columns += [c for c in ranges[:1] if c not in columns]
+
+        if columns:
+            recommendations.append((table, columns[:4]))
+
+    return recommendations
+
+
+_index_cache = {}
+
+
+def existing_indexes(cursor, table):
+    """Column lists of every index on table (from information_schema)"""
+    if table not in _index_cache:
+        cursor.execute("""
+            SELECT INDEX_NAME, COLUMN_NAME
+            FROM information_schema.STATISTICS
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+            ORDER BY INDEX_NAME, SEQ_IN_INDEX
+        """, (table,))
+        indexes = {}
+        for name, column in cursor.fetchall():
+            indexes.setdefault(name, []).append(column)
+        _index_cache[table] = list(indexes.values())
+    return _index_cache[table]
+
+
+def covered(columns, indexes):
+    """True if some index already starts with these columns"""
+    return any(index[:len(columns)] == list(columns) for index in indexes)
+
+
+def write_migration(recommendations):
+    """Write the next-numbered migration with one ADD INDEX per recommendation"""
+    numbers = [int(p.name[:3]) for p in MIGRATIONS_DIR.glob('[0-9][0-9][0-9]_*.sql')]
+    number = max(numbers, default=0) + 1
+    path = MIGRATIONS_DIR / f"{number:03d}_query_audit_indexes.sql"
+
+    lines = [
+        f"-- Migration {number:03d}: Composite indexes recommended by tools/query_audit.py",
+        "-- Y6 Practice Exam System",
+        "-- Review before applying: each index speeds reads but costs every write.",
+        "",
+        "USE y6_practice_exam;",
+        "",
+    ]
+    for (table, columns), templates in sorted(recommendations.items()):
+        name = f"idx_{table}_{'_'.join(columns)}"[:64]
+        for template in templates[:3]:
+            lines.append(f"-- {template[:150].replace(';', '')}")
+        lines.append(f"ALTER TABLE {table} ADD INDEX {name} ({', '.join(columns)});")
+        lines.append("")
+
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(lines))
+    return path
+
+
+# =============================================================================
+# Main
+# =============================================================================
+
+def load_baseline():
+    if BASELINE_FILE.exists():
+        with open(BASELINE_FILE, 'r') as f:
+            return json.load(f)
+    return {}
+
+
+def main(args):
+    from dbs.connection import get_connection
+
+    samples = load_capture(args.capture)
+    baseline = load_baseline()
+    results = {}
+    regressions = []
+    recommendations = {}
+    errors = 0
+
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    try:
+        print(f"{'Flags':<34}{'Baseline':<34}Statement")
+        print('-' * 110)
+
+        for template, sample in sorted(samples.items()):
+            try:
+                plan = explain(cursor, sample)
+            except Exception as e:
+                errors += 1
+                print(f"{'error':<34}{'':<34}{template[:60]}  ({e})")
+                continue
+
+            flags, tables = analyse(plan, args.min_rows)
+            results[template] = {
+                'endpoint': sample.get('endpoint'),
+                'flags': flags,
+                'access': {node['table_name']: node['access_type'] for node in tables},
+            }
+
+            base = baseline.get(template)
+            base_flags = base['flags'] if base else None
+            gained = set(flags) - set(base_flags if base_flags is not None else [])
+            marker = ''
+            if gained:
+                regressions.append(template)
+                marker = '  REGRESSION'
+
+            print(f"{','.join(flags) or '-':<34}{','.join(base_flags or []) if base else 'new':<34}"
+                  f"{template[:60]}{marker}")
+
+            if flags and args.write_migration:
+                for table, columns in recommend(sample, tables, flags):
+                    if not covered(columns, existing_indexes(cursor, table)):
+                        recommendations.setdefault((table, tuple(columns)), []).append(template)
+
+    finally:
+        cursor.close()
+        conn.close()
+
+    if args.write_migration:
+        # Drop recommendations that are a prefix of another on the same table
+        for key in list(recommendations):
+            table, columns = key
+            if any(other != key and other[0] == table and other[1][:len(columns)] == columns
+                   for other in recommendations):
+                del recommendations[key]
+        if recommendations:
+            print(f"\nMigration written to {write_migration(recommendations)}")
+        else:
+            print("\nNo new indexes recommended")
+
+    if args.save:
+        with open(BASELINE_FILE, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print(f"\nBaseline saved to {BASELINE_FILE} ({len(results)} statements, {errors} errors)")
+        return True
+
+    if regressions:
+        print(f"\n{len(regressions)} statement(s) with worse plans than the baseline")
+        return False
+
+    return True
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='EXPLAIN captured statements and compare plans with a baseline')
+    parser.add_argument('--capture', default=str(CAPTURE_FILE), help='Capture file (SQL_CAPTURE_FILE output)')
+    parser.add_argument('--save', action='store_true', help='Store plans as the new baseline')
+    parser.add_argument('--write-migration', action='store_true', help='Write a migration with recommended indexes')
+    parser.add_argument('--min-rows', type=int, default=100,
+                        help='Ignore scans of tables with fewer rows (default: 100)')
+
+    args = parser.parse_args()
+    sys.exit(0 if main(args) else 1)
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Y6 Practice Exam - Expired-Token Reaper
+Deletes expired and used rows from user_sessions, user_otps and magic_links
+in small batches and reports how many went
+
+Usage:
+    python tools/reap_tokens.py --dry-run          # counts only
+    python tools/reap_tokens.py                    # reap until nothing is left
+    python tools/reap_tokens.py --batch-size 200 --sleep 0.5 --grace-hours 1
+
+The app runs the same pass in-process every TOKEN_REAPER_INTERVAL seconds;
+this is for cron or a one-off cleanup of a large backlog.
+"""
+
+import sys
+from pathlib import Path
+
+# Add project root to path
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from config import TOKEN_REAPER_BATCH_SIZE, TOKEN_REAPER_SLEEP, TOKEN_GRACE_HOURS
+
+
+def main(args):
+    from src.core.token_reaper import TokenReaper
+
+    if args.dry_run:
+        for kind, count in TokenReaper.count(args.grace_hours).items():
+            print(f"  {kind:<22}{count}")
+        return True
+
+    totals = {}
+    while True:
+        deleted = TokenReaper.run_once(args.batch_size, args.max_batches, args.sleep, args.grace_hours)
+        if not deleted:
+            print("Another reaper is running")
+            return False
+        for kind, count in deleted.items():
+            totals[kind] = totals.get(kind, 0) + count
+        # A target hit max_batches only if it deleted that many full batches
+        if all(count < args.batch_size * args.max_batches for count in deleted.values()):
+            break
+
+    for kind, count in totals.items():
+        print(f"  {kind:<22}{count}")
+    print(f"\nDeleted {sum(totals.values())} rows")
+    return True
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Delete expired sessions, OTPs and magic links')
+    parser.add_argument('--batch-size', type=int, default=TOKEN_REAPER_BATCH_SIZE,
+                        help=f'Rows per DELETE (default: {TOKEN_REAPER_BATCH_SIZE})')
+    parser.add_argument('--max-batches', type=int, default=100, help='Batches per table per pass (default: 100)')
+    parser.add_argument('--sleep', type=float, default=TOKEN_REAPER_SLEEP,
+                        help=f'Pause between batches in seconds (default: {TOKEN_REAPER_SLEEP})')
+    parser.add_argument('--grace-hours', type=int, default=TOKEN_GRACE_HOURS,
+                        help=f'Keep rows this long after expiry or use (default: {TOKEN_GRACE_HOURS})')
+    parser.add_argument('--dry-run', action='store_true', help='Only count what would be deleted')
+
+    args = parser.parse_args()
+    sys.exit(0 if main(args) else 1)